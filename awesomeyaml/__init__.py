@@ -15,6 +15,7 @@
 from . import config
 from . import builder
 from . import eval_context
+from . import graph
 from . import yaml
 from . import errors
 
@@ -40,10 +40,31 @@ class Builder():
 
     _default_safe_flag = True
 
-    def __init__(self):
+    def __init__(self, backend=None, use_cache=True, marks=None, executor=None):
         ''' Creates an empty builder. Yaml documents can then be added with calls to :py:meth:`add_source`
             and :py:meth:`add_multiple_sources`.
+
+            Arguments:
+                backend : yaml backend used to parse sources, ``'c'`` to use libyaml, ``'python'`` to use
+                    pure-Python parser or ``'auto'`` to use libyaml if available; if ``None``, the default
+                    from :py:data:`awesomeyaml.yaml.default_backend` is used (see :py:func:`awesomeyaml.yaml.get_backend`).
+                use_cache : whether files should be parsed using the process-wide cache of parsed files,
+                    see :py:class:`awesomeyaml.cache.ParseCache`.
+                marks : how much information about the position of parsed nodes in their source files
+                    should be kept for error messages, ``'compact'`` and ``'none'`` reduce memory usage
+                    (see :py:func:`awesomeyaml.yaml.get_marks_mode`).
+                executor : an optional ``concurrent.futures.Executor``, if provided, files added with
+                    :py:meth:`add_multiple_sources` (and files included by a single ``!include`` node, see
+                    :py:meth:`add_existing_files`) are read and parsed concurrently using the executor.
+                    Stages are still added in the same order and with the same indices as without the executor.
+                    With a ``ProcessPoolExecutor``, parsed stages are sent back pickled, in this case
+                    the worker processes use their own caches of parsed files and custom tags have to be
+                    registered in them as well (e.g., by the executor's ``initializer``).
         '''
+        self.backend = backend
+        self.use_cache = use_cache
+        self.marks = marks
+        self.executor = executor
         self.stages = []
         self._current_file = None
         self._current_stage = None
@@ -119,8 +140,81 @@ class Builder():
         raw_yaml = sanitize(raw_yaml, 'raw_yaml')
         filename = sanitize(filename, 'filename')
         safe = sanitize(safe, 'safe')
-        for source, raw, fname, sflag in zip(sources, raw_yaml, filename, safe):
-            self.add_source(source, raw_yaml=raw, filename=fname, safe=sflag)
+
+        futures = {}
+        if self.executor is not None:
+            # files (and strings which might be names of files) are parsed concurrently,
+            # other sources are parsed in order when their turn comes
+            files = [i for i, (source, raw) in enumerate(zip(sources, raw_yaml)) if isinstance(source, (str, pathlib.Path)) and not raw]
+            if len(files) > 1:
+                for i in files:
+                    futures[i] = self._submit_parsing([sources[i]], raw_yaml[i], filename[i], safe[i])
+
+        for i, (source, raw, fname, sflag) in enumerate(zip(sources, raw_yaml, filename, safe)):
+            future = futures.get(i)
+            if future is None or not self._add_parsed(future):
+                self.add_source(source, raw_yaml=raw, filename=fname, safe=sflag)
+
+    def add_existing_files(self, candidates, safe=None):
+        ''' For each list of names of files in ``candidates``, adds the first file which exists using :py:meth:`add_source`.
+            Files are added in order, if the builder has been created with an ``executor``, they are read and parsed
+            concurrently.
+
+            Returns:
+                A list of bools, for each list of names, whether any of the files existed.
+        '''
+        futures = [None] * len(candidates)
+        if self.executor is not None and len(candidates) > 1:
+            futures = [self._submit_parsing(names, False, None, safe) for names in candidates]
+
+        found = []
+        for names, future in zip(candidates, futures):
+            result = None if future is None else self._add_parsed(future)
+            if result is None:
+                result = False
+                for name in names:
+                    try:
+                        self.add_source(name, raw_yaml=False, safe=safe)
+                    except FileNotFoundError:
+                        continue
+                    result = True
+                    break
+
+            found.append(result)
+
+        return found
+
+    def _submit_parsing(self, candidates, raw_yaml, filename, safe):
+        ''' Submits parsing of the first existing file from ``candidates`` to the executor, see :py:func:`_parse_first_existing`.
+            Returns a future, or ``None`` if the task could not be submitted.
+        '''
+        from . import yaml
+        settings = (yaml.get_backend(self.backend), self.use_cache, yaml.get_marks_mode(self.marks), self._default_safe_flag)
+        try:
+            return self.executor.submit(_parse_first_existing, candidates, raw_yaml, filename, safe, settings)
+        except Exception:
+            # e.g., the executor has been shut down or its pool is broken, parse in the current thread instead
+            return None
+
+    def _add_parsed(self, future):
+        ''' Adds stages returned by a future submitted with :py:meth:`_submit_parsing`. Returns ``True`` if stages were added,
+            ``False`` if none of the candidate files existed and ``None`` if parsing failed - errors are not reported here,
+            the source should be added again with :py:meth:`add_source` to raise them in the usual way.
+        '''
+        try:
+            found, stages = future.result()
+        except Exception:
+            return None
+        if not found:
+            return found
+
+        # stages were parsed by a new builder, the k-th of them uses k as its index
+        offset = self.get_next_stage_idx()
+        for stage in stages:
+            if offset:
+                Builder._shift_idx(stage, offset)
+            self.stages.append(stage)
+        return True
 
     @errors.api_entry
     def add_source(self, source, raw_yaml=None, filename=None, safe=None):
@@ -159,17 +253,35 @@ class Builder():
             Returns:
                 ``None``
         '''
+        for node in self.parse_source(source, raw_yaml=raw_yaml, filename=filename, safe=safe):
+            if node is not None:
+                self.stages.append(node)
+
+    def parse_source(self, source, raw_yaml=None, filename=None, safe=None):
+        ''' Parses a stream of yaml documents in the same way as :py:meth:`add_source` but yields the parsed documents
+            instead of adding them to the list of stages. Nodes are created as if each document was about to be added
+            as the next stage (see :py:meth:`get_next_stage_idx`), the caller is responsible for adding them (or nodes constructed from them).
+
+            Arguments are the same as in :py:meth:`add_source`.
+        '''
         if raw_yaml and not isinstance(source, str):
             raise ValueError('source is expected to be string and contain yaml to be parsed when raw_yaml is set to True')
 
         if isinstance(source, pathlib.Path):
             source = str(source)
 
+        filepath = None
         if isinstance(source, str) and not raw_yaml:
             try:
-                with open(os.path.expanduser(source), 'r') as f:
+                filepath = os.path.expanduser(source)
+                filestat = os.stat(filepath)
+                if not self.use_cache:
+                    with open(filepath, 'r') as f:
+                        self._current_file = source
+                        source = f.read()
+                    filepath = None
+                else:
                     self._current_file = source
-                    source = f.read()
             except (FileNotFoundError, OSError) as e:
                 #OSError(22) is "Invalid argument"
                 #OSError(36) is "File name too long"
@@ -177,6 +289,7 @@ class Builder():
                     raise
                 if raw_yaml is not None:
                     raise
+                filepath = None
 
         try:
             if filename is not None:
@@ -187,13 +300,83 @@ class Builder():
 
             with ConfigNode.default_safe_flag(safe and self._default_safe_flag):
                 with ConfigNode.default_filename(self._current_file):
-                    from . import yaml
-                    for node in yaml.parse(source, self):
-                        if node is not None:
-                            self.stages.append(node)
+                    if filepath is not None:
+                        yield from self._parse_file(filepath, filestat)
+                    else:
+                        from . import yaml
+                        yield from yaml.parse(source, self, backend=self.backend, marks=self.marks)
         finally:
             self._current_file = None
 
+    def _parse_file(self, filepath, filestat):
+        ''' Parses a file using the process-wide caches of parsed files (see :py:mod:`awesomeyaml.cache`).
+            Yields stages in the same way as :py:func:`awesomeyaml.yaml.parse`.
+        '''
+        from . import yaml
+        from .cache import get_parse_cache, get_disk_cache
+        cache = get_parse_cache()
+        disk_cache = get_disk_cache()
+
+        def read():
+            with open(filepath, 'r') as f:
+                return f.read()
+
+        context = (self._current_file, getattr(ConfigNode._default_safe_flag, 'value', True), yaml.get_backend(self.backend), yaml.get_marks_mode(self.marks))
+        content = None
+        key = None
+        if cache.enabled:
+            if cache.hash_content:
+                content = read()
+            key = cache.make_key(filepath, filestat, content=content, context=context)
+            cached = cache.get(key)
+            if cached is not None:
+                yield from self._restore_stages(cached)
+                return
+
+        if content is None:
+            content = read()
+
+        if key is None and disk_cache is None:
+            yield from yaml.parse(content, self, backend=self.backend, marks=self.marks)
+            return
+
+        cached = None
+        if disk_cache is not None:
+            cached = disk_cache.get(content, context)
+
+        if cached is None:
+            cached = []
+            for stage in yaml.parse(content, self, backend=self.backend, marks=self.marks):
+                if stage is not None:
+                    cached.append((self.get_next_stage_idx(), stage.ayns.clone()))
+                yield stage
+
+            if disk_cache is not None:
+                disk_cache.put(content, context, cached)
+        else:
+            yield from self._restore_stages(cached)
+
+        if key is not None:
+            cache.put(key, cached)
+
+    def _restore_stages(self, cached):
+        for idx, stage in cached:
+            stage = stage.ayns.clone()
+            offset = self.get_next_stage_idx() - idx
+            if offset:
+                Builder._shift_idx(stage, offset)
+            yield stage
+
+    @staticmethod
+    def _shift_idx(stage, offset):
+        from .nodes.composed import ComposedNode
+        nodes = [stage]
+        if isinstance(stage, ComposedNode):
+            nodes = stage.ayns.nodes(include_self=True, allow_duplicates=False)
+        for node in nodes:
+            if node._idx is not None:
+                node._idx += offset
+
     @errors.api_entry
     def build(self):
         ''' Preprocesses all stages and merges them to construct a single config node.
@@ -345,7 +528,7 @@ class SubBuilder(Builder):
                 srcnode : a path to the node requesting the subbuilder (the node exists in parent)
                 parent : a parent Builder
         '''
-        super().__init__()
+        super().__init__(backend=parent.backend, use_cache=parent.use_cache, marks=parent.marks, executor=parent.executor)
         self.requester = srcnode
         self.parent = parent
         self.stage = parent.get_current_stage_idx()
@@ -365,3 +548,26 @@ class SubBuilder(Builder):
 
     def get_lookup_dirs(self, ref_point):
         return self.parent.get_lookup_dirs(ref_point)
+
+
+def _parse_first_existing(candidates, raw_yaml, filename, safe, settings):
+    ''' Parses the first existing source from ``candidates`` with a new builder, see :py:meth:`Builder.add_source`.
+        Returns a pair ``(found, stages)``, where ``found`` is ``False`` if none of the candidates exist
+        and ``None`` if parsing failed. Used by builders with an executor, possibly in a different process.
+    '''
+    backend, use_cache, marks, default_safe_flag = settings
+    builder = Builder(backend=backend, use_cache=use_cache, marks=marks)
+    builder._default_safe_flag = default_safe_flag
+    try:
+        for candidate in candidates:
+            try:
+                builder.add_source(candidate, raw_yaml=raw_yaml, filename=filename, safe=safe)
+            except FileNotFoundError:
+                continue
+            return True, builder.stages
+    except Exception:
+        # errors are raised by the builder which submitted the task, by parsing the source again,
+        # as our errors cannot be sent back from a different process
+        return None, None
+
+    return False, None
@@ -0,0 +1,462 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import sys
+import pickle
+import hashlib
+import tempfile
+import threading
+import collections
+
+
+class _LRUCache():
+    ''' A thread-safe, bounded mapping which evicts the least recently used entries
+        once the number of entries exceeds ``max_size``.
+    '''
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_size > 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, value):
+        if not self.enabled:
+            return
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        ''' Removes all entries from the cache and resets counters.
+        '''
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        ''' Returns a dict with the number of cache hits, misses and the current number of entries.
+        '''
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._entries),
+                'max_size': self.max_size
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class ParseCache(_LRUCache):
+    ''' A process-wide cache of parsed yaml files used by :py:class:`awesomeyaml.Builder`.
+
+        Each entry holds a list of stages (config nodes) obtained by parsing a single file
+        and is identified by the file's normalized path, its modification time and size
+        (and, optionally, a hash of its content). The key also includes all the information
+        which affects the outcome of parsing (e.g., the filename associated with the nodes or the
+        default safe flag), so the same file can be cached multiple times if it is read in different
+        contexts.
+
+        The cached trees are never given away directly - instead, a structural copy of them is
+        returned (see :py:meth:`awesomeyaml.nodes.ConfigNode.ayns.clone`), so that later preprocessing
+        and merging can't affect the content of the cache.
+
+        The least recently used entries are evicted once the number of entries exceeds ``max_size``.
+    '''
+    def __init__(self, max_size=128, hash_content=False):
+        ''' Arguments:
+                max_size : maximum number of files which can be cached at the same time,
+                    ``0`` disables caching altogether
+                hash_content : if ``True``, the content of a file is hashed and included in the key,
+                    this requires reading the file even if it is cached but makes the cache robust to
+                    changes which do not affect the file's mtime and size
+        '''
+        super().__init__(max_size)
+        self.hash_content = hash_content
+
+    @staticmethod
+    def normalize_path(path):
+        return os.path.normcase(os.path.realpath(os.path.expanduser(path)))
+
+    def make_key(self, path, stat, content=None, context=None):
+        ''' Creates a key identifying a parsed file.
+
+            Arguments:
+                path : path to the file
+                stat : result of ``os.stat(path)``
+                content : content of the file, only used if :py:attr:`hash_content` is ``True``
+                context : a tuple of extra (hashable) values which affect parsing
+
+            Returns:
+                A hashable key which can be passed to :py:meth:`get` and :py:meth:`put`.
+        '''
+        content_hash = None
+        if self.hash_content and content is not None:
+            content_hash = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        return (self.normalize_path(path), stat.st_mtime_ns, stat.st_size, content_hash, context)
+
+    def get(self, key):
+        ''' Returns a list of ``(idx, stage)`` pairs stored under ``key``, or ``None`` if the
+            key is not in the cache. ``idx`` is the index of the stage at the moment it was
+            parsed, ``stage`` is the original (cached) node which should not be modified.
+        '''
+        return super().get(key)
+
+
+class CodeCache(_LRUCache):
+    ''' A process-wide cache of code objects used to evaluate ``!eval`` and ``!fstr``
+        nodes (see :py:class:`awesomeyaml.nodes.EvalNode`).
+
+        Each entry holds the code already compiled and patched to access config nodes
+        and is identified by the source code, the file it comes from and Python's version,
+        so evaluating the same expression again does not require compiling it.
+        Code objects are immutable so they are shared between all nodes which use them.
+    '''
+    def __init__(self, max_size=4096):
+        ''' Arguments:
+                max_size : maximum number of code snippets which can be cached at the same time,
+                    ``0`` disables caching altogether
+        '''
+        super().__init__(max_size)
+
+    @staticmethod
+    def make_key(source, filename):
+        return (source, filename, sys.version_info[:2])
+
+
+class DiskCache():
+    ''' An opt-in, persistent cache of parsed yaml files which can be shared between processes.
+
+        Each entry is a pickled list of stages obtained by parsing a single file (the same content
+        as held by :py:class:`ParseCache`) and is stored in a separate file under :py:attr:`directory`.
+        Entries are identified by a hash of the parsed content, the parsing context, awesomeyaml's version
+        and Python's version, so any change to either of them results in a cache miss (stale entries
+        are simply never read again, use :py:meth:`clear` to remove them).
+
+        New entries are written to temporary files which are then atomically moved to their
+        final location, so it is safe for multiple processes to use the same directory concurrently.
+
+        .. warning::
+
+            Entries are loaded with ``pickle``, therefore the cache directory should not be writable
+            by anyone who is not trusted to execute code in processes using the cache.
+    '''
+    suffix = '.ayc'
+
+    def __init__(self, directory=None):
+        ''' Arguments:
+                directory : a directory where the cached entries should be stored, if not provided
+                    ``$XDG_CACHE_HOME/awesomeyaml`` is used (``~/.cache/awesomeyaml`` if the variable is not set)
+        '''
+        if directory is None:
+            directory = os.path.join(os.environ.get('XDG_CACHE_HOME') or '~/.cache', 'awesomeyaml')
+        self.directory = os.path.expanduser(directory)
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, content, context=None):
+        from .version import version
+        h = hashlib.sha256()
+        h.update(repr((version, sys.version_info[:2], pickle.HIGHEST_PROTOCOL, context)).encode('utf-8'))
+        h.update(content.encode('utf-8'))
+        return h.hexdigest()
+
+    def _get_path(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, content, context=None):
+        ''' Returns a list of ``(idx, stage)`` pairs (see :py:meth:`ParseCache.get`) obtained
+            by parsing ``content`` within ``context``, or ``None`` if the entry does not exist.
+        '''
+        path = self._get_path(self.make_key(content, context))
+        try:
+            with open(path, 'rb') as f:
+                ret = pickle.load(f)
+        except Exception:
+            # missing, corrupted or incompatible entry,
+            # in the last two cases it will be overwritten by put
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return ret
+
+    def put(self, content, context, stages):
+        ''' Stores ``stages`` obtained by parsing ``content`` within ``context``.
+            Failing to write an entry is not considered an error.
+        '''
+        path = self._get_path(self.make_key(content, context))
+        tmp = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-', suffix=self.suffix)
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(stages, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+            tmp = None
+        except (OSError, pickle.PicklingError):
+            pass
+        finally:
+            if tmp is not None:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+
+    def clear(self):
+        ''' Removes all entries stored in :py:attr:`directory` and resets counters.
+        '''
+        self.hits = 0
+        self.misses = 0
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return
+
+        for name in names:
+            if name.endswith(self.suffix):
+                try:
+                    os.unlink(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'directory': self.directory
+        }
+
+
+class _ImportCachesHook():
+    ''' A meta path finder which never finds anything, added to ``sys.meta_path`` only to be notified
+        when ``importlib.invalidate_caches`` is called.
+    '''
+    generation = 0
+
+    @staticmethod
+    def find_spec(fullname, path=None, target=None):
+        return None
+
+    @classmethod
+    def invalidate_caches(cls):
+        cls.generation += 1
+
+    @classmethod
+    def install(cls):
+        if cls not in sys.meta_path:
+            sys.meta_path.append(cls)
+
+
+class ImportCache(_LRUCache):
+    ''' A process-wide cache of symbols resolved by :py:func:`awesomeyaml.utils.import_name`.
+
+        A successfully resolved symbol is stored together with the last module which had to
+        be imported to find it (and the attributes which were then accessed), a cached entry
+        is only used if the same module object is still present in ``sys.modules`` - otherwise
+        the symbol is resolved again. Attributes are always looked up, so changes to modules
+        (e.g., monkey-patching) are respected.
+
+        Failed resolutions are also cached (as the error message which would be reported), so repeated
+        attempts to resolve a missing symbol do not import anything nor construct any exception chains.
+        They are resolved again after ``sys.path`` changes, a module named by a prefix of the symbol is
+        added to or replaced in ``sys.modules``, or ``importlib.invalidate_caches()`` is called (which
+        Python itself requires to find modules created after the interpreter started).
+        Attributes added to existing modules are not detected, :py:meth:`clear` can be used in such cases.
+
+        The least recently used entries are evicted once the number of entries exceeds ``max_size``.
+    '''
+    missing = object()
+
+    def __init__(self, max_size=1024):
+        ''' Arguments:
+                max_size : maximum number of symbols which can be cached at the same time,
+                    ``0`` disables caching altogether
+        '''
+        super().__init__(max_size)
+
+    @staticmethod
+    def _get_import_state(symbol):
+        elements = symbol.split('.')
+        modules = tuple(sys.modules.get('.'.join(elements[:i])) for i in range(1, len(elements) + 1))
+        return (_ImportCachesHook.generation, tuple(sys.path), modules)
+
+    def get(self, symbol):
+        ''' Returns the object cached under ``symbol`` or :py:attr:`missing` if ``symbol`` needs
+            to be resolved. Raises ``ImportError`` if resolving ``symbol`` is known to fail.
+        '''
+        with self._lock:
+            entry = self._entries.get(symbol)
+
+        # attributes are accessed without holding the lock, as it might run arbitrary code
+        if entry is not None:
+            resolved, *data = entry
+            if resolved:
+                module_name, module, attrs = data
+                if sys.modules.get(module_name) is module:
+                    try:
+                        ret = module
+                        for attr in attrs:
+                            ret = getattr(ret, attr)
+                    except AttributeError:
+                        pass
+                    else:
+                        self._hit(symbol)
+                        return ret
+            else:
+                msg, state = data
+                if state == self._get_import_state(symbol):
+                    self._hit(symbol)
+                    raise ImportError(msg)
+
+        with self._lock:
+            if entry is not None and self._entries.get(symbol) is entry:
+                del self._entries[symbol]
+            self.misses += 1
+        return ImportCache.missing
+
+    def _hit(self, symbol):
+        with self._lock:
+            if symbol in self._entries:
+                self._entries.move_to_end(symbol)
+            self.hits += 1
+
+    def put(self, symbol, module_name, module, attrs):
+        ''' Records that ``symbol`` can be found by accessing ``attrs`` (a tuple of names)
+            of ``module``, which is imported as ``module_name``.
+        '''
+        super().put(symbol, (True, module_name, module, tuple(attrs)))
+
+    def put_failed(self, symbol, msg):
+        ''' Records that resolving ``symbol`` fails with ``ImportError(msg)``.
+        '''
+        if self.enabled:
+            _ImportCachesHook.install()
+        super().put(symbol, (False, msg, self._get_import_state(symbol)))
+
+    def stats(self):
+        ''' Returns a dict with the number of cache hits, misses, the current number of entries
+            and the number of entries recording failures.
+        '''
+        with self._lock:
+            failed = sum(1 for entry in self._entries.values() if not entry[0])
+        ret = super().stats()
+        ret['failed'] = failed
+        return ret
+
+
+_parse_cache = ParseCache()
+_disk_cache = None
+_code_cache = CodeCache()
+_import_cache = ImportCache()
+
+
+def get_parse_cache():
+    ''' Returns the process-wide :py:class:`ParseCache` object used by builders.
+    '''
+    return _parse_cache
+
+
+def set_parse_cache(cache):
+    ''' Replaces the process-wide :py:class:`ParseCache` object used by builders,
+        ``None`` can be used to disable caching.
+    '''
+    global _parse_cache
+    if cache is None:
+        cache = ParseCache(max_size=0)
+    if not isinstance(cache, ParseCache):
+        raise TypeError('ParseCache or None expected')
+    _parse_cache = cache
+
+
+def get_disk_cache():
+    ''' Returns the process-wide :py:class:`DiskCache` object used by builders, or ``None`` if
+        the on-disk cache is disabled (default).
+    '''
+    return _disk_cache
+
+
+def set_disk_cache(cache):
+    ''' Sets the process-wide :py:class:`DiskCache` object used by builders. ``cache`` can be
+        a :py:class:`DiskCache` object, a path to the cache directory, ``True`` to use the default
+        directory, or ``None``/``False`` to disable the on-disk cache.
+    '''
+    global _disk_cache
+    if cache is None or cache is False:
+        cache = None
+    elif cache is True:
+        cache = DiskCache()
+    elif isinstance(cache, (str, os.PathLike)):
+        cache = DiskCache(os.fspath(cache))
+    elif not isinstance(cache, DiskCache):
+        raise TypeError('DiskCache, str, bool or None expected')
+    _disk_cache = cache
+
+
+def get_code_cache():
+    ''' Returns the process-wide :py:class:`CodeCache` object used by eval nodes.
+    '''
+    return _code_cache
+
+
+def set_code_cache(cache):
+    ''' Replaces the process-wide :py:class:`CodeCache` object used by eval nodes,
+        ``None`` can be used to disable caching.
+    '''
+    global _code_cache
+    if cache is None:
+        cache = CodeCache(max_size=0)
+    if not isinstance(cache, CodeCache):
+        raise TypeError('CodeCache or None expected')
+    _code_cache = cache
+
+
+def get_import_cache():
+    ''' Returns the process-wide :py:class:`ImportCache` object used by :py:func:`awesomeyaml.utils.import_name`.
+    '''
+    return _import_cache
+
+
+def set_import_cache(cache):
+    ''' Replaces the process-wide :py:class:`ImportCache` object used by :py:func:`awesomeyaml.utils.import_name`,
+        ``None`` can be used to disable caching.
+    '''
+    global _import_cache
+    if cache is None:
+        cache = ImportCache(max_size=0)
+    if not isinstance(cache, ImportCache):
+        raise TypeError('ImportCache or None expected')
+    _import_cache = cache
@@ -12,11 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import copy
 import collections.abc as cabc
 
+from .nodes.node import ConfigNode
+from .nodes.composed import ComposedNode
 from .nodes.dict import ConfigDict
-from .eval_context import EvalContext
+from .eval_context import EvalContext, LazyBunch
 from .namespace import namespace, NamespaceableMeta
 from .utils import Bunch
 from .nodes.required import RequiredNode
@@ -27,10 +28,14 @@ from . import yaml
 class Config(Bunch, metaclass=NamespaceableMeta):
     ''' A class representing parsed and evaluated config dictionary.
     '''
-    def __init__(self, config_dict=None, eval_ctx=None):
+    def __init__(self, config_dict=None, eval_ctx=None, previous=None, keep_results=None):
         ''' Arguments:
                 config_dict : `dict` or unevaluated `awesomeyaml.nodes.ConfigDict`, `None`
                     represents an empty dict.
+                eval_ctx : an optional `awesomeyaml.EvalContext` used to evaluate ``config_dict``
+                previous : optional `awesomeyaml.eval_context.EvalResults` of a previous evaluation,
+                    used to evaluate ``config_dict`` incrementally (see `awesomeyaml.EvalContext.evaluate`)
+                keep_results : if not ``None``, overrides ``keep_results`` of ``eval_ctx`` for this evaluation
         '''
         if config_dict is not None and not isinstance(config_dict, dict):
             raise ValueError('dict or None expected')
@@ -41,11 +46,14 @@ class Config(Bunch, metaclass=NamespaceableMeta):
         if config_dict:
             Config.check_missing(config_dict)
             self._source = config_dict
-            pre_evaluate = copy.deepcopy(config_dict)
+            # evaluation does not modify the evaluated tree, so there is no need to copy it
+            # (unless some nodes have to be removed)
+            pre_evaluate = Config._remove_hidden(config_dict)
             if eval_ctx is None:
                 eval_ctx = EvalContext()
-            evaluated = eval_ctx.evaluate(pre_evaluate)
+            evaluated = eval_ctx.evaluate(pre_evaluate, previous=previous, keep_results=keep_results)
             self._user_data = eval_ctx.user_data
+            self._results = eval_ctx.results
         else:
             evaluated = {}
 
@@ -53,17 +61,27 @@ class Config(Bunch, metaclass=NamespaceableMeta):
 
     @classmethod
     @errors.api_entry
-    def build(cls, *sources, raw_yaml=None, filename=None, eval_ctx=None):
+    def build(cls, *sources, raw_yaml=None, filename=None, eval_ctx=None, lazy=False, incremental=False):
         ''' Builds a config from the provided yaml sources and evaluates it, returning `awesomeyaml.Config` object.
 
             Arguments:
                 *sources : a list of yaml sources - that can include file-like objects, filenames and strings of yaml
                 raw_yaml : 
+                lazy : if ``True``, nodes are not evaluated until they are accessed and
+                    `awesomeyaml.config.LazyConfig` object is returned instead
+                incremental : if ``True``, results of evaluation are kept so that the config can be
+                    overridden later without evaluating unchanged nodes again, see :py:meth:`override`
         '''
         from .builder import Builder
         b = Builder()
         b.add_multiple_sources(*sources, raw_yaml=raw_yaml, filename=filename)
-        return Config(b.build(), eval_ctx=eval_ctx)
+        return cls._make_config(b.build(), eval_ctx=eval_ctx, lazy=lazy, incremental=incremental)
+
+    @staticmethod
+    def _make_config(config_dict, eval_ctx=None, lazy=False, incremental=False):
+        if lazy:
+            return LazyConfig(config_dict, eval_ctx=eval_ctx)
+        return Config(config_dict, eval_ctx=eval_ctx, keep_results=True if incremental else None)
 
     @classmethod
     def process_cmdline(cls, args, filename_lookup_fn=None, default_inline_tag='!notnew'):
@@ -71,90 +89,344 @@ class Config(Bunch, metaclass=NamespaceableMeta):
         filenames = []
         raw_yamls = []
 
-        def determine_option_type(option):
-            option = option.strip()
-            if '\n' in option or (option.startswith('{') and option.endswith('}')):
-                return 'raw'
+        for i, src in enumerate(args):
+            yaml, filename, raw_yaml = cls._process_cmdline_option(i+1, src, filename_lookup_fn, default_inline_tag)
+            yamls.append(yaml)
+            filenames.append(filename)
+            raw_yamls.append(raw_yaml)
+
+        return yamls, filenames, raw_yamls
+
+    @staticmethod
+    def _get_cmdline_option_type(option):
+        option = option.strip()
+        if '\n' in option or (option.startswith('{') and option.endswith('}')):
+            return 'raw'
+
+        if '=' in option:
+            return 'inline'
 
-            if '=' in option:
-                return 'inline'
+        return 'file'
 
-            return 'file'
+    @classmethod
+    def _process_cmdline_option(cls, idx, option, filename_lookup_fn, default_inline_tag):
+        opt_type = cls._get_cmdline_option_type(option)
+        assert opt_type in ['inline', 'raw', 'file'], f'Unexpected option type deduced: {opt_type}'
+
+        if opt_type == 'inline':
+            key, value = [o.strip() for o in option.split('=', maxsplit=1)]
+            yaml, _ = cls._get_inline_yaml(key, value, default_inline_tag)
+            filename = f'<Commandline argument #{idx}>'
+            raw_yaml = True
+        elif opt_type == 'raw':
+            yaml = option
+            filename = f'<Commandline argument #{idx}>'
+            raw_yaml = True
+        elif opt_type == 'file':
+            yaml = option.strip()
+            if filename_lookup_fn is not None:
+                yaml = filename_lookup_fn(yaml)
+            filename = yaml
+            raw_yaml = False
+        else:
+            raise RuntimeError(f'Unexpected deduced option type: {opt_type}')
+
+        return yaml, filename, raw_yaml
+
+    @staticmethod
+    def _get_inline_yaml(key, value, default_inline_tag):
+        ''' Returns yaml setting ``key`` to ``value`` for an inline command line option, together with
+            a list of columns at which the mappings created for the consecutive parts of the key (each containing
+            the next part), the names and, as the last element, the value start in the returned yaml.
+        '''
+        yaml = '{ '
+        if key[0] != '!' and default_inline_tag:
+            yaml = default_inline_tag + ' { '
+
+        columns = []
+        ind = 0
+        for part in key.split('.'):
+            if ind:
+                yaml += ' { '
+
+            part = part.strip()
+
+            indices = []
+            while part.endswith(']'):
+                b = part.rfind('[')
+                index = int(part[b+1:-1])
+                part = part[:b]
+                indices.insert(0, index)
+
+            columns.append((len(yaml) - 2, len(yaml)))
+            yaml += part + ': '
+            ind += 1
+            for i in indices:
+                columns.append((len(yaml), len(yaml) + 2))
+                yaml += f'{{ {i}: '
+                ind += 1
+
+        columns.append(len(yaml))
+        yaml += value
+        yaml += ' '
+        yaml += '}' * ind
+        return yaml, columns
 
+    @staticmethod
+    def _get_cmdline_path(key):
+        ''' Splits the key of an inline command line option into a tuple of names, or returns ``None``
+            if some of the names could not be used without parsing them as yaml (e.g., tagged or quoted names,
+            or names which would be parsed as something else than a string or an int).
+        '''
+        if key[0] == '!':
+            return None
+
+        path = []
+        for part in key.split('.'):
+            part = part.strip()
+
+            indices = []
+            while part.endswith(']'):
+                b = part.rfind('[')
+                index = part[b+1:-1].strip()
+                if not index.isdigit():
+                    return None
+                part = part[:b]
+                indices.insert(0, int(index))
+
+            if part.isdigit():
+                if part != '0' and part[0] == '0':
+                    return None
+                path.append(int(part))
+            elif part.isidentifier() and yaml.get_implicit_tag(part) == 'tag:yaml.org,2002:str':
+                path.append(part)
+            else:
+                return None
 
-        def append(idx, option):
-            opt_type = determine_option_type(option)
-            assert opt_type in ['inline', 'raw', 'file'], f'Unexpected option type deduced: {opt_type}'
+            path.extend(indices)
 
-            if opt_type == 'inline':
+        return tuple(path)
+
+    @classmethod
+    def _add_cmdline_sources(cls, builder, args, filename_lookup_fn=None, default_inline_tag='!notnew', batch=True):
+        ''' Adds sources given in the format used by :py:meth:`build_from_cmdline` to ``builder``.
+
+            Produces the same result as adding sources returned by :py:meth:`process_cmdline`, but consecutive
+            inline options (``key=value``) are added as a single stage, which is constructed directly from
+            the keys - only values are parsed as yaml - and merged in a single pass. Each node of the stage
+            keeps the name of the option which created it as its source file and its position in the yaml
+            which would be produced for the option by :py:meth:`process_cmdline`.
+
+            Options are batched only if the result of merging them does not depend on whether they
+            are merged together or one by one, i.e., if none of them overwrites a node set by another option
+            and nodes would be merged in the same order. All other options, including options with tagged keys
+            and options whose values are not standalone yaml values, are added as separate stages.
+            If ``batch`` is ``False``, all options are added as separate stages.
+        '''
+        stage = None
+        last = None
+        prefixes = None
+        marks = yaml.get_marks_mode(builder.marks)
+
+        def flush():
+            nonlocal stage
+            if stage is not None:
+                builder.stages.append(stage)
+                stage = None
+
+        def parse_value(value, column, filename):
+            # values which fail to parse are not batched, so that the error is reported as by process_cmdline
+            if yaml.is_simple_scalar(value):
+                try:
+                    node, = builder.parse_source(value, raw_yaml=True, filename=filename)
+                except errors.ParsingError:
+                    return None
+                node._pyyaml_node = yaml.make_position(filename, column, marks)
+                return node
+
+            # other values are parsed in the same (flow) context as in process_cmdline,
+            # indented so that their positions match
+            try:
+                nodes = [node for node in builder.parse_source(' ' * (column - 5) + f'{{ v: {value} }}', raw_yaml=True, filename=filename) if node is not None]
+            except errors.ParsingError:
+                return None
+            if len(nodes) != 1 or not isinstance(nodes[0], ConfigDict) or list(nodes[0].keys()) != ['v']:
+                return None
+            return nodes[0].ayns.remove_child('v')
+
+        def can_batch(path):
+            if stage is None:
+                return True
+            common = 0
+            while common < len(path) and common < len(last) and path[common] == last[common]:
+                common += 1
+            # the new node can only be added next to the most recently added one,
+            # otherwise it would be merged earlier than some of the previous options
+            return common < len(path) and common < len(last) and path[:common+1] not in prefixes
+
+        for idx, option in enumerate(args, 1):
+            path = None
+            if batch and cls._get_cmdline_option_type(option) == 'inline':
                 key, value = [o.strip() for o in option.split('=', maxsplit=1)]
-                yaml = '{ '
-                if key[0] != '!' and default_inline_tag:
-                    yaml = default_inline_tag + ' { '
-
-                ind = 0
-                for part in key.split('.'):
-                    if ind:
-                        yaml += ' { '
-
-                    part = part.strip()
-
-                    indices = []
-                    while part.endswith(']'):
-                        b = part.rfind('[')
-                        index = int(part[b+1:-1])
-                        part = part[:b]
-                        indices.insert(0, index)
-
-                    yaml += part + ': '
-                    ind += 1
-                    for i in indices:
-                        yaml += f'{{ {i}: '
-                        ind += 1
-
-                yaml += value
-                yaml += ' '
-                yaml += '}' * ind
+                path = cls._get_cmdline_path(key)
+
+            if path is not None:
+                if not can_batch(path):
+                    flush()
 
                 filename = f'<Commandline argument #{idx}>'
-                raw_yaml = True
-            elif opt_type == 'raw':
-                yaml = option
-                filename = f'<Commandline argument #{idx}>'
-                raw_yaml = True
-            elif opt_type == 'file':
-                yaml = option.strip()
-                if filename_lookup_fn is not None:
-                    yaml = filename_lookup_fn(yaml)
-                filename = yaml
-                raw_yaml = False
-            else:
-                raise RuntimeError(f'Unexpected deduced option type: {opt_type}')
+                _, columns = cls._get_inline_yaml(key, value, default_inline_tag)
+                value = parse_value(value, columns[-1], filename)
+                if value is None:
+                    path = None
+
+            if path is None:
+                flush()
+                source, filename, raw_yaml = cls._process_cmdline_option(idx, option, filename_lookup_fn, default_inline_tag)
+                builder.add_source(source, raw_yaml=raw_yaml, filename=filename)
+                continue
+
+            stage_idx = builder.get_next_stage_idx()
+            if stage is None:
+                root = [node for node in builder.parse_source(f'{default_inline_tag} {{}}' if default_inline_tag else '{}', raw_yaml=True, filename=filename) if node is not None]
+                if len(root) != 1 or type(root[0]) is not ConfigDict:
+                    # the default tag does not produce a plain dict, do not batch
+                    source, filename, raw_yaml = cls._process_cmdline_option(idx, option, filename_lookup_fn, default_inline_tag)
+                    builder.add_source(source, raw_yaml=raw_yaml, filename=filename)
+                    continue
+                stage = root[0]
+                prefixes = set()
+
+            def make_node(value, column):
+                return ConfigNode(value, source_file=filename, idx=stage_idx, pyyaml_node=yaml.make_position(filename, column, marks))
+
+            # children are added in the same way as when dicts are constructed by the parser,
+            # i.e., without checking if their names would shadow attributes of ConfigDict
+            node = stage
+            for i, name in enumerate(path[:-1]):
+                child = node.ayns.get_child(name)
+                if child is None:
+                    child = ComposedNode.ayns.set_child(node, make_node(name, columns[i][1]), make_node({}, columns[i+1][0]))
+                    prefixes.add(path[:i+1])
+                node = child
+
+            ComposedNode.ayns.set_child(node, make_node(path[-1], columns[-2][1]), value)
+            prefixes.add(path)
+            last = path
+
+        flush()
 
-            yamls.append(yaml)
-            filenames.append(filename)
-            raw_yamls.append(raw_yaml)
+    @classmethod
+    @errors.api_entry
+    def build_from_cmdline(cls, *sources, filename_lookup_fn=None, eval_ctx=None, lazy=False, incremental=False):
+        ''' Builds a config from command line arguments, which can be names of files, yaml strings or inline
+            options in the form ``key=value``, where ``key`` is a dot-separated path to a node which should be set to ``value``
+            (e.g., ``model.layers[0].channels=16``). Inline options are applied with the ``!notnew`` tag, unless
+            their key is explicitly tagged.
 
-        for i, src in enumerate(args):
-            append(i+1, src)
+            Consecutive inline options are merged together as a single stage, see :py:meth:`_add_cmdline_sources`.
 
-        return yamls, filenames, raw_yamls
+            Arguments:
+                *sources : command line arguments to process
+                filename_lookup_fn : an optional function used to map names of files to their paths
+                eval_ctx, lazy, incremental : the same as in :py:meth:`build`
+        '''
+        from .builder import Builder
+        config_dict = cls._build_cmdline_sources(Builder, sources, filename_lookup_fn=filename_lookup_fn)
+        return cls._make_config(config_dict, eval_ctx=eval_ctx, lazy=lazy, incremental=incremental)
 
     @classmethod
-    def build_from_cmdline(cls, *sources, filename_lookup_fn=None, eval_ctx=None):
-        yamls, filenames, raw_yamls = cls.process_cmdline(sources, filename_lookup_fn=filename_lookup_fn)
-        return cls.build(*yamls, raw_yaml=raw_yamls, filename=filenames, eval_ctx=eval_ctx)
+    def _build_cmdline_sources(cls, make_builder, sources, filename_lookup_fn=None):
+        ''' Adds ``sources`` given in the format used by :py:meth:`build_from_cmdline` to a builder returned by
+            ``make_builder`` and builds them. If batched inline options fail to merge, they are added again
+            as separate stages to a new builder, so that the raised error is the same as if the options were
+            given to :py:meth:`build` one by one (nodes shared by batched options only keep the source of
+            the first of them).
+        '''
+        b = make_builder()
+        cls._add_cmdline_sources(b, sources, filename_lookup_fn=filename_lookup_fn)
+        try:
+            return b.build()
+        except errors.MergeError:
+            b = make_builder()
+            cls._add_cmdline_sources(b, sources, filename_lookup_fn=filename_lookup_fn, batch=False)
+            return b.build()
+
+    @namespace('ayns')
+    def override(self, *sources, raw_yaml=None, filename=None, eval_ctx=None):
+        ''' Merges the provided yaml sources on top of the source of this config and returns
+            a new `awesomeyaml.Config` object, evaluated incrementally - i.e., only the nodes
+            which have changed and nodes depending on them are evaluated, values of all other nodes
+            are taken from this config (without copying them).
+            Functions of unchanged ``!call`` nodes are therefore not called again.
+
+            Incremental evaluation requires this config to have been built with ``incremental=True``
+            (or evaluated by a context with ``keep_results`` set), otherwise the new config
+            is evaluated from scratch. The returned config can itself be overridden incrementally.
+
+            Arguments are the same as in :py:meth:`build`.
+        '''
+        b = self.ayns._get_override_builder()
+        b.add_multiple_sources(*sources, raw_yaml=raw_yaml, filename=filename)
+        return self.ayns._override_with(b.build(), eval_ctx=eval_ctx)
+
+    @namespace('ayns')
+    def override_from_cmdline(self, *sources, filename_lookup_fn=None, eval_ctx=None):
+        ''' The same as :py:meth:`override` but accepts sources in the format used by :py:meth:`build_from_cmdline`.
+        '''
+        config_dict = self._build_cmdline_sources(self.ayns._get_override_builder, sources, filename_lookup_fn=filename_lookup_fn)
+        return self.ayns._override_with(config_dict, eval_ctx=eval_ctx)
+
+    @namespace('ayns')
+    def _get_override_builder(self):
+        from .builder import Builder
+        b = Builder()
+        source = getattr(self, '_source', None)
+        if source is not None:
+            b.stages.append(source.ayns.clone())
+        return b
+
+    @namespace('ayns')
+    def _override_with(self, config_dict, eval_ctx=None):
+        return Config(config_dict, eval_ctx=eval_ctx, previous=getattr(self, '_results', None), keep_results=True)
 
     @staticmethod
     def check_missing(cfg):
         missing = []
-        for path, node in cfg.ayns.nodes_with_paths():
+        for path, node in cfg.ayns.walk(include_self=False, copy_paths=False):
             if isinstance(node, RequiredNode):
                 missing.append(repr(path))
 
         if missing:
             raise ValueError('The following required nodes have not been set:\n    ' + '\n    '.join(missing))
 
+    @staticmethod
+    def _remove_hidden(cfg, inplace=False):
+        ''' Returns ``cfg`` without children of dicts whose names start with ``_`` (at any level).
+            Such nodes can be used when building a config (e.g., to hold anchors or values merged
+            into other nodes) but are not evaluated. Unless ``inplace`` is ``True``, ``cfg`` is not modified
+            and it is only copied if it contains any hidden nodes.
+        '''
+        hidden = []
+        memo = set()
+        stack = [((), cfg)]
+        while stack:
+            path, node = stack.pop()
+            for name, child in node.ayns.named_children():
+                if isinstance(name, str) and name.startswith('_'):
+                    hidden.append(path + (name,))
+                elif child._is_composed() and id(child) not in memo:
+                    # nodes which appear more than once are only visited once, removing
+                    # their children once is enough
+                    memo.add(id(child))
+                    stack.append((path + (name,), child))
+
+        if hidden and not inplace:
+            cfg = cfg.ayns.clone()
+        for path in hidden:
+            cfg.ayns.remove_node(list(path))
+        return cfg
+
     @namespace('ayns')
     @property
     def source(self):
@@ -333,3 +605,60 @@ def config_representer(dumper, value):
 
 yaml.yaml.add_representer(Config, config_representer)
 yaml.yaml.add_representer(Bunch, config_representer)
+
+
+class LazyConfig(LazyBunch, metaclass=NamespaceableMeta):
+    ''' A read-only counterpart of :py:class:`Config` which evaluates nodes only when they are accessed,
+        either directly or by being referenced by other nodes, see :py:class:`awesomeyaml.eval_context.LazyBunch`.
+        Nested dicts are returned as :py:class:`awesomeyaml.eval_context.LazyBunch` objects.
+
+        This is useful if only a small part of a config is used and evaluating other
+        parts would be expensive (e.g., because of ``!call`` nodes constructing big objects).
+    '''
+    __slots__ = ('_source', '_user_data')
+
+    def __init__(self, config_dict=None, eval_ctx=None):
+        ''' Arguments:
+                config_dict : `dict` or unevaluated `awesomeyaml.nodes.ConfigDict`, `None`
+                    represents an empty dict.
+                eval_ctx : `awesomeyaml.EvalContext` used to evaluate nodes, it should not
+                    be used for anything else as long as the returned object is in use.
+        '''
+        if config_dict is not None and not isinstance(config_dict, dict):
+            raise ValueError('dict or None expected')
+
+        if not isinstance(config_dict, ConfigDict):
+            config_dict = ConfigDict(config_dict)
+
+        Config.check_missing(config_dict)
+        self._source = config_dict
+        # nodes are evaluated later so take a snapshot of the tree in case the source is modified in the meantime
+        pre_evaluate = Config._remove_hidden(config_dict.ayns.clone(), inplace=True)
+        if eval_ctx is None:
+            eval_ctx = EvalContext()
+        root = eval_ctx.evaluate_lazy(pre_evaluate)
+        self._user_data = eval_ctx.user_data
+        super().__init__(root._eval_ctx, root._cfgobj, root._path)
+
+    @namespace('ayns')
+    @property
+    def source(self):
+        ''' The source `awesomeyaml.nodes.ConfigDict` which is evaluated by this `LazyConfig`.
+        '''
+        return self._source
+
+    @namespace('ayns')
+    @property
+    def user_data(self):
+        ''' The user data of the `awesomeyaml.EvalContext` object used to evaluate nodes.
+        '''
+        return self._user_data
+
+    @namespace('ayns')
+    def get_node(self, *path):
+        from .nodes.composed import NodePath
+        path = NodePath.get_list_path(*path)
+        ret = self
+        for component in path:
+            ret = ret[component]
+        return ret
@@ -55,11 +55,29 @@ def api_entry(fn):
     return impl
 
 
+@contextlib.contextmanager
+def api_entered():
+    ''' Marks the current thread as being inside an API call, which is used by worker threads
+        running on behalf of another API call - errors are then rethrown only once, by the original call.
+    '''
+    old = getattr(_api_entered, 'value', False)
+    _api_entered.value = True
+    try:
+        yield
+    finally:
+        _api_entered.value = old
+
+
 def _get_mark_or_fallback_str(aynode):
     if aynode is None:
         return None
-    if aynode._pyyaml_node is not None:
-        return aynode._pyyaml_node.start_mark
+    position = aynode._pyyaml_node
+    if position is not None:
+        if isinstance(position, tuple):
+            # compact form: (filename, line, column), see awesomeyaml.yaml.get_marks_mode
+            name, line, column = position
+            return yaml.error.Mark(name, None, line, column, None, None)
+        return position.start_mark
     return f'<A node from file: {aynode._source_file!r}>'
 
 
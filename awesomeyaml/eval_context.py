@@ -13,14 +13,214 @@
 # limitations under the License.
 
 from .nodes.node import ConfigNode
+from .nodes.composed import ComposedNode
+from .nodes.dict import ConfigDict
 from .nodes.node_path import NodePath
+from .graph import DependencyGraph
 from .namespace import NamespaceableMeta
 from .utils import Bunch
 from . import errors
 from . import utils
 
 import copy
+import threading
 import contextlib
+import concurrent.futures
+import collections.abc as cabc
+
+
+def _get_calls_dependencies(graph):
+    ''' Returns a dict mapping paths of ``!call`` nodes in ``graph`` (a :py:class:`awesomeyaml.graph.DependencyGraph`)
+        to sets of paths of other calls which have to be evaluated before them (directly or through other nodes),
+        or to ``None`` if a call should not be evaluated out of order.
+    '''
+    calls = set(graph.calls)
+    ret = {}
+    for call in graph.calls:
+        if call not in graph.reorderable:
+            ret[call] = None
+            continue
+
+        deps = set()
+        visited = set()
+        stack = list(graph.get_dependencies(call))
+        while stack:
+            path = stack.pop()
+            if path in visited:
+                continue
+            visited.add(path)
+            if path in calls:
+                deps.add(path)
+            else:
+                stack.extend(graph.get_dependencies(path))
+
+        ret[call] = deps
+
+    return ret
+
+
+def _is_same_node(old, new):
+    ''' Returns True if ``old`` and ``new`` would be evaluated in the same way, without considering their children.
+    '''
+    if type(old) is not type(new) or old.ayns.safe != new.ayns.safe:
+        return False
+    if old._source_file != new._source_file or old._metadata != new._metadata:
+        return False
+    if getattr(old, '__dict__', None) != getattr(new, '__dict__', None):
+        return False
+    if isinstance(new, ComposedNode):
+        return True
+    return old._get_native_value() == new._get_native_value()
+
+
+def _get_changes(old, new):
+    ''' Compares two config trees and returns a pair of sets ``(changed, modified)``, where ``changed``
+        contains paths of nodes in ``new`` which are different than in ``old`` (including their subtrees),
+        or were removed, and ``modified`` contains paths of composed nodes whose children were added,
+        removed or reordered (but which are otherwise the same, with any changes to their children
+        reported separately).
+    '''
+    changed = set()
+    modified = set()
+    stack = [((), old, new)]
+    while stack:
+        path, old_node, new_node = stack.pop()
+        if not _is_same_node(old_node, new_node):
+            changed.add(path)
+            continue
+        if not isinstance(new_node, ComposedNode):
+            continue
+
+        old_children = dict(old_node.ayns.named_children())
+        new_children = dict(new_node.ayns.named_children())
+        if list(old_children) != list(new_children):
+            modified.add(path)
+        for name, child in new_children.items():
+            if name in old_children:
+                stack.append((path + (name,), old_children[name], child))
+            else:
+                changed.add(path + (name,))
+        changed.update(path + (name,) for name in old_children if name not in new_children)
+
+    return changed, modified
+
+
+def _get_dirty_nodes(graph, changed, modified):
+    ''' Returns a set of paths of nodes in ``graph`` whose values might be different than before
+        the changes described by ``changed`` and ``modified`` (see :py:func:`_get_changes`).
+        This includes nodes which contain any of the changes, nodes within changed subtrees,
+        and all nodes which depend on them (transitively).
+    '''
+    affected = set(path[:i] for path in changed | modified for i in range(len(path)+1))
+    dependants = {}
+    dirty = []
+    for path in graph.nodes:
+        for dep in graph.get_dependencies(path):
+            dependants.setdefault(dep, []).append(path)
+        if path in affected or any(path[:i] in changed for i in range(len(path))):
+            dirty.append(path)
+        elif path in graph.unresolved or (path in graph.references and graph.references[path] is None):
+            dirty.append(path)
+
+    ret = set(dirty)
+    while dirty:
+        path = dirty.pop()
+        for dependant in dependants.get(path, ()):
+            if dependant not in ret:
+                ret.add(dependant)
+                dirty.append(dependant)
+
+    return ret
+
+
+class EvalResults():
+    ''' Results of evaluating a config with :py:meth:`EvalContext.evaluate`, kept by contexts created
+        with ``keep_results=True``. They can be passed back to :py:meth:`EvalContext.evaluate` to evaluate
+        a modified version of the config without evaluating unchanged nodes again.
+
+        Attributes:
+            source : the evaluated `awesomeyaml.nodes.ConfigDict`
+            values : a dict mapping paths (tuples) of evaluated nodes to their values
+            graph : :py:class:`awesomeyaml.graph.DependencyGraph` of ``source``
+    '''
+    __slots__ = ('source', 'values', 'graph')
+
+    def __init__(self, source, values, graph):
+        self.source = source
+        self.values = values
+        self.graph = graph
+
+
+class LazyBunch():
+    ''' A read-only mapping exposing evaluated children of a :py:class:`awesomeyaml.nodes.ConfigDict`
+        which are only evaluated when accessed for the first time, see :py:meth:`EvalContext.evaluate_lazy`.
+
+        Children which are plain dicts (i.e., they would evaluate to a dict of their evaluated children)
+        are exposed as nested :py:class:`LazyBunch` objects, all other children are evaluated as a whole.
+        Evaluated values are cached by the underlying :py:class:`EvalContext`, so each node is evaluated
+        at most once, regardless of whether it is accessed directly or referenced by other nodes.
+        Note that referencing a node from other nodes (e.g., ``!xref`` or names used by ``!eval``)
+        evaluates the referenced node as a whole, as in the non-lazy case.
+    '''
+    __slots__ = ('_eval_ctx', '_cfgobj', '_path')
+
+    def __init__(self, eval_ctx, cfgobj, path):
+        self._eval_ctx = eval_ctx
+        self._cfgobj = cfgobj
+        self._path = path
+
+    @staticmethod
+    def _is_plain_dict(node):
+        return isinstance(node, ConfigDict) and type(node).ayns.on_evaluate_impl is ConfigDict.ayns.on_evaluate_impl
+
+    def __getitem__(self, key):
+        child = dict.__getitem__(self._cfgobj, key)
+        if LazyBunch._is_plain_dict(child):
+            return LazyBunch(self._eval_ctx, child, self._path + [key])
+        return self._eval_ctx.evaluate_node(child, self._path + [key])
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(f'Object {type(self).__name__!r} does not have attribute {name!r}') from None
+
+    def __contains__(self, key):
+        return dict.__contains__(self._cfgobj, key)
+
+    def __iter__(self):
+        # keys are not evaluated with the context, as that would overwrite cached values of the root node
+        for key in dict.__iter__(self._cfgobj):
+            yield key._get_native_value() if isinstance(key, ConfigNode) else key
+
+    def __len__(self):
+        return dict.__len__(self._cfgobj)
+
+    def __eq__(self, other):
+        if not isinstance(other, cabc.Mapping):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __repr__(self):
+        return f'<{type(self).__name__} with keys {list(self)!r}>'
+
+    def get(self, key, default=None):
+        if key not in self:
+            return default
+        return self[key]
+
+    def keys(self):
+        return list(self)
+
+    def items(self):
+        return [(key, self[key]) for key in self]
+
+    def values(self):
+        return [self[key] for key in self]
+
+    __hash__ = None
+
+cabc.Mapping.register(LazyBunch)
 
 
 class EvalContext(metaclass=NamespaceableMeta):
@@ -66,28 +266,45 @@ class EvalContext(metaclass=NamespaceableMeta):
                 del self[name]
 
         def get_or_set(self, key):
-            return self.setdefault(key, EvalContext.PartialChild(self._path + [key], self._eval_ctx, self._cfgobj[key]))
+            try:
+                return dict.__getitem__(self, key)
+            except KeyError:
+                ret = EvalContext.PartialChild(self._path + [key], self._eval_ctx, self._cfgobj[key])
+                dict.__setitem__(self, key, ret)
+                return ret
 
     _default_eval_symbols = {}
 
-    def __init__(self, eval_symbols=None):
+    def __init__(self, eval_symbols=None, executor=None, keep_results=False):
         ''' Arguments:
                 eval_symbols : a dict containing symbols which can be used when evaluating
                     ``config_dict``. The values from this argument will be used to update
                     the defaults from :py:meth:`get_default_eval_symbols`.
+                executor : an optional ``concurrent.futures.Executor`` using threads, if provided
+                    :py:meth:`evaluate` runs functions of independent ``!call`` nodes concurrently,
+                    see :py:meth:`evaluate` for more details.
+                keep_results : if ``True``, :py:meth:`evaluate` stores :py:class:`EvalResults` in
+                    :py:attr:`results`, which can be used to evaluate a modified config incrementally.
         '''
         self._cfg = None
         self._ecfg = None
+        self._graph = None
         self._removed_nodes = {}
         self._eval_cache = {}
         self._eval_cache_id = {}
+        self._eval_containers = {}
         self._eval_symbols = copy.copy(EvalContext._default_eval_symbols)
         if eval_symbols:
             self._eval_symbols.update(eval_symbols)
 
         self._require_all_safe = False
         self._eval_stack = []
+        self._eval_active = {}
+        self._executor = executor
+        self._lock = None
 
+        self.keep_results = keep_results
+        self.results = None
         self.user_data = None
 
     @property
@@ -104,6 +321,13 @@ class EvalContext(metaclass=NamespaceableMeta):
 
         return self._ecfg
 
+    @property
+    def graph(self):
+        if self._graph is None:
+            raise ValueError('Missing _graph attribute - method called outside the call to .evaluate(config_dict), or the graph is not used by the context (see .evaluate)?')
+
+        return self._graph
+
     @contextlib.contextmanager
     def require_all_safe(self, node, path):
         old, self._require_all_safe = self._require_all_safe, True
@@ -117,10 +341,26 @@ class EvalContext(metaclass=NamespaceableMeta):
 
     def get_node(self, *path, **kwargs):
         path = NodePath.get_list_path(*path)
-        if str(path) in self._eval_cache:
-            return self._eval_cache[str(path)]
+        key = tuple(path)
+        if key in self._eval_cache:
+            return self._eval_cache[key]
         return self.cfg.ayns.get_node(path, **kwargs)
 
+    def _get_evaluated_container(self, key):
+        ''' Returns a :py:class:`PartialChild` object which will hold evaluated children
+            of the node at path ``key`` (a tuple). Containers are cached by their paths so
+            the partially evaluated tree is only walked when a container is requested for the
+            first time (and then only the missing part of it).
+        '''
+        container = self._eval_containers.get(key)
+        if container is None:
+            parent = self._get_evaluated_container(key[:-1])
+            assert isinstance(parent, EvalContext.PartialChild)
+            container = parent.get_or_set(key[-1])
+            self._eval_containers[key] = container
+
+        return container
+
     @errors.api_entry
     def evaluate_node(self, cfgobj, prefix=None):
         if not isinstance(cfgobj, ConfigNode):
@@ -134,51 +374,247 @@ class EvalContext(metaclass=NamespaceableMeta):
                 raise errors.UnsafeError(f'Note: the current context requires all evaluated nodes to be safe - see chained exceptions for more information', cfgobj, str(prefix))
 
         if id(cfgobj) in self._eval_cache_id:
+            self._eval_stack.pop()
             return self._eval_cache_id[id(cfgobj)]
 
-        evaluated_parent = None
-        if prefix:
-            enode = self.ecfg
-            for p in prefix[:-1]:
-                assert isinstance(enode, EvalContext.PartialChild)
-                enode = enode.get_or_set(p)
+        if id(cfgobj) in self._eval_active:
+            cycle = self._eval_stack[self._eval_active[id(cfgobj)]:]
+            chain = ' -> '.join(repr(NodePath.get_str_path(p) or '<top-level node>') for p in cycle)
+            raise errors.EvalError(f'Nodes form a cycle of dependencies: {chain}', cfgobj, str(prefix))
 
-            evaluated_parent = enode
+        key = tuple(prefix)
+        evaluated_parent = None
+        if key:
+            evaluated_parent = self._get_evaluated_container(key[:-1])
+            assert isinstance(evaluated_parent, EvalContext.PartialChild)
 
-        evaluated_cfgobj = cfgobj.ayns.on_evaluate(prefix, self)
+        self._eval_active[id(cfgobj)] = len(self._eval_stack) - 1
+        try:
+            evaluated_cfgobj = cfgobj.ayns.on_evaluate(prefix, self)
+        finally:
+            del self._eval_active[id(cfgobj)]
         if evaluated_parent is not None:
-            evaluated_parent[prefix[-1]] = evaluated_cfgobj
+            evaluated_parent[key[-1]] = evaluated_cfgobj
+            # the container (if any) has just been replaced by the final value
+            self._eval_containers.pop(key, None)
 
-        self._eval_cache[str(prefix)] = evaluated_cfgobj
+        self._eval_cache[key] = evaluated_cfgobj
         self._eval_cache_id[utils.persistent_id(cfgobj)] = evaluated_cfgobj
         self._eval_stack.pop()
         return evaluated_cfgobj
 
+    def call(self, func, *args, **kwargs):
+        ''' Calls ``func`` with the provided arguments on behalf of a ``!call`` node.
+            If calls are evaluated concurrently, other calls can be evaluated while ``func`` runs.
+        '''
+        lock = self._lock
+        if lock is None:
+            return func(*args, **kwargs)
+
+        state = (self._eval_stack, self._eval_active, self._require_all_safe)
+        lock.release()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            lock.acquire()
+            self._eval_stack, self._eval_active, self._require_all_safe = state
+
+    def _evaluate_call(self, node, path):
+        with self._lock, errors.api_entered():
+            self._eval_stack = []
+            self._eval_active = {}
+            self._require_all_safe = False
+            self.evaluate_node(node, path)
+
+    def _evaluate_calls_concurrently(self, graph):
+        ''' Evaluates independent ``!call`` nodes of the current config using ``self._executor``.
+            Nodes are evaluated while holding ``self._lock``, which is only released when
+            the functions are called (see :py:meth:`call`), and the results are stored in
+            the evaluation cache, to be used when evaluating the config as usual.
+        '''
+        deps = _get_calls_dependencies(graph)
+        dependants = { call: [] for call in graph.calls }
+        for call, call_deps in deps.items():
+            for dep in call_deps or ():
+                dependants[dep].append(call)
+
+        order = { call: idx for idx, call in enumerate(graph.calls) }
+        pending = { call: set(call_deps) for call, call_deps in deps.items() if call_deps is not None }
+        running = {}
+        failed = {}
+        self._lock = threading.Lock()
+        try:
+            while True:
+                if not failed:
+                    for call in sorted((call for call, call_deps in pending.items() if not call_deps), key=order.get):
+                        del pending[call]
+                        running[self._executor.submit(self._evaluate_call, graph.nodes[call], list(call))] = call
+                if not running:
+                    break
+
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    call = running.pop(future)
+                    if future.exception() is not None:
+                        failed[order[call]] = future.exception()
+                        continue
+                    for dependant in dependants[call]:
+                        if dependant in pending:
+                            pending[dependant].discard(call)
+        finally:
+            concurrent.futures.wait(running)
+            self._lock = None
+
+        if failed:
+            # report the same error regardless of the order in which calls have finished
+            raise failed[min(failed)]
+
+    def _reuse_results(self, previous, graph):
+        ''' Populates the evaluation cache with values from ``previous`` (:py:class:`EvalResults`)
+            for all nodes of the current config which would evaluate to the same values.
+            Values of plain dicts and lists are not reused (they are evaluated again from the reused
+            values of their children) so that different configs do not share mutable containers.
+        '''
+        changed, modified = _get_changes(previous.source, self._cfg)
+        dirty = _get_dirty_nodes(graph, changed, modified)
+        prefixes = set(path[:i] for path in changed | modified | dirty for i in range(len(path)+1))
+        values = previous.values
+
+        def reuse(path, node):
+            try:
+                value = values[path]
+            except KeyError:
+                return
+            self._eval_cache[path] = value
+            self._eval_cache_id[utils.persistent_id(node)] = value
+
+        stack = [((), self._cfg)]
+        while stack:
+            path, node = stack.pop()
+            if path in changed:
+                continue
+            if path not in prefixes and not node._is_plain_composed():
+                reuse(path, node)
+            elif isinstance(node, ComposedNode):
+                stack.extend((path + (name,), child) for name, child in node.ayns.named_children())
+
+        # referenced nodes might be within reused nodes
+        for path, node in graph.nodes.items():
+            if path not in prefixes and not node._is_plain_composed() and not any(path[:i] in changed for i in range(len(path))):
+                reuse(path, node)
+
+    def _evaluate_references(self, graph):
+        ''' Evaluates referenced nodes of the current config in a topological order, so that
+            following references never requires evaluating long chains of other references recursively.
+            Only nodes which do not run any code are evaluated, so that functions of ``!call`` nodes
+            (and code of other nodes) are still run in the usual order.
+        '''
+        targets = graph.get_targets() & graph.reorderable & graph.pure
+        for path in graph.order:
+            if path in targets:
+                self.evaluate_node(graph.nodes[path], list(path))
+
     @errors.api_entry
-    def evaluate(self, config_dict):
+    def evaluate(self, config_dict, previous=None, keep_results=None):
         ''' Arguments:
                 config_dict : a `awesomeyaml.nodes.ConfigDict` object to be evaluated,
                             to construct a single `ConfigDict` from multiple sources
                             `awesomeyaml.builder.Builder` can be used.
+                            The object is not modified by evaluation.
+                previous : optional :py:class:`EvalResults` of evaluating a similar config (e.g., the same
+                            config before applying some overrides), see below.
+                keep_results : if not ``None``, overrides :py:attr:`keep_results` for this call.
             Returns:
                 `awesomeyaml.utils.Bunch` representing evaluated config node.
+
+            Nodes are evaluated in the order in which they appear in the config, following references
+            as they are encountered. Cycles of references are reported with `awesomeyaml.errors.EvalError`.
+
+            If the context has been created with an ``executor``, or results are kept or reused (see below),
+            dependencies between nodes are first extracted into a :py:class:`awesomeyaml.graph.DependencyGraph`
+            (available as :py:attr:`graph` during evaluation), which is used to detect cycles up front
+            and to evaluate referenced nodes in a topological order - so that following long chains of references
+            does not require evaluating them recursively - before the rest of the config is evaluated as usual.
+            Only nodes which do not run any code (e.g., plain values and ``!xref`` nodes, see
+            :py:attr:`awesomeyaml.graph.DependencyGraph.pure`) are evaluated ahead, so the order in which
+            functions of ``!call`` nodes are run does not change.
+
+            If the context has been created with an ``executor``, the graph is also used to find
+            independent ``!call`` nodes, whose functions are run concurrently using the executor.
+            The rest of the evaluation is done as usual, so the result is the same as without the executor,
+            although functions might be called in a different order.
+            Calls which might evaluate ``!unsafe`` nodes, or which depend on nodes whose dependencies cannot
+            be determined (e.g., ``!eval`` nodes using ``ayns``), are always evaluated in the usual order.
+            If more than one concurrently evaluated call fails, the error from the one which comes first
+            in the config is raised.
+
+            If ``previous`` results are provided, ``config_dict`` is compared with the previously evaluated
+            config and only the nodes which have changed, and nodes which depend on them (following the
+            dependency graph), are evaluated - values of all other nodes are reused, without copying.
+            This includes nodes whose evaluation has side effects, e.g., functions of unchanged ``!call``
+            nodes are not called again. Nodes whose dependencies cannot be determined are always evaluated.
+            The previous config should not be modified after it was evaluated and should be evaluated
+            with the same symbols.
         '''
         self._cfg = config_dict
         self._ecfg = EvalContext.PartialChild(NodePath(), self, self._cfg)
         self._eval_cache.clear()
         self._eval_cache_id.clear()
+        self._eval_containers.clear()
+        self._eval_containers[()] = self._ecfg
         self.user_data = Bunch()
 
+        self.results = None
+        if keep_results is None:
+            keep_results = self.keep_results
+
         try:
+            if previous is not None or self._executor is not None or keep_results:
+                self._graph = DependencyGraph(self._cfg, self._eval_symbols)
+                self._graph.check_cycles()
+                if previous is not None:
+                    self._reuse_results(previous, self._graph)
+                if self._executor is not None:
+                    self._evaluate_calls_concurrently(self._graph)
+                self._evaluate_references(self._graph)
             ret = self.evaluate_node(self.cfg)
+            if keep_results:
+                self.results = EvalResults(self._cfg, self._eval_cache, self._graph)
+                self._eval_cache = {}
         finally:
+            self._graph = None
             self._eval_cache.clear()
             self._eval_cache_id.clear()
+            self._eval_containers.clear()
             self._cfg = None
             self._ecfg = None
 
         return ret
 
+    @errors.api_entry
+    def evaluate_lazy(self, config_dict):
+        ''' Similar to :py:meth:`evaluate` but instead of evaluating ``config_dict`` immediately,
+            returns a :py:class:`LazyBunch` object which evaluates nodes when they are accessed
+            (either directly or by being referenced from other nodes).
+
+            The returned object keeps using this context, so the context should not be used
+            to evaluate any other config afterwards. Nodes are never evaluated concurrently
+            in this mode, even if the context has been created with an ``executor``.
+
+            Arguments:
+                config_dict : a `awesomeyaml.nodes.ConfigDict` object to be evaluated
+            Returns:
+                `awesomeyaml.eval_context.LazyBunch` representing the config node.
+        '''
+        self._cfg = config_dict
+        self._ecfg = EvalContext.PartialChild(NodePath(), self, self._cfg)
+        self._eval_cache.clear()
+        self._eval_cache_id.clear()
+        self._eval_containers.clear()
+        self._eval_containers[()] = self._ecfg
+        self.user_data = Bunch()
+        return LazyBunch(self, config_dict, NodePath())
+
     @staticmethod
     def set_default_eval_symbols(symbols):
         ''' Sets the default symbols available to use when evaluating nodes.
@@ -0,0 +1,237 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from .nodes.composed import ComposedNode
+from .nodes.call import CallNode
+from .nodes.scalar import ConfigScalar, ConfigScalarMarker
+from .nodes.xref import XRefNode
+from .nodes.node_path import NodePath
+from . import errors
+
+
+def _is_pure(node):
+    ''' Returns True if evaluating ``node`` (excluding its children and referenced nodes) does not run
+        any code which might have side effects, i.e., ``node`` is a plain scalar, dict or list, or an ``!xref`` node.
+    '''
+    if isinstance(node, ConfigScalarMarker):
+        return type(node) is ConfigScalar(node._dyn_base) or type(node) is XRefNode
+    return node._is_plain_composed()
+
+
+class DependencyGraph():
+    ''' A graph of dependencies between nodes of a config, extracted statically (i.e., without evaluating anything).
+
+        The graph includes the root node, all nodes which reference other nodes (``!xref`` nodes and
+        names used by ``!eval`` and ``!fstr`` nodes, see :py:meth:`awesomeyaml.nodes.ConfigNode._get_references`),
+        all referenced nodes, as well as ``!call`` and ``!unsafe`` nodes. Nodes are identified by their paths (tuples).
+
+        A node depends on the nodes it references and on the closest nodes of the graph within its subtree
+        (as evaluating a node evaluates its children), the latter are called the node's children.
+        References are either definite (i.e., the referenced nodes are always evaluated together with the node,
+        e.g., ``!xref``) or possible (e.g., names used in an ``!eval`` node, which might not be evaluated at all).
+        Cycles of definite dependencies are errors, see :py:meth:`check_cycles`.
+
+        Attributes:
+            nodes : a dict mapping paths to nodes, in the order in which nodes appear in the config
+            children : a dict mapping paths to lists of paths of the node's children, in the order
+                in which they are evaluated
+            references : a dict mapping paths to lists of referenced paths, or ``None`` if the referenced
+                nodes cannot be determined statically (e.g., an ``!eval`` node using ``ayns``),
+                only includes nodes which reference other nodes
+            definite : a set of paths of nodes whose references are definite
+            unresolved : a dict mapping paths to lists of referenced paths which do not exist in the config
+            unsafe : a set of paths of ``!unsafe`` nodes, excluding nodes within other ``!unsafe`` nodes
+            calls : a list of paths of ``!call`` nodes, in the order in which they appear in the config
+    '''
+    def __init__(self, cfgobj, eval_symbols=None):
+        ''' Arguments:
+                cfgobj : a `awesomeyaml.nodes.ConfigDict` to analyse
+                eval_symbols : a dict of symbols available when evaluating ``cfgobj`` (names of symbols
+                    used by ``!eval`` and ``!fstr`` nodes do not refer to nodes in the config)
+        '''
+        eval_symbols = eval_symbols or {}
+        self.root = cfgobj
+        self.nodes = {}
+        self.children = {}
+        self.references = {}
+        self.unresolved = {}
+        self.definite = set()
+        self.unsafe = set()
+        self.calls = []
+        self._order = None
+        self._reorderable = None
+        self._pure = None
+
+        found = {}
+        impure = []
+        memo = set()
+        stack = [((), cfgobj, False)]
+        while stack:
+            path, node, in_unsafe = stack.pop()
+            refs, definite = node._get_references(eval_symbols)
+            if not _is_pure(node):
+                impure.append(path)
+            is_call = isinstance(node, CallNode) and id(node) not in memo
+            if is_call:
+                memo.add(id(node))
+                self.calls.append(path)
+            if not in_unsafe and not node.ayns.safe:
+                # only the top-most unsafe nodes are recorded
+                in_unsafe = True
+                self.unsafe.add(path)
+                found[path] = node
+            if refs is None or refs or is_call:
+                found[path] = node
+                if refs is None or refs:
+                    # references are resolved once all nodes have been found
+                    self.references[path] = refs
+                    if definite:
+                        self.definite.add(path)
+            if isinstance(node, ComposedNode):
+                stack.extend((path + (name,), child, in_unsafe) for name, child in reversed(list(node.ayns.named_children())))
+
+        found[()] = cfgobj
+        for path, refs in self.references.items():
+            if refs is None:
+                continue
+            resolved = []
+            for ref in refs:
+                ref = tuple(ref)
+                if ref not in found:
+                    target = cfgobj.ayns.get_node(ref, incomplete=None)
+                    if target is None:
+                        # a missing node, evaluation will fail in the usual way
+                        self.unresolved.setdefault(path, []).append(ref)
+                        continue
+                    found[ref] = target
+                resolved.append(ref)
+            self.references[path] = resolved
+
+        # paths of nodes whose subtrees contain code which might be run when evaluating them
+        self._impure = set(path[:i] for path in impure for i in range(len(path)+1))
+
+        # walk the tree again, only visiting ancestors of the found nodes, to order them and find their children
+        prefixes = set(path[:i] for path in found for i in range(len(path)))
+        stack = [((), cfgobj, None)]
+        while stack:
+            path, node, parent = stack.pop()
+            if path in found:
+                self.nodes[path] = node
+                self.children[path] = []
+                if parent is not None:
+                    self.children[parent].append(path)
+                parent = path
+            if path in prefixes:
+                stack.extend((path + (name,), child, parent) for name, child in reversed(list(node.ayns.named_children())))
+
+    def get_dependencies(self, path):
+        ''' Returns a list of paths of nodes which might be evaluated when evaluating node under ``path``
+            (which has to be in the graph), excluding nodes further down the dependency chain.
+            Nodes whose references are unknown are treated as if they had no references.
+        '''
+        return self.children[path] + (self.references.get(path) or [])
+
+    def _get_definite_dependencies(self, path):
+        if path in self.definite:
+            return self.get_dependencies(path)
+        return self.children[path]
+
+    def _dfs(self, get_deps):
+        ''' Visits all nodes reachable from the root, returns a pair ``(order, cycle)`` where ``order``
+            is a list of paths in post-order (dependencies before dependants) and ``cycle`` is a list
+            of paths forming the first cycle found (or ``None``).
+        '''
+        order = []
+        cycle = None
+        done = set()
+        active = {}
+        stack = [((), iter(get_deps(())))]
+        active[()] = 0
+        while stack:
+            path, deps = stack[-1]
+            for dep in deps:
+                if dep in done:
+                    continue
+                if dep in active:
+                    if cycle is None:
+                        cycle = [p for p, _ in stack[active[dep]:]] + [dep]
+                    continue
+                active[dep] = len(stack)
+                stack.append((dep, iter(get_deps(dep))))
+                break
+            else:
+                stack.pop()
+                del active[path]
+                done.add(path)
+                order.append(path)
+
+        return order, cycle
+
+    def check_cycles(self):
+        ''' Raises `awesomeyaml.errors.EvalError` if the config contains a cycle of definite dependencies,
+            e.g., an ``!xref`` node referencing its parent, which would make evaluation impossible.
+        '''
+        _, cycle = self._dfs(self._get_definite_dependencies)
+        if cycle is not None:
+            chain = ' -> '.join(repr(NodePath.get_str_path(p) or '<top-level node>') for p in cycle)
+            raise errors.EvalError(f'Nodes form a cycle of dependencies: {chain}', self.nodes[cycle[-1]], NodePath.get_str_path(cycle[-1]))
+
+    @property
+    def order(self):
+        ''' A list of paths of nodes in a topological order, i.e., each node comes after the nodes it depends on.
+            Otherwise, nodes are ordered in the same way as they would be evaluated without the graph.
+            Cycles of possible dependencies are broken arbitrarily (but deterministically).
+        '''
+        if self._order is None:
+            self._order, _ = self._dfs(self.get_dependencies)
+        return self._order
+
+    @property
+    def reorderable(self):
+        ''' A set of paths of nodes which can be evaluated before any other nodes without changing the result,
+            i.e., nodes which do not depend (transitively) on ``!unsafe`` nodes nor on nodes with unknown references.
+            Evaluating a node which might evaluate an ``!unsafe`` node earlier than usual could change the outcome
+            of the checks done by ``!call``, ``!bind`` and ``!eval`` nodes.
+        '''
+        if self._reorderable is None:
+            self._reorderable = set()
+            for path in self.order:
+                if path in self.references and self.references[path] is None:
+                    continue
+                if any(path[:i] in self.unsafe for i in range(len(path)+1)):
+                    continue
+                if all(dep in self._reorderable for dep in self.get_dependencies(path)):
+                    self._reorderable.add(path)
+        return self._reorderable
+
+    @property
+    def pure(self):
+        ''' A set of paths of nodes whose evaluation does not run any code which might have side effects
+            (e.g., functions of ``!call`` nodes or code of ``!eval`` nodes), including evaluation of their
+            subtrees and the nodes they depend on (transitively). Evaluating such nodes earlier than usual
+            does not change the order in which any code is run.
+        '''
+        if self._pure is None:
+            self._pure = set()
+            for path in self.order:
+                if path in self._impure:
+                    continue
+                if all(dep in self._pure for dep in self.get_dependencies(path)):
+                    self._pure.add(path)
+        return self._pure
+
+    def get_targets(self):
+        ''' Returns a set of paths of all referenced nodes.
+        '''
+        return set(ref for refs in self.references.values() if refs for ref in refs)
@@ -12,11 +12,55 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import operator
+
+
+# bumped whenever a namespaceable class is modified after its creation,
+# invalidates all cached namespace resolutions
+_generation = 0
+
+# attributes of namespace objects which can't be used as endpoints
+_namespace_attrs = frozenset(['_cls', '_name', '_names', '_cache', '_namespace', '_orig_namespace', '_inst'])
+
+
+class _BoundEndpoint():
+    ''' A descriptor used by the types generated by :py:meth:`Namespace._update_cache`,
+        forwards accesses to a bound namespace to the relevant endpoint bound to the
+        namespace's object.
+    '''
+    __slots__ = ('_endpoint',)
+
+    def __init__(self, endpoint):
+        self._endpoint = endpoint
+
+    def __get__(self, bound, cls=None):
+        if bound is None:
+            return self
+        inst = bound[0]
+        return self._endpoint.__get__(inst, type(inst))
+
+
+class _BoundPropertyEndpoint(_BoundEndpoint):
+    ''' Same as :py:class:`_BoundEndpoint` but calls the getter of a property directly.
+    '''
+    __slots__ = ('_fget',)
+
+    def __init__(self, endpoint):
+        super().__init__(endpoint)
+        self._fget = endpoint.fget
+
+    def __get__(self, bound, cls=None):
+        if bound is None:
+            return self
+        return self._fget(bound[0])
+
+
 class Namespace():
     def __init__(self, cls, name, names):
         self._cls = cls
         self._name = name
         self._names = names
+        self._cache = None
 
     def __repr__(self):
         return f'<Namespace {self._cls.__name__}.{self._name} with type {type(self).__name__!r} at 0x{id(self):02x}>'
@@ -24,7 +68,10 @@ class Namespace():
     def __get__(self, inst, cls=None):
         if inst is None:
             return self
-        return Namespace.Bind(self, inst)
+        cache = self._cache
+        if cache is None or cache[0] != _generation:
+            cache = self._update_cache()
+        return cache[2]((inst,))
 
     def __set__(self, inst, value):
         raise AttributeError("can't set namespace")
@@ -32,18 +79,52 @@ class Namespace():
     def __delete__(self, inst):
         raise AttributeError("can't delete namespace")
 
-    def _resolve_endpoint(self, name):
-        for cls in self._cls.__mro__:
+    def _update_cache(self):
+        ''' Resolves all endpoints visible through the namespace (taking into account
+            namespaces with the same name defined in base classes) and creates a type
+            used to bind the namespace to objects.
+        '''
+        generation = _generation
+        endpoints = {}
+        for cls in reversed(self._cls.__mro__):
             namespace = cls.__dict__.get(self._name, None)
             if namespace is None or not isinstance(namespace, Namespace):
                 continue
+            endpoints.update(namespace._names)
+
+        attrs = {
+            '__slots__': (),
+            '_cls': self._cls,
+            '_name': self._name,
+            '_names': self._names,
+            '_namespace': self
+        }
+        for name, endpoint in endpoints.items():
+            if name.startswith('__') or name in _namespace_attrs or not hasattr(endpoint, '__get__'):
+                continue
+            if isinstance(endpoint, property) and type(endpoint).__get__ is property.__get__ and endpoint.fget is not None:
+                attrs[name] = _BoundPropertyEndpoint(endpoint)
+            else:
+                attrs[name] = _BoundEndpoint(endpoint)
 
-            if name in namespace._names:
-                return namespace._names[name]
+        bound_type = type(f'{type(self).Bind.__name__}[{self._cls.__name__}.{self._name}]', (type(self).Bind,), attrs)
+        self._cache = (generation, endpoints, bound_type)
+        return self._cache
 
-        raise AttributeError(f'{self!r} does not have attribute {name!r}')
+    def _resolve_endpoint(self, name):
+        cache = self._cache
+        if cache is None or cache[0] != _generation:
+            cache = self._update_cache()
+        try:
+            return cache[1][name]
+        except KeyError:
+            raise AttributeError(f'{self!r} does not have attribute {name!r}') from None
 
     def __getattr__(self, name):
+        if name in _namespace_attrs:
+            # attributes of the namespace object itself
+            # should not be looked up in the namespace
+            raise AttributeError(name)
         endpoint = self._resolve_endpoint(name)
         return endpoint.__get__(None, self._cls)
 
@@ -53,11 +134,23 @@ class Namespace():
 
         return super().__setattr__(name, value)
 
-class BoundNamespace(Namespace):
-    def __init__(self, namespace, inst):
-        super().__init__(namespace._cls, namespace._name, namespace._names)
-        self._orig_namespace = namespace
-        self._inst = inst
+
+class BoundNamespace(tuple, Namespace):
+    ''' A namespace bound to an object. Instances are created by :py:meth:`Namespace.__get__`
+        using a type derived from this class, specific to each namespace, which exposes
+        the namespace's endpoints as class-level descriptors.
+
+        The object is stored as the only element of a tuple, this way creating a bound
+        namespace does not involve any Python-level code.
+    '''
+    __slots__ = ()
+    __init__ = tuple.__init__
+    _inst = property(operator.itemgetter(0))
+
+    @property
+    def _orig_namespace(self):
+        # accessed through the type, otherwise the namespace would bind itself to self
+        return type(self)._namespace
 
     def __repr__(self):
         return f'<Bound namespace {self._cls.__name__}.{self._name} with type {type(self._orig_namespace).__name__!r} of {self._inst!r}>'
@@ -68,17 +161,19 @@ class BoundNamespace(Namespace):
 
     def __setattr__(self, name, value):
         if not name.startswith('_'):
-            error = False
             try:
-                endpoint = self._resolve_endpoint(value)
+                endpoint = self._resolve_endpoint(name)
             except AttributeError:
-                error = True
+                endpoint = None
 
-            if not error:
+            if endpoint is not None:
                 return endpoint.__set__(self._inst, value)
 
         return super().__setattr__(name, value)
 
+    def _resolve_endpoint(self, name):
+        return self._orig_namespace._resolve_endpoint(name)
+
 Namespace.Bind = BoundNamespace
 
 
@@ -168,11 +263,23 @@ class NamespaceableMeta(type):
 
         for namespace_name, namespace_values in namespaces.items():
             namespace_type = namespace_values.pop(None)
-            setattr(cls, namespace_name, namespace_type(cls, namespace_name, namespace_values))
+            # a new class cannot affect any existing resolution, so there is no need
+            # to invalidate caches here
+            super().__setattr__(namespace_name, namespace_type(cls, namespace_name, namespace_values))
             for name, value in namespace_values.items():
                 # we need to take care of fields like '__module__'
                 if name is not None and name in cls.__dict__ and not name.startswith('__'):
-                    delattr(cls, name)
+                    super().__delattr__(name)
+
+    def __setattr__(cls, name, value):
+        global _generation
+        _generation += 1
+        super().__setattr__(name, value)
+
+    def __delattr__(cls, name):
+        global _generation
+        _generation += 1
+        super().__delattr__(name)
 
 
 class Namespaceable(metaclass=NamespaceableMeta):
@@ -60,7 +60,7 @@ class CallNode(FunctionNode):
         with ctx.require_all_safe(self, path):
             args = ConfigDict.ayns.on_evaluate_impl(self, path, ctx)
         p, kw_p, kw = FunctionNode._resolve_args(_func, args)
-        return _func(*p, **kw_p, **kw)
+        return ctx.call(_func, *p, **kw_p, **kw)
 
     @namespace('ayns')
     @property
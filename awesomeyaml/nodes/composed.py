@@ -14,11 +14,16 @@
 
 from .node import ConfigNode
 from ..namespace import Namespace, staticproperty
-from ..utils import notnone_or
+from ..utils import notnone_or, persistent_id
 from .node_path import NodePath
 
 
 class ComposedNode(ConfigNode):
+    # returned by "leave" functions passed to ayns.walk to remove nodes
+    REMOVE = object()
+
+    _composed_slots = ConfigNode._node_slots + ('_notnew_summary',)
+
     def __init__(self, children, nodes_memo=None, **kwargs):
         super().__init__(**kwargs)
         kwargs.pop('idx', None)
@@ -29,12 +34,14 @@ class ComposedNode(ConfigNode):
         kwargs.update(self._get_child_kwargs())
         nodes_memo = nodes_memo if nodes_memo is not None else {}
         self._children = { name: ConfigNode(child, **kwargs, nodes_memo=nodes_memo) for name, child in children.items() } # pylint: disable=unexpected-keyword-arg
+        contains = ConfigNode._contains_notnew(self) or any(child._contains_notnew() for child in self._children.values())
+        self._notnew_summary = (ConfigNode._notnew_epoch.value << 1) | contains
 
     class ayns(Namespace):
         def set_child(self, name, value):
-            value = ConfigNode(value, **self._get_child_kwargs())
+            value = self._make_child(value)
             self._children[name] = value
-            value._propagate_implicit_values()
+            self._on_child_added(value)
             return value
 
         def remove_child(self, name):
@@ -56,9 +63,12 @@ class ComposedNode(ConfigNode):
             return self._children.get(name, default)
 
         def has_child(self, name):
-            if '_children' not in self.__dict__:
+            try:
+                # avoid __getattr__ of derived classes, which might call has_child again
+                children = object.__getattribute__(self, '_children')
+            except AttributeError:
                 return False
-            return name in self._children
+            return name in children
 
         @staticmethod
         def _get_node(root, access_fn, query_fn, *path, intermediate=False, names=False, incomplete=None):
@@ -159,59 +169,192 @@ class ComposedNode(ConfigNode):
         def replace_node(self, new_node, *path):
             raise NotImplementedError()
 
+        def walk(self, prefix=None, enter=None, leave=None, include_self=True, recursive=True, allow_duplicates=True, copy_paths=True):
+            ''' Walks the subtree depth-first, using an explicit stack, and yields ``(path, node)`` pairs in pre-order.
+
+                The cost is linear in the number of visited nodes (plus the cost of copying paths, see below)
+                and does not depend on the depth of the tree.
+
+                Inputs:
+                    - `prefix` path of ``self``, paths of other nodes are constructed by appending names of their ancestors
+                    - `enter` optional function called as ``enter(path, node)`` for each visited node (in pre-order, after it has
+                        been yielded), if it returns False, children of the node are not visited
+                    - `leave` optional function called as ``leave(path, node)`` for each visited node after its children have been
+                        visited (post-order), it can return a node which should replace ``node`` in its parent, or `ComposedNode.REMOVE`
+                        to remove ``node`` from its parent (``None`` and ``node`` leave it unchanged). Changes are applied
+                        after all children of the parent have been visited. The value returned for ``self`` is ignored.
+                        Note that the function is only called if the returned generator is exhausted.
+                    - `include_self` whether ``self`` should be visited
+                    - `recursive` if False, only children of ``self`` are visited (in addition to ``self``)
+                    - `allow_duplicates` if False, nodes which appear in the tree more than once are only visited once
+                    - `copy_paths` if True, each path is a new `NodePath` object, otherwise the same object is yielded (and passed
+                        to ``enter`` and ``leave``) for all nodes and updated as the walk progresses - this avoids constructing paths
+                        when they are not needed (or only needed for a few nodes) but requires the caller to copy the path
+                        if it should be kept
+            '''
+            path = NodePath(NodePath.get_list_path(prefix, check_types=False) or [])
+            memo = set()
+            remove = ComposedNode.REMOVE
+
+            def _children(node):
+                if leave is not None:
+                    # the node might be modified by the caller before its children are visited
+                    return iter(list(node._children.items()))
+                return iter(node._children.items())
+
+            descend = True
+            if include_self:
+                memo.add(id(self))
+                p = NodePath(path) if copy_paths else path
+                yield p, self
+                if enter is not None:
+                    descend = enter(p, self) is not False
+
+            # frames are [node, children iterator, path used for hooks, replaced children, removed children]
+            stack = []
+            if descend:
+                stack.append([self, _children(self), None, [], []])
+            elif leave is not None:
+                leave(p, self)
+
+            push = path.append
+            pop = path.pop
+            while stack:
+                frame = stack[-1]
+                for name, child in frame[1]:
+                    if child is None:
+                        continue
+                    if not allow_duplicates:
+                        if id(child) in memo:
+                            continue
+                        memo.add(id(child))
+
+                    push(name)
+                    p = NodePath(path) if copy_paths else path
+                    yield p, child
+                    descend = recursive and isinstance(child, ComposedNode)
+                    if enter is not None and enter(p, child) is False:
+                        descend = False
+                    if descend:
+                        stack.append([child, _children(child), p, [], []])
+                        break
+
+                    if leave is not None:
+                        ret = leave(p, child)
+                        if ret is remove:
+                            frame[4].append(name)
+                        elif ret is not None and ret is not child:
+                            frame[3].append((name, ret))
+                    pop()
+                else:
+                    node, _, p, replaced, removed = stack.pop()
+                    for name, child in replaced:
+                        node.ayns.set_child(name, child)
+                    for name in reversed(removed):
+                        node.ayns.remove_child(name)
+
+                    if leave is None:
+                        if stack:
+                            pop()
+                        continue
+
+                    if not stack:
+                        if include_self:
+                            leave(NodePath(path) if copy_paths else path, node)
+                        continue
+
+                    ret = leave(p, node)
+                    if ret is remove:
+                        stack[-1][4].append(path[-1])
+                    elif ret is not None and ret is not node:
+                        stack[-1][3].append((path[-1], ret))
+                    pop()
+
         def filter_nodes(self, condition, prefix=None, removed=None):
-            prefix = NodePath.get_list_path(prefix, check_types=False) or NodePath()
-            to_del = []
-            to_re_set = []
-            for name, child in self.ayns.named_children():
-                child_path = prefix + [name]
-                keep = False
-                if condition(child_path, child):
-                    keep = True
-                if isinstance(child, ComposedNode): #not child.ayns.is_leaf:
-                    possibly_new_child = child.ayns.filter_nodes(condition, prefix=child_path, removed=removed)
-                    keep = keep or bool(possibly_new_child)
-                    if keep and possibly_new_child is not child:
-                        to_re_set.append(name, possibly_new_child)
-
-                if not keep:
-                    to_del.append(name)
-
-            for name in reversed(to_del):
-                self.ayns.remove_child(name)
+            keep_stack = []
+
+            def enter(path, node):
+                keep_stack.append(condition(path, node))
+
+            def leave(path, node):
+                keep = keep_stack.pop()
+                if not keep and isinstance(node, ComposedNode):
+                    keep = bool(node) # its children have already been filtered
+                if keep:
+                    return None
+                if removed is not None:
+                    removed.add(path)
+                return ComposedNode.REMOVE
+
+            for _ in self.ayns.walk(prefix=prefix, enter=enter, leave=leave, include_self=False):
+                pass
+
+            return self
+
+        def _filter_nodes_against(self, other, condition, prefix=None, removed=None, relative=True):
+            ''' Similar to :py:meth:`filter_nodes` but ``condition`` is called with ``(node, other_node)``, where
+                ``other_node`` is the node under the same path (relative to ``self``) in ``other`` or, if it does not exist,
+                its closest existing ancestor (see :py:meth:`get_first_not_missing_node`). If ``relative`` is ``False``,
+                nodes are looked up in ``other`` by their full paths, including ``prefix``.
+                Both trees are walked together, so the cost is linear in the size of ``self``.
+                Paths of removed nodes are added to ``removed`` as tuples.
+            '''
+            # (closest node in other, whether the node is missing in other, whether the node should be kept)
+            stack = [(other, False, True)]
+            if not relative:
+                for name in prefix or []:
+                    other_node, missing, _ = stack[-1]
+                    missing = missing or not isinstance(other_node, ComposedNode) or not other_node.ayns.has_child(name)
+                    if not missing:
+                        other_node = other_node.ayns.get_child(name)
+                    stack[-1] = (other_node, missing, True)
+
+            def enter(path, node):
+                other_node, missing, _ = stack[-1]
+                name = path[-1]
+                missing = missing or not isinstance(other_node, ComposedNode) or not other_node.ayns.has_child(name)
+                if not missing:
+                    other_node = other_node.ayns.get_child(name)
+                stack.append((other_node, missing, condition(node, other_node)))
+
+            def leave(path, node):
+                _, _, keep = stack.pop()
+                if not keep and isinstance(node, ComposedNode):
+                    keep = bool(node)
+                if keep:
+                    return None
                 if removed is not None:
-                    removed.add(prefix + [name])
-            for name, child in to_re_set:
-                self.ayns.set_child(name, child)
+                    removed.add(tuple(path))
+                return ComposedNode.REMOVE
+
+            for _ in self.ayns.walk(prefix=prefix, enter=enter, leave=leave, include_self=False, copy_paths=False):
+                pass
 
             return self
 
         def map_nodes(self, map_fn, prefix=None, cache_results=True, cache=None, leafs_only=True, include_self=True, recurse=True):
             prefix = NodePath.get_list_path(prefix, check_types=False) or NodePath()
-            to_re_set = []
             if cache_results and cache is None:
                 cache = {}
 
-            for name, child in self.ayns.named_children():
-                if cache_results and id(child) in cache:
-                    possibly_new_child = cache[id(child)]
+            def enter(path, node):
+                # cached nodes are not visited again
+                return not cache_results or id(node) not in cache
+
+            def leave(path, node):
+                if cache_results and id(node) in cache:
+                    ret = cache[id(node)]
+                elif isinstance(node, ComposedNode) and recurse and leafs_only:
+                    ret = node
                 else:
-                    child_path = prefix + [name]
-                    possibly_new_child = child
-                    if isinstance(child, ComposedNode) and recurse:
-                        possibly_new_child = possibly_new_child.ayns.map_nodes(map_fn, prefix=child_path, cache_results=cache_results, cache=cache, leafs_only=leafs_only)
-                    else:
-                        possibly_new_child = map_fn(child_path, possibly_new_child)
-                        
-                if possibly_new_child is not child:
-                    to_re_set.append((name, possibly_new_child))
+                    ret = map_fn(path, node)
 
                 if cache_results:
-                    from ..utils import persistent_id
-                    cache[persistent_id(child)] = possibly_new_child
+                    cache[persistent_id(node)] = ret
+                return ret
 
-            for name, child in to_re_set:
-                self.ayns.set_child(name, child)
+            for _ in self.ayns.walk(prefix=prefix, enter=enter, leave=leave, include_self=False, recursive=recurse):
+                pass
 
             ret = self
             if not leafs_only and include_self:
@@ -220,25 +363,7 @@ class ComposedNode(ConfigNode):
             return ret
 
         def nodes_with_paths(self, prefix=None, recursive=True, include_self=False, allow_duplicates=True):
-            memo = set()
-            prefix = NodePath.get_list_path(prefix, check_types=False) or NodePath()
-            if include_self:
-                memo.add(id(self))
-                yield prefix, self
-
-            for name, child in self._children.items():
-                if child is None or (id(child) in memo and not allow_duplicates):
-                    continue
-                child_path = prefix + [name]
-                if not recursive or not isinstance(child, ComposedNode):
-                    memo.add(id(child))
-                    yield child_path, child
-                else:
-                    for path, node in child.ayns.nodes_with_paths(prefix=child_path, recursive=recursive, include_self=True):
-                        if id(node) in memo and not allow_duplicates:
-                            continue
-                        memo.add(id(node))
-                        yield path, node
+            return self.ayns.walk(prefix=prefix, include_self=include_self, recursive=recursive, allow_duplicates=allow_duplicates)
 
         def nodes(self, recursive=True, include_self=False, allow_duplicates=False):
             for _, node in self.ayns.nodes_with_paths(recursive=recursive, include_self=include_self, allow_duplicates=allow_duplicates):
@@ -287,13 +412,13 @@ class ComposedNode(ConfigNode):
 
             if other.ayns.delete:
                 removed = set()
-                def maybe_keep(path, node):
-                    other_node = other.ayns.get_first_not_missing_node(path)
+                def maybe_keep(node, other_node):
                     return node.ayns.has_priority_over(other_node)
 
-                self.ayns.filter_nodes(maybe_keep, prefix=path, removed=removed)
+                # nodes are looked up in other by their full paths, so a nested !del node is compared as a whole
+                self.ayns._filter_nodes_against(other, maybe_keep, prefix=path, removed=removed, relative=False)
                 if not self._children and other.ayns.has_priority_over(self, if_equal=True):
-                    removed.add(path)
+                    removed.add(tuple(path))
                     other.ayns._require_all_new(path, f'note: the entire config tree under {path!r} has been removed due to node merging with a !del or !clear node', exceptions=removed)
                     ret = other._replace_other(self, allow_promotions=True)
                     return ret
@@ -337,20 +462,18 @@ class ComposedNode(ConfigNode):
             return False
 
         def _require_all_new(self, path, reason, exceptions=None, include_self=True):
-            seq = self.ayns.nodes_with_paths(prefix=path, include_self=include_self)
-            for p, n in seq:
-                if not n.ayns.allow_new and (exceptions is None or p not in exceptions):
+            if not self._contains_notnew():
+                return
+            for p, n in self.ayns.walk(prefix=path, include_self=include_self, copy_paths=False):
+                if not n.ayns.allow_new and (exceptions is None or tuple(p) not in exceptions):
                     raise ValueError(f'Node {p!r} (source file: {n.ayns.source_file!r}) requires that the destination already exists but the current config tree does not contain a node under this path ({reason})')
 
 
     def __getstate__(self):
-        state = self.__dict__.copy()
-        del state['_children']
+        state = self._get_state()
+        state.pop('_children', None)
         return state
 
-    def __setstate__(self, state):
-        self.__dict__.update(state)
-
     @staticmethod
     def _recreate(cls):
         new = cls.__new__(cls)
@@ -364,12 +487,35 @@ class ComposedNode(ConfigNode):
         if isinstance(self, list):
             lit = iter(self)
         elif isinstance(self, dict):
-            dit = iter(self.items())
+            # restored with the ``_children`` setter rather than ``__setitem__``, which
+            # would reject children shadowing dict methods (e.g., ``items``) that the parser allows
+            state['_children'] = dict(self._children.items())
         return ComposedNode._recreate, (type(self), ), state, lit, dit
 
+    def _clone(self, memo):
+        ret = memo.get(id(self))
+        if ret is not None:
+            return ret
+        children = { name: child._clone(memo) for name, child in self._children.items() }
+        ret = self._clone_empty(children)
+        ret._set_state(self._get_state())
+        if self._metadata:
+            ret._metadata = dict(self._metadata)
+        ret._children = children
+        memo[id(self)] = ret
+        return ret
+
+    def _clone_empty(self, children):
+        return type(self).__new__(type(self))
+
+    def _make_child(self, value):
+        value = ConfigNode(value, **self._get_child_kwargs())
+        value._propagate_implicit_values()
+        return value
+
     def _get_child_kwargs(self, child=None):
         ret = {}
-        if not hasattr(self, '_delete'): # happens when unpickling! children are being populated before attributes are set, but its ok since we assume pickled objects are ok anyway, so no need to fix things
+        if not hasattr(self, '_flags'): # happens when unpickling! children are being populated before attributes are set, but its ok since we assume pickled objects are ok anyway, so no need to fix things
             return ret
         ret['implicit_delete'] = notnone_or(self._delete, self._default_delete or self._implicit_delete)
         ret['implicit_allow_new'] = notnone_or(self._allow_new, self._implicit_allow_new)
@@ -377,8 +523,52 @@ class ComposedNode(ConfigNode):
             ret['implicit_safe'] = notnone_or(self._safe, self._implicit_safe)
         return ret
 
+    def _on_child_added(self, child):
+        if child._contains_notnew():
+            # ancestors of the node might have cached summaries saying otherwise
+            ConfigNode._bump_notnew_epoch()
+            self._notnew_summary = (ConfigNode._notnew_epoch.value << 1) | 1
+
+    def _contains_notnew(self):
+        ''' Returns ``True`` if the node or any node in its subtree might not allow new nodes
+            (see :py:meth:`awesomeyaml.nodes.ConfigNode._contains_notnew`).
+
+            The result is cached for each composed node in the subtree until the global "notnew epoch" changes,
+            which happens whenever a node which might not allow new nodes is added to an existing tree
+            (or one of the existing nodes is changed to not allow new nodes). If there are no such nodes,
+            the cached summaries remain valid and the check is done in constant time.
+        '''
+        epoch = ConfigNode._notnew_epoch.value
+        summary = getattr(self, '_notnew_summary', -1)
+        if summary >> 1 == epoch:
+            return bool(summary & 1)
+
+        stack = [[self, iter(self._children.values()), ConfigNode._contains_notnew(self)]]
+        while stack:
+            frame = stack[-1]
+            node, children, contains = frame
+            child = None if contains else next(children, None)
+            if child is None:
+                node._notnew_summary = (epoch << 1) | contains
+                stack.pop()
+                if contains and stack:
+                    stack[-1][2] = True
+                continue
+
+            if not isinstance(child, ComposedNode):
+                frame[2] = ConfigNode._contains_notnew(child)
+                continue
+
+            summary = getattr(child, '_notnew_summary', -1)
+            if summary >> 1 == epoch:
+                frame[2] = bool(summary & 1)
+            else:
+                stack.append([child, iter(child._children.values()), ConfigNode._contains_notnew(child)])
+
+        return bool(self._notnew_summary & 1)
+
     def _propagate_implicit_values(self):
-        if not hasattr(self, '_delete'): # happens when unpickling! children are being populated before attributes are set, but its ok since we assume pickled objects are ok anyway, so no need to fix things
+        if not hasattr(self, '_flags'): # happens when unpickling! children are being populated before attributes are set, but its ok since we assume pickled objects are ok anyway, so no need to fix things
             return
         if self._implicit_delete is None and self._implicit_allow_new is None and self._implicit_safe is None:
             return
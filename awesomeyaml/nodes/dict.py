@@ -12,29 +12,85 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections.abc as cabc
+
 from .composed import ComposedNode
 from ..namespace import namespace
 from ..utils import Bunch
 
 
+class _DictChildren(cabc.MutableMapping):
+    ''' A view exposing the builtin dict storage of a :py:class:`ConfigDict` as its ``_children``,
+        bypassing any methods overwritten by the node.
+    '''
+    __slots__ = ('_node', )
+
+    def __init__(self, node):
+        self._node = node
+
+    def __getitem__(self, name):
+        return dict.__getitem__(self._node, name)
+
+    def __setitem__(self, name, value):
+        dict.__setitem__(self._node, name, value)
+
+    def __delitem__(self, name):
+        dict.__delitem__(self._node, name)
+
+    def __contains__(self, name):
+        return dict.__contains__(self._node, name)
+
+    def __iter__(self):
+        return dict.__iter__(self._node)
+
+    def __len__(self):
+        return dict.__len__(self._node)
+
+    def get(self, name, default=None):
+        return dict.get(self._node, name, default)
+
+    def pop(self, name, *default):
+        return dict.pop(self._node, name, *default)
+
+    def keys(self):
+        return dict.keys(self._node)
+
+    def values(self):
+        return dict.values(self._node)
+
+    def items(self):
+        return dict.items(self._node)
+
+    def clear(self):
+        dict.clear(self._node)
+
+
 class ConfigDict(ComposedNode, dict):
+    __slots__ = ComposedNode._composed_slots
+
     def __init__(self, value=None, **kwargs):
         value = value if value is not None else {}
         #ComposedNode.maybe_inherit_flags(value, kwargs)
         ComposedNode.__init__(self, children=value, **kwargs)
-        dict.__init__(self, self._children)
+
+    @property
+    def _children(self):
+        return _DictChildren(self)
+
+    @_children.setter
+    def _children(self, children):
+        dict.clear(self)
+        dict.update(self, children)
 
     def _set(self, name, value):
         if name in dir(type(self)):
             raise ValueError(f'Cannot add a child node with name {name!r} as it would shadow a class method/attribute: {getattr(type(self), name)}')
-        value = ComposedNode.ayns.set_child(self, name, value)
-        dict.__setitem__(self, name, value)
-        return value
+        return ComposedNode.ayns.set_child(self, name, value)
 
     def _del(self, name):
-        ret = ComposedNode.ayns.remove_child(self, name)
-        dict.__delitem__(self, name)
-        return ret
+        if not dict.__contains__(self, name):
+            raise KeyError(name)
+        return ComposedNode.ayns.remove_child(self, name)
 
     def __setattr__(self, name, value):
         if name.startswith('_'):
@@ -55,15 +111,9 @@ class ConfigDict(ComposedNode, dict):
         self._del(name)
 
     def __setitem__(self, name, value):
-        if isinstance(name, str) and name.startswith('_'):
-            return dict.__setitem__(self, name, value)
-
         return self._set(name, value)
 
     def __delitem__(self, name):
-        if isinstance(name, str) and name.startswith('_'):
-            return dict.__delitem__(self, name)
-
         self._del(name)
 
     def __contains__(self, name):
@@ -79,7 +129,6 @@ class ConfigDict(ComposedNode, dict):
 
     def clear(self):
         ComposedNode.ayns.clear(self)
-        dict.clear(self)
 
     def setdefault(self, key, value):
         if key not in self:
@@ -87,17 +136,10 @@ class ConfigDict(ComposedNode, dict):
         return self[key]
 
     def pop(self, k, *d):
-        val = dict.pop(self, k, *d)
-        if self.ayns.has_child(k): # pylint: disable=no-value-for-parameter
-            ComposedNode.ayns.remove_child(self, k)
-        return val
-
-    def popitem(self, k, d=None):
-        val = dict.popitem(self, k, d=d)
-        if self.has_child(k):
-            ComposedNode.ayns.remove_child(self, k)
-            #val.set_parent(None, None)
-        return val
+        return dict.pop(self, k, *d)
+
+    def popitem(self):
+        return dict.popitem(self)
 
     def update(self, other, **kwargs):
         try:
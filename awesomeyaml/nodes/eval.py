@@ -17,6 +17,7 @@ from .node import ConfigNode
 from ..namespace import namespace, staticproperty
 from ..utils import Bunch, python_is_at_least
 from ..errors import EvalError
+from ..cache import get_code_cache
 
 import os
 import dis
@@ -25,6 +26,10 @@ import types
 import hashlib
 
 
+# instructions which load names from the globals/locals of the executed code, i.e., possibly nodes of the config
+_name_load_ops = { 'LOAD_NAME', 'LOAD_GLOBAL', 'LOAD_FROM_DICT_OR_GLOBALS' }
+
+
 class GlobalsWrapper():
     def __init__(self, gbls, ecfg, ctx, node, path):
         self.gbls = gbls
@@ -87,7 +92,7 @@ class EvalNode(ConfigScalar(str)):
     @namespace('ayns')
     def on_evaluate_impl(self, path, ctx):
         self.ayns._require_safe(path)
-        code_hash = hashlib.md5(str(self).encode('utf-8')).hexdigest()
+        code_hash, lines, exec_code, eval_code = self._get_code(path)
         eval_module_name = f'{EvalNode._top_namespace_module_name}.{str(path).replace(".", "_")}_0x{code_hash}'
 
         from_module = False
@@ -106,19 +111,9 @@ class EvalNode(ConfigScalar(str)):
 
         gbls[EvalNode._globals_wrapper_name] = GlobalsWrapper(gbls, ctx.ecfg, ctx, self, path)
 
-        lines = self.strip().split('\n')
-        lines = [lline for line in lines for lline in line.split(';')]
-
-        exec_lines = "\n".join(lines[:-1])
-        eval_line = lines[-1].strip()
-
         try:
-            exec_code = compile(exec_lines, self._source_file, 'exec')
-            eval_code = compile(eval_line, self._source_file, 'eval')
-            exec_code_patched, _ = EvalNode._patch_access_to_globals(exec_code)
-            eval_code_patched, _ = EvalNode._patch_access_to_globals(eval_code)
-            exec(exec_code_patched, gbls)
-            ret = eval(eval_code_patched, gbls)
+            exec(exec_code, gbls)
+            ret = eval(eval_code, gbls)
         except EvalError as e:
             code = f'=== CODE BEGINS ===\n{os.linesep.join(lines)}\n=== CODE ENDS ==='
             if e.node is self:
@@ -148,6 +143,73 @@ class EvalNode(ConfigScalar(str)):
     def tag():
         return '!eval'
 
+    def _get_references(self, eval_symbols):
+        try:
+            _, _, exec_code, eval_code = self._get_code(None)
+        except EvalError:
+            return None, False
+
+        names = EvalNode._get_names(exec_code, {})
+        names = EvalNode._get_names(eval_code, names)
+        if 'ayns' in names:
+            # the code can access the entire config and the evaluation context
+            return None, False
+        # some names might not be used at all, which is fine since we only need an upper bound
+        return [(name,) for name in names if not name.startswith('__') and name not in eval_symbols], False
+
+    @staticmethod
+    def _get_names(code, names):
+        ''' Adds names loaded by ``code`` (and any code nested in it) to ``names`` (a dict, to keep them ordered).
+            ``code`` can be patched with :py:meth:`_patch_access_to_globals`, in which case names are loaded
+            as attributes of the globals wrapper. Names of other attributes (which are also in ``code.co_names``)
+            are not included.
+        '''
+        from_wrapper = False
+        for instr in dis.get_instructions(code):
+            if from_wrapper and instr.opname == 'LOAD_ATTR':
+                names[instr.argval] = None
+            elif instr.opname in _name_load_ops and instr.argval != EvalNode._globals_wrapper_name:
+                names[instr.argval] = None
+            from_wrapper = (instr.opname in _name_load_ops and instr.argval == EvalNode._globals_wrapper_name)
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                EvalNode._get_names(const, names)
+        return names
+
+    def _get_code(self, path):
+        ''' Returns a tuple ``(code_hash, lines, exec_code, eval_code)`` where the last
+            two elements are code objects ready to be executed.
+            The result is cached process-wide, see :py:class:`awesomeyaml.cache.CodeCache`.
+        '''
+        source = str(self)
+        # nodes which do not come from a file (e.g., raw yaml strings) do not have a filename
+        filename = self._source_file if self._source_file is not None else '<string>'
+        cache = get_code_cache()
+        key = cache.make_key(source, filename)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+
+        code_hash = hashlib.md5(source.encode('utf-8')).hexdigest()
+        lines = self.strip().split('\n')
+        lines = [lline for line in lines for lline in line.split(';')]
+
+        exec_lines = "\n".join(lines[:-1])
+        eval_line = lines[-1].strip()
+
+        try:
+            exec_code = compile(exec_lines, filename, 'exec')
+            eval_code = compile(eval_line, filename, 'eval')
+            exec_code_patched, _ = EvalNode._patch_access_to_globals(exec_code)
+            eval_code_patched, _ = EvalNode._patch_access_to_globals(eval_code)
+        except Exception as e:
+            code = f'=== CODE BEGINS ===\n{os.linesep.join(lines)}\n=== CODE ENDS ==='
+            raise EvalError('The above exception occurred in the user code.', self, path, note=code) from e
+
+        entry = (code_hash, lines, exec_code_patched, eval_code_patched)
+        cache.put(key, entry)
+        return entry
+
 
     @staticmethod
     def _patch_access_to_globals(code):
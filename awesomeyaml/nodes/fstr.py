@@ -13,6 +13,76 @@
 # limitations under the License.
 
 from .eval import EvalNode
+from ..namespace import namespace
+from ..errors import EvalError
+
+import ast
+import builtins
+import functools
+
+
+def _get_accessors(expr):
+    ''' Returns a tuple ``(name, accessors)`` if ``expr`` is a simple lookup,
+        i.e., a name followed by any number of attribute accesses and/or subscriptions
+        with constant keys. ``accessors`` is a tuple of ``(is_attr, key)`` pairs.
+        Returns ``None`` for any other expression.
+    '''
+    accessors = []
+    while True:
+        if isinstance(expr, ast.Attribute):
+            accessors.append((True, expr.attr))
+            expr = expr.value
+        elif isinstance(expr, ast.Subscript):
+            key = expr.slice
+            if isinstance(key, getattr(ast, 'Index', ())): # Python < 3.9
+                key = key.value
+            if not isinstance(key, ast.Constant) or type(key.value) not in (str, int):
+                return None
+            accessors.append((False, key.value))
+            expr = expr.value
+        elif isinstance(expr, ast.Name):
+            if expr.id == 'ayns' or expr.id.startswith('__'):
+                # names which are specific to eval nodes
+                return None
+            return expr.id, tuple(reversed(accessors))
+        else:
+            return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_fstr(source):
+    ''' Splits an f-string into a tuple of parts which are either literal strings
+        or ``(name, accessors, conversion, format_spec)`` tuples describing
+        replacement fields (see :py:func:`_get_accessors`).
+        Returns ``None`` if the f-string contains anything more complicated than
+        simple lookups, in which case it should be evaluated as python code.
+    '''
+    try:
+        body = ast.parse(source, mode='eval').body
+    except SyntaxError:
+        return None
+
+    if not isinstance(body, ast.JoinedStr):
+        return None
+
+    parts = []
+    for value in body.values:
+        if isinstance(value, ast.Constant) and isinstance(value.value, str):
+            parts.append(value.value)
+        elif isinstance(value, ast.FormattedValue):
+            lookup = _get_accessors(value.value)
+            if lookup is None:
+                return None
+            spec = ''
+            if value.format_spec is not None:
+                if not all(isinstance(v, ast.Constant) and isinstance(v.value, str) for v in value.format_spec.values):
+                    return None
+                spec = ''.join(v.value for v in value.format_spec.values)
+            parts.append((*lookup, value.conversion, spec))
+        else:
+            return None
+
+    return tuple(parts)
 
 
 class FStrNode(EvalNode):
@@ -33,6 +103,11 @@ class FStrNode(EvalNode):
         where ``fmt`` should be the content of an f-string, without extra quotes
         and the leading ``f``. 
 
+        F-strings whose replacement fields are only simple lookups (names followed
+        by attribute accesses and/or subscriptions with constant keys, optionally
+        with a conversion and a constant format spec) are evaluated directly,
+        without compiling any code. Names are resolved in the same way as in eval nodes.
+
         Supported syntax::
 
             !fstr fmt       # explicit form
@@ -47,3 +122,68 @@ class FStrNode(EvalNode):
         if len(fstr) < 3 or fstr[0] != 'f' or fstr[1] not in ['"', "'"] or fstr[1] != fstr[-1]:
             raise ValueError(f'Invalid f-string: {fstr!r}')
         super().__init__(fstr, persistent_namespace=False, **kwargs)
+
+    @namespace('ayns')
+    def on_evaluate_impl(self, path, ctx):
+        parts = _parse_fstr(self.strip())
+        if parts is None:
+            return super().ayns.on_evaluate_impl(path, ctx)
+
+        self.ayns._require_safe(path)
+        try:
+            return ''.join(part if isinstance(part, str) else self._format_field(part, path, ctx) for part in parts)
+        except EvalError as e:
+            code = f'=== CODE BEGINS ===\n{self.strip()}\n=== CODE ENDS ==='
+            if e.node is self:
+                e.note = code
+                raise
+            else:
+                raise EvalError('The above exception occurred in the user code.', self, path, note=code) from e
+        except Exception as e:
+            code = f'=== CODE BEGINS ===\n{self.strip()}\n=== CODE ENDS ==='
+            raise EvalError('The above exception occurred in the user code.', self, path, note=code) from e
+
+    def _get_references(self, eval_symbols):
+        parts = _parse_fstr(self.strip())
+        if parts is None:
+            return super()._get_references(eval_symbols)
+        # simple lookups are always evaluated
+        return [(part[0],) for part in parts if not isinstance(part, str) and part[0] not in eval_symbols], True
+
+    def _lookup(self, name, path, ctx):
+        ''' Resolves a name in the same order as :py:class:`awesomeyaml.nodes.eval.GlobalsWrapper`.
+        '''
+        symbols = ctx.get_eval_symbols()
+        if name in symbols:
+            return symbols[name]
+
+        ecfg = ctx.ecfg
+        if dict.__contains__(ecfg, name):
+            # already evaluated, nothing will be executed
+            return dict.__getitem__(ecfg, name)
+        if name in ecfg._cfgobj:
+            with ctx.require_all_safe(self, path):
+                return ecfg[name]
+
+        try:
+            return getattr(builtins, name)
+        except AttributeError:
+            raise NameError(name) from None
+
+    def _format_field(self, field, path, ctx):
+        name, accessors, conversion, spec = field
+        value = self._lookup(name, path, ctx)
+        for is_attr, key in accessors:
+            if is_attr:
+                value = getattr(value, key)
+            else:
+                value = value[key]
+
+        if conversion == ord('s'):
+            value = str(value)
+        elif conversion == ord('r'):
+            value = repr(value)
+        elif conversion == ord('a'):
+            value = ascii(value)
+
+        return format(value, spec)
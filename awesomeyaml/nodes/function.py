@@ -15,6 +15,13 @@
 from .dict import ConfigDict
 from ..namespace import namespace, staticproperty
 
+import inspect
+import weakref
+
+
+# callable -> (signature, names of positional parameters, { positional keys: plan })
+_signatures_cache = weakref.WeakKeyDictionary()
+
 
 class FunctionNode(ConfigDict):
     _default_delete = True
@@ -110,35 +117,68 @@ class FunctionNode(ConfigDict):
         raise NotImplementedError()
 
     @staticmethod
-    def _resolve_args(func, args):
-        positional_args = { key: value for key, value in args.items() if isinstance(key, int) }
-        if not positional_args:
-            return [], {}, args
-
-        keyword_args = { key: value for key, value in args.items() if isinstance(key, str) }
-        assert len(positional_args) + len(keyword_args) == len(args)
+    def _get_signature_info(func):
+        ''' Returns a tuple ``(sig, idx_to_name, plans)`` for ``func``, where ``sig`` is
+            its signature, ``idx_to_name`` lists names of parameters which can be passed
+            positionally and ``plans`` is a dict used by :py:meth:`_get_args_plan`.
+            The result is cached for as long as ``func`` is alive, if possible.
+        '''
+        try:
+            return _signatures_cache[func]
+        except KeyError:
+            cacheable = True
+        except TypeError:
+            # not weak-referenceable or not hashable
+            cacheable = False
 
-        import inspect
         sig = inspect.signature(func)
-        params = list(sig.parameters.values())
         idx_to_name = []
-        for p in params:
+        for p in sig.parameters.values():
             if p.kind == inspect.Parameter.VAR_POSITIONAL:
                 break
             idx_to_name.append(p.name)
 
-        idx = 0
-        unpack = []
-        while True:
-            if idx not in positional_args:
-                break
-            unpack.append(positional_args.pop(idx))
-            idx += 1
+        info = (sig, tuple(idx_to_name), {})
+        if cacheable:
+            _signatures_cache[func] = info
+        return info
 
-        kw_positional_args = {}
-        for idx, value in positional_args.items():
-            if idx >= len(idx_to_name):
-                raise ValueError(f'Cannot resolve argument at position {idx} for function: {func} with signature {sig}')
-            kw_positional_args[idx_to_name[idx]] = value
+    @staticmethod
+    def _get_args_plan(func, positional):
+        ''' Returns a pair ``(unpack, named)`` describing how positional arguments
+            with indices ``positional`` (a tuple) should be passed to ``func``:
+            arguments ``0..unpack-1`` are passed positionally and the remaining ones
+            are passed as keyword arguments according to ``(idx, name)`` pairs in ``named``.
+        '''
+        sig, idx_to_name, plans = FunctionNode._get_signature_info(func)
+        plan = plans.get(positional)
+        if plan is None:
+            keys = set(positional)
+            unpack = 0
+            while unpack in keys:
+                unpack += 1
+
+            named = []
+            for idx in positional:
+                if 0 <= idx < unpack:
+                    continue
+                if idx >= len(idx_to_name):
+                    raise ValueError(f'Cannot resolve argument at position {idx} for function: {func} with signature {sig}')
+                named.append((idx, idx_to_name[idx]))
+
+            plan = (unpack, tuple(named))
+            plans[positional] = plan
+
+        return plan
+
+    @staticmethod
+    def _resolve_args(func, args):
+        positional = tuple(key for key in args if isinstance(key, int))
+        if not positional:
+            return [], {}, args
+
+        keyword_args = { key: value for key, value in args.items() if isinstance(key, str) }
+        assert len(positional) + len(keyword_args) == len(args)
 
-        return unpack, kw_positional_args, keyword_args
+        unpack, named = FunctionNode._get_args_plan(func, positional)
+        return [args[idx] for idx in range(unpack)], { name: args[idx] for idx, name in named }, keyword_args
@@ -101,25 +101,14 @@ class IncludeNode(ConfigNode):
     @namespace('ayns')
     def on_preprocess_impl(self, path, builder):
         subbuilder = builder.get_subbuilder(path)
-        missing = []
-        for filename in self.filenames:
-            found = False
-            for lookup_dir in subbuilder.get_lookup_dirs(self._source_file):
-                file = os.path.normpath(os.path.join(lookup_dir, filename))
-                try:
-                    subbuilder.add_source(file, raw_yaml=False, safe=self.ayns.safe)
-                    found = True
-                except FileNotFoundError:
-                    continue
-
-                if found:
-                    break
-
-            if not found:
-                missing.append(filename)
+        lookup_dirs = list(subbuilder.get_lookup_dirs(self._source_file))
+        # sibling files are read concurrently if the builder has an executor
+        candidates = [[os.path.normpath(os.path.join(lookup_dir, filename)) for lookup_dir in lookup_dirs] for filename in self.filenames]
+        found = subbuilder.add_existing_files(candidates, safe=self.ayns.safe)
+        missing = [filename for filename, f in zip(self.filenames, found) if not f]
 
         if missing:
-            raise FileNotFoundError({ 'missing': missing, 'lookup_dirs': list(subbuilder.get_lookup_dirs(self._source_file)), 'source': self._source_file })
+            raise FileNotFoundError({ 'missing': missing, 'lookup_dirs': lookup_dirs, 'source': self._source_file })
 
         return subbuilder.build().ayns.on_preprocess(path, builder)
 
@@ -12,19 +12,94 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import collections.abc as cabc
+
 from .composed import ComposedNode
 from ..namespace import namespace, staticproperty
-from .. import utils
 from ..errors import MergeError
 
 
+class _ListChildren(cabc.MutableMapping):
+    ''' A view exposing the builtin list storage of a :py:class:`ConfigList` as its ``_children``,
+        i.e. a mapping from indices to nodes, bypassing any methods overwritten by the node.
+
+        Setting an index equal to the length of the list appends a new element, removing
+        an element shifts all elements which follow it (as with ``list``).
+    '''
+    __slots__ = ('_node', )
+
+    def __init__(self, node):
+        self._node = node
+
+    def _check(self, index):
+        if not isinstance(index, int) or index < 0 or index >= list.__len__(self._node):
+            raise KeyError(index)
+
+    def __getitem__(self, index):
+        self._check(index)
+        return list.__getitem__(self._node, index)
+
+    def __setitem__(self, index, value):
+        if index == list.__len__(self._node):
+            list.append(self._node, value)
+        else:
+            self._check(index)
+            list.__setitem__(self._node, index, value)
+
+    def __delitem__(self, index):
+        self._check(index)
+        list.__delitem__(self._node, index)
+
+    def __contains__(self, index):
+        return isinstance(index, int) and 0 <= index < list.__len__(self._node)
+
+    def __iter__(self):
+        return iter(range(list.__len__(self._node)))
+
+    def __len__(self):
+        return list.__len__(self._node)
+
+    def get(self, index, default=None):
+        if index not in self:
+            return default
+        return list.__getitem__(self._node, index)
+
+    def pop(self, index, *default):
+        if index not in self:
+            if default:
+                return default[0]
+            raise KeyError(index)
+        return list.pop(self._node, index)
+
+    def keys(self):
+        return range(list.__len__(self._node))
+
+    def values(self):
+        return list.__iter__(self._node)
+
+    def items(self):
+        return enumerate(list.__iter__(self._node))
+
+    def clear(self):
+        list.clear(self._node)
+
+
 class ConfigList(ComposedNode, list):
+    __slots__ = ComposedNode._composed_slots
     _default_delete = True
 
     def __init__(self, value=None, **kwargs):
         value = value if value is not None else []
         ComposedNode.__init__(self, children={ i: v for i, v in enumerate(value) }, **kwargs)
-        list.__init__(self, self._children.values())
+
+    @property
+    def _children(self):
+        return _ListChildren(self)
+
+    @_children.setter
+    def _children(self, children):
+        list.clear(self)
+        list.extend(self, (children[idx] for idx in range(len(children))))
 
     def _validate_index(self, index, strict=True):
         if not isinstance(index, int):
@@ -38,24 +113,11 @@ class ConfigList(ComposedNode, list):
 
     def _set(self, index, value, strict=True):
         index = self._validate_index(index, strict=strict)
-        value = ComposedNode.ayns.set_child(self, index, value)
-        try:
-            if index == len(self):
-                list.append(self, value)
-            else:
-                list.__setitem__(self, index, value)
-        except:
-            ComposedNode.ayns.remove_child(self, index)
-            raise
+        return ComposedNode.ayns.set_child(self, index, value)
 
     def _del(self, index):
         index = self._validate_index(index)
-        for i in range(index+1, len(self)):
-            self[i-1] = self[i]
-
-        ret = ComposedNode.ayns.remove_child(self, len(self) - 1)
-        list.__delitem__(self, -1)
-        return ret
+        return ComposedNode.ayns.remove_child(self, index)
 
     def _get(self, index, default=None, raise_ex=True):
         try:
@@ -92,15 +154,13 @@ class ConfigList(ComposedNode, list):
         return list.__contains__(self, value)
 
     def append(self, value):
-        value = ComposedNode.ayns.set_child(self, len(self), value)
-        list.append(self, value)
+        ComposedNode.ayns.set_child(self, len(self), value)
 
     def remove(self, value):
         self._del(self.index(value))
 
     def clear(self):
         ComposedNode.ayns.clear(self)
-        list.clear(self)
 
     def extend(self, other):
         for val in other:
@@ -108,25 +168,9 @@ class ConfigList(ComposedNode, list):
 
     def insert(self, index, value):
         index = self._validate_index(index, strict=False)
-        self._children = { ((idx+1) if idx >= index else idx): value for idx, value in self._children.items() }
-        value = ComposedNode.ayns.set_child(self, index, value)
+        value = ComposedNode._make_child(self, value)
         list.insert(self, index, value)
-
-    if not utils.python_is_at_least(3, 7):
-        # for python < 3.7 (i.e., 3.6 and older)
-        # list subclasses are unpickled without calling
-        # custom 'append' and/or 'extend' and rather
-        # using "the fastest" possible option which is to
-        # populate the built-in function type alone
-        # (see: https://stackoverflow.com/questions/52333864/pickle-breaking-change-in-python-3-7)
-        # Because of that we need to populate _children
-        # of the composed node ourselves after the list has
-        # been unpickled (which happens before __setstate__
-        # is called).
-        def __setstate__(self, state):
-            super().__setstate__(state)
-            assert not self._children
-            self._children = { idx: child for idx, child in enumerate(self) }
+        self._on_child_added(value)
 
     @namespace('ayns')
     def on_merge_impl(self, prefix, other):
@@ -143,14 +187,13 @@ class ConfigList(ComposedNode, list):
             if _missing_keys:
                 raise MergeError(f'merging a dict into a list requires all dict nodes to map to the existing indices in the list but the following keys are invalid: {_missing_keys}', node=self, path=prefix, extra_node=first_missing)
 
-        def keep_if_exists(path, node):
+        def keep_if_exists(node, current):
             if not node.ayns.delete:
                 return True
-            current = self.ayns.get_first_not_missing_node(path)
             return node.ayns.has_priority_over(current, if_equal=True)
 
         if isinstance(other, ComposedNode):
-            other.ayns.filter_nodes(keep_if_exists)
+            other.ayns._filter_nodes_against(self, keep_if_exists)
 
         return super().ayns.on_merge_impl(prefix, other)
 
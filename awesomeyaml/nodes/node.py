@@ -13,6 +13,9 @@
 # limitations under the License.
 
 import copy
+import copyreg
+import types
+import itertools
 import threading
 import contextlib
 import collections.abc as cabc
@@ -53,6 +56,65 @@ rethrow_as_merge_error = decorator_factory(errors.MergeError)
 rethrow_as_eval_error = decorator_factory(errors.EvalError)
 
 
+class _EmptyMetadata(dict):
+    ''' A read-only empty dict shared by all nodes which do not have any metadata.
+    '''
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError('Shared empty metadata cannot be modified')
+
+    __setitem__ = __delitem__ = __ior__ = update = setdefault = pop = popitem = clear = _readonly
+
+    def __reduce__(self):
+        return '_empty_metadata'
+
+
+_empty_metadata = _EmptyMetadata()
+
+
+class _PackedFlag():
+    ''' A descriptor exposing one of a small set of values (e.g., ``None``, ``False``, ``True``)
+        which is stored using 2 bits of ``ConfigNode._flags``.
+    '''
+    def __init__(self, shift, values=(None, False, True), strict=False):
+        self.shift = shift
+        self.values = values
+        self.codes = { value: code for code, value in enumerate(values) }
+        self.strict = strict
+        self.mask = 3 << shift
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            if self.strict:
+                raise ValueError(f'Unexpected value: {value!r}, expected one of: {self.values}')
+            code = self.codes[bool(value)]
+        return code << self.shift
+
+    def __get__(self, inst, cls=None):
+        if inst is None:
+            return self
+        return self.values[(inst._flags & self.mask) >> self.shift]
+
+    def __set__(self, inst, value):
+        inst._flags = (getattr(inst, '_flags', 0) & ~self.mask) | self.encode(value)
+
+
+class _NotNewFlag(_PackedFlag):
+    ''' A :py:class:`_PackedFlag` for flags controlling ``allow_new``. Setting one of them to ``False``
+        invalidates summaries cached by :py:meth:`ConfigNode._contains_notnew`, as the node might already
+        be a part of a tree.
+    '''
+    def __set__(self, inst, value):
+        super().__set__(inst, value)
+        if value is False:
+            ConfigNode._bump_notnew_epoch()
+
+
+_notnew_epochs = itertools.count(1)
+
+
 class ConfigNodeMeta(NamespaceableMeta):
     def __call__(cls,
             *args,
@@ -129,6 +191,21 @@ class ConfigNode(metaclass=ConfigNodeMeta):
     STANDARD = 0
     FORCE = 1
 
+    # ConfigNode is combined with builtin types (dict, list, str, ...) which do not allow
+    # multiple slotted bases, therefore the slots are only added by the final types which
+    # derive from builtins (e.g., ConfigDict), other types keep their attributes in __dict__
+    _node_slots = ('_idx', '_flags', '_source_file', '_metadata', '_pyyaml_node')
+
+    # tri-state flags (and priority) are packed into a single int
+    _priority = _PackedFlag(0, (None, WEAK, STANDARD, FORCE), strict=True)
+    _delete = _PackedFlag(2)
+    _allow_new = _NotNewFlag(4)
+    _implicit_delete = _PackedFlag(6)
+    _implicit_allow_new = _NotNewFlag(8)
+    _safe = _PackedFlag(10)
+    _implicit_safe = _PackedFlag(12)
+    _default_safe = _PackedFlag(14)
+
     special_metadata_names = [
         'idx',
         'priority',
@@ -139,11 +216,20 @@ class ConfigNode(metaclass=ConfigNodeMeta):
     ]
 
     _default_filename = threading.local()
-    _default_safe = threading.local()
+    _default_safe_flag = threading.local()
     _default_priority = STANDARD
     _default_delete = False
     _default_allow_new = True
 
+    # changed whenever a node which does not allow new nodes might have been added to an existing tree,
+    # see ComposedNode._contains_notnew; the value is changed in place, as assigning attributes
+    # of namespaceable classes invalidates all cached namespace resolutions
+    _notnew_epoch = types.SimpleNamespace(value=0)
+
+    @staticmethod
+    def _bump_notnew_epoch():
+        ConfigNode._notnew_epoch.value = next(_notnew_epochs)
+
     @staticmethod
     @contextlib.contextmanager
     def default_filename(filename):
@@ -160,15 +246,15 @@ class ConfigNode(metaclass=ConfigNodeMeta):
     @staticmethod
     @contextlib.contextmanager
     def default_safe_flag(value):
-        if not hasattr(ConfigNode._default_safe, 'value'):
-            ConfigNode._default_safe.value = True
+        if not hasattr(ConfigNode._default_safe_flag, 'value'):
+            ConfigNode._default_safe_flag.value = True
 
-        old = ConfigNode._default_safe.value
-        ConfigNode._default_safe.value = value and old
+        old = ConfigNode._default_safe_flag.value
+        ConfigNode._default_safe_flag.value = value and old
         try:
             yield
         finally:
-            ConfigNode._default_safe.value = old
+            ConfigNode._default_safe_flag.value = old
 
 
     def __init__(self, idx=None, priority=None, delete=None, allow_new=None, safe=None, metadata=None, source_file=None, implicit_delete=None, implicit_allow_new=None, implicit_safe=None, pyyaml_node=None):
@@ -182,17 +268,17 @@ class ConfigNode(metaclass=ConfigNodeMeta):
         if priority not in [None, ConfigNode.STANDARD, ConfigNode.WEAK, ConfigNode.FORCE]:
             raise ValueError(f'Unknown priority value: {priority}')
         self._idx = idx
-        self._priority = priority
-        self._delete = delete
-        self._allow_new = allow_new
-        self._implicit_delete = implicit_delete
-        self._implicit_allow_new = implicit_allow_new
+        self._flags = ConfigNode._priority.encode(priority) \
+            | ConfigNode._delete.encode(delete) \
+            | ConfigNode._allow_new.encode(allow_new) \
+            | ConfigNode._implicit_delete.encode(implicit_delete) \
+            | ConfigNode._implicit_allow_new.encode(implicit_allow_new) \
+            | ConfigNode._safe.encode(safe) \
+            | ConfigNode._implicit_safe.encode(implicit_safe) \
+            | ConfigNode._default_safe.encode(getattr(ConfigNode._default_safe_flag, 'value', False))
         self._source_file = source_file if source_file is not None else getattr(ConfigNode._default_filename, 'value', None)
-        self._metadata = metadata or {}
+        self._metadata = metadata or _empty_metadata
         self._pyyaml_node = pyyaml_node
-        self._safe = safe
-        self._implicit_safe = implicit_safe
-        self._default_safe = getattr(ConfigNode._default_safe, 'value', False)
 
     def __repr__(self, simple=False):
         return f'<Object {type(self).__name__!r} at 0x{id(self):02x}>'
@@ -242,6 +328,8 @@ class ConfigNode(metaclass=ConfigNodeMeta):
 
         @property
         def metadata(self):
+            if self._metadata is _empty_metadata:
+                self._metadata = {}
             return self._metadata
 
         @property
@@ -352,7 +440,7 @@ class ConfigNode(metaclass=ConfigNodeMeta):
             # Note that "priority" and "delete" might be optimized out from the dump output if
             # they would be set by the parent (dumping function holds a stack of which metadata are "default"
             # and does not produce anything which is aligned with the defaults)
-            ret = copy.copy(self._metadata)
+            ret = dict(self._metadata)
             ret['priority'] = self._priority
             ret['delete'] = self._delete #if not self._implicit_delete else None
             ret['allow_new'] = self._allow_new
@@ -383,6 +471,16 @@ class ConfigNode(metaclass=ConfigNodeMeta):
                 'safe': self._default_safe
             }
 
+        def clone(self):
+            ''' Returns a structural copy of the node (and all its descendants, if any).
+
+                The returned node can be modified (e.g., merged or preprocessed) without
+                affecting ``self``. Compared to ``copy.deepcopy``, the values held by nodes
+                (e.g., keys of dict nodes and pyyaml nodes) are shared rather than copied
+                since they are never modified in-place.
+            '''
+            return self._clone({})
+
         def represent(self):
             ''' Returns a tuple ``(tag, metadata, data)``, where ``tag`` is desired tag (can be ``None``),
                 ``metadata`` is a dict with metadata (optional, can evaluate to ``False`` to ignore),
@@ -394,7 +492,7 @@ class ConfigNode(metaclass=ConfigNodeMeta):
         def _require_all_new(self, path, reason, exceptions=None, include_self=True):
             if not include_self:
                 return
-            if not self.ayns.allow_new and (exceptions is None or path not in exceptions):
+            if not self.ayns.allow_new and (exceptions is None or tuple(path) not in exceptions):
                 raise ValueError(f'Node {path!r} (source file: {self._source_file!r}) requires that the destination already exists but the current config tree does not contain a node under this path ({reason})')
 
         def _require_safe(self, path):
@@ -404,6 +502,62 @@ class ConfigNode(metaclass=ConfigNodeMeta):
     def _propagate_implicit_values(self):
         return
 
+    def _contains_notnew(self):
+        ''' Returns ``True`` if the node might not allow new nodes, i.e., if :py:meth:`ayns._require_all_new` might fail.
+            Composed nodes also consider their subtrees (see :py:meth:`awesomeyaml.nodes.ComposedNode._contains_notnew`).
+        '''
+        return self._allow_new is False or self._implicit_allow_new is False
+
+    def _get_references(self, eval_symbols):
+        ''' Returns a pair ``(paths, definite)`` where ``paths`` is a list of paths (tuples) of nodes,
+            other than the node's children, which might be evaluated when the node is evaluated
+            (in the order in which they would be evaluated), or ``None`` if they cannot be determined
+            statically. ``definite`` should be True if all of them are always evaluated.
+            ``eval_symbols`` are the symbols of the relevant :py:class:`awesomeyaml.eval_context.EvalContext`.
+            See :py:class:`awesomeyaml.graph.DependencyGraph`.
+        '''
+        return (), True
+
+    def _get_state(self):
+        ''' Returns a dict with all attributes of the node, regardless of whether
+            they are stored in slots or ``__dict__``.
+        '''
+        state = dict(getattr(self, '__dict__', _empty_metadata))
+        for name in copyreg._slotnames(type(self)):
+            try:
+                state[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        # cached summary, only valid for the node's current children (and process)
+        state.pop('_notnew_summary', None)
+        return state
+
+    def _set_state(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+        if ConfigNode._contains_notnew(self):
+            ConfigNode._bump_notnew_epoch()
+
+    def __getstate__(self):
+        return self._get_state()
+
+    def __setstate__(self, state):
+        self._set_state(state)
+
+    def _clone(self, memo):
+        ret = memo.get(id(self))
+        if ret is not None:
+            return ret
+        ret = self._clone_empty()
+        ret._set_state(self._get_state())
+        if self._metadata:
+            ret._metadata = dict(self._metadata)
+        memo[id(self)] = ret
+        return ret
+
+    def _clone_empty(self):
+        return type(self).__new__(type(self))
+
     #
     # The following methods are used to implement some core merging semantics - they are intended to be called whenever two nodes are merged.
     # Depending on the desired outcome, if we are merging nodes "A <- B", one of the four possible outcomes should happen:
@@ -437,7 +591,8 @@ class ConfigNode(metaclass=ConfigNodeMeta):
             self._safe = notnone_or(self._safe, True) and other._safe
         if other._default_safe is not None:
             self._default_safe = notnone_or(other._default_safe, True) and other._default_safe
-        self._metadata = { **self._metadata, **other._metadata }
+        if other._metadata:
+            self._metadata = { **self._metadata, **other._metadata }
         if allow_promotions:
             ret = self._maybe_promote(other)
         else:
@@ -460,7 +615,8 @@ class ConfigNode(metaclass=ConfigNodeMeta):
             self._safe = notnone_or(self._safe, True) and other._safe
         if other._default_safe is not None:
             self._default_safe = notnone_or(other._default_safe, True) and other._default_safe
-        self._metadata = { **other._metadata, **self._metadata }
+        if other._metadata:
+            self._metadata = { **other._metadata, **self._metadata }
         if allow_promotions:
             return self._maybe_promote(other)
         return self
@@ -487,7 +643,7 @@ class ConfigNode(metaclass=ConfigNodeMeta):
                 other.extend(self)
             else:
                 other.update(self)
-            other.__dict__.update(self.__dict__)
+            other._set_state(self._get_state())
             return other
         elif issubclass(type(self), type(other)): # complex dict/list replaces simple dict/list, leave as is
             return self
@@ -497,7 +653,7 @@ class ConfigNode(metaclass=ConfigNodeMeta):
                 other.extend(self.values())
             else:
                 other.update(enumerate(self))
-            other.__dict__.update(self.__dict__)
+            other._set_state(self._get_state())
             return other
         elif not self._is_plain_composed() and other._is_plain_composed(): # complex dict/list replaces simple list/dict, leave as is
             return self
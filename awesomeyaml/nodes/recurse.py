@@ -88,10 +88,7 @@ class RecurseNode(ConfigList):
 
         cfgobj = builder.build()
 
-        enode = ctx._ecfg
-        for p in path:
-            enode = getattr(enode, p)
-
+        enode = ctx._get_evaluated_container(tuple(path))
         assert isinstance(enode, EvalContext.PartialChild)
         enode.clear()
         enode._cfgobj = cfgobj
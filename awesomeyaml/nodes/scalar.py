@@ -17,6 +17,8 @@ from ..namespace import namespace
 
 
 class configbool(int):
+    __slots__ = ()
+
     def __new__(cls, value):
         return int.__new__(cls, bool(value))
 
@@ -37,6 +39,8 @@ class configbool(int):
 
 
 class ConfigNone(object):
+    __slots__ = ()
+
     def __new__(cls, value):
         if value is not None:
             raise ValueError(f'!null does not expect any arguments, but got: {value!r}')
@@ -91,7 +95,14 @@ class ConfigScalarMeta(ConfigNodeMeta):
             if value_type not in cls._types:
                 #bt = cls._allowed_scalar_types[value_type]
                 bt = cls._allowed_scalar_types.get(value_type, value_type)
-                new_value_type = ConfigScalarMeta(typename, cls._bases + (bt, ), { **cls._dict, '_dyn_base': bt } )
+                clsdict = { **cls._dict, '_dyn_base': bt, '__slots__': ConfigNode._node_slots }
+                try:
+                    new_value_type = ConfigScalarMeta(typename, cls._bases + (bt, ), clsdict)
+                except TypeError:
+                    # some types (e.g., int) do not support non-empty __slots__ in their subclasses,
+                    # in that case attributes are stored in __dict__
+                    del clsdict['__slots__']
+                    new_value_type = ConfigScalarMeta(typename, cls._bases + (bt, ), clsdict)
                 cls._types[value_type] = new_value_type
                 value_type = new_value_type
             else:
@@ -180,6 +191,9 @@ class ConfigScalar(ConfigScalarMarker, metaclass=ConfigScalarMeta):
 
         return self._dyn_base(self) # pylint: disable=no-member
 
+    def _clone_empty(self):
+        return type(self).__new__(type(self), self._get_native_value())
+
     def _is_primary_type_dynamic(self):
         return type(self).__mro__[0] in ConfigScalar._types.values()
 
@@ -187,7 +201,7 @@ class ConfigScalar(ConfigScalarMarker, metaclass=ConfigScalarMeta):
         if not self._is_primary_type_dynamic():
             return object.__reduce__(self)
 
-        state = self.__dict__.copy()
+        state = self._get_state()
         return ConfigScalar, (self._get_native_value(), ), state # pylint: disable=no-member
 
     # def __eq__(self, other):
@@ -87,5 +87,8 @@ class ConfigTuple(ComposedNode, tuple):
     def _get_value(self):
         return self
 
+    def _clone_empty(self, children):
+        return tuple.__new__(type(self), (children[idx] for idx in range(len(children))))
+
     def _set_value(self, other):
         raise TypeError(f'Cannot set value of an immutable config node: {self!r}')
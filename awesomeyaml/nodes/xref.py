@@ -15,6 +15,7 @@
 from .scalar import ConfigScalar
 from .node_path import NodePath
 from ..namespace import namespace, staticproperty
+from ..errors import EvalError
 
 
 class XRefNode(ConfigScalar(str)):
@@ -24,6 +25,7 @@ class XRefNode(ConfigScalar(str)):
     @namespace('ayns')
     def on_evaluate_impl(self, path, ctx):
         chain = [NodePath.get_str_path(path)]
+        visited = { id(self) }
         curr = self
         while isinstance(curr, XRefNode):
             try:
@@ -33,6 +35,9 @@ class XRefNode(ConfigScalar(str)):
                 raise ValueError(msg) from None
 
             chain.append(str(curr))
+            if id(ref) in visited:
+                raise EvalError(f'Nodes form a cycle of dependencies: {" -> ".join(map(repr, chain))}', self, path)
+            visited.add(id(ref))
             curr = ref
         assert curr is not self
         return ctx.evaluate_node(curr, prefix=chain[-1])
@@ -42,3 +47,9 @@ class XRefNode(ConfigScalar(str)):
     @staticmethod
     def tag():
         return '!xref'
+
+    def _get_references(self, eval_symbols):
+        try:
+            return [tuple(NodePath.get_list_path(str(self)))], True
+        except ValueError:
+            return None, False
@@ -147,13 +147,26 @@ def pad_with_none(*args, minlen=None):
 
 
 def import_name(symbol_name):
+    ''' Returns an entity identified by a dotted ``symbol_name``, importing modules as needed.
+        Results (including failures) are cached, see :py:class:`awesomeyaml.cache.ImportCache`.
+    '''
     if not symbol_name or symbol_name.endswith('.'):
         raise ValueError(f'Invalid target name: {symbol_name}')
 
+    from .cache import get_import_cache, ImportCache
+    cache = get_import_cache()
+    ret = cache.get(symbol_name)
+    if ret is not ImportCache.missing:
+        return ret
+
     elements = symbol_name.split('.')
     current = None
     try_import = True
     exceptions = []
+    # the last imported module and attributes accessed after it
+    module_name = None
+    module = None
+    attrs = []
 
     def _build_import_exception(symbol, last, excs):
         flat_excs = []
@@ -185,6 +198,7 @@ def import_name(symbol_name):
             if current:
                 try:
                     current = importlib.import_module('.' + element, package=current.__name__)
+                    module_name, module = current.__name__, current
                     continue
                 except ImportError as e:
                     exceptions.append(e)
@@ -192,6 +206,7 @@ def import_name(symbol_name):
             else:
                 try:
                     current = importlib.import_module(element)
+                    module_name, module = current.__name__, current
                     continue
                 except ImportError as e:
                     exceptions.append(e)
@@ -200,6 +215,7 @@ def import_name(symbol_name):
         if current is not None:
             try:
                 current = getattr(current, element)
+                attrs.append(element)
                 continue
             except AttributeError as e:
                 exceptions.append(e)
@@ -209,13 +225,18 @@ def import_name(symbol_name):
             import builtins
             try:
                 current = getattr(builtins, element)
+                module_name, module = builtins.__name__, builtins
+                attrs.append(element)
                 continue
             except AttributeError as e:
                 exceptions.append(e)
                 pass
 
-        raise _build_import_exception(symbol_name, current, exceptions)
+        error = _build_import_exception(symbol_name, current, exceptions)
+        cache.put_failed(symbol_name, str(error))
+        raise error
 
+    cache.put(symbol_name, module_name, module, attrs)
     return current
 
 
@@ -12,12 +12,15 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
+import sys
+import ast
+import json
+import base64
 import yaml
 import re
-import copy
-import token
+import types
 import pickle
-import tokenize
 import functools
 import contextlib
 import collections.abc as cabc
@@ -30,18 +33,47 @@ from . import errors
 
 _fstr_regex = re.compile(r"^\s*f(['\"]).*\1\s*$")
 
+# plain scalars which are parsed in the same way regardless of their context
+# and can be constructed without running the parser, see is_simple_scalar
+# "..." would end the document if parsed on its own
+_simple_scalar_regex = re.compile(r"^(?!\.\.\.)[+\-]?[\w.][\w.+\-]*\Z")
+
 _global_ctx = None
 
+try:
+    from yaml import CLoader as _CLoader, CDumper as _CDumper
+except ImportError:
+    _CLoader = None
+    _CDumper = None
+
+has_libyaml = _CLoader is not None
+default_backend = 'auto' # one of: 'auto', 'c', 'python', see get_backend
+default_dump_backend = 'python' # used by dump instead of default_backend, libyaml formats some documents differently
+default_marks = 'full' # one of: 'full', 'compact', 'none', see get_marks_mode
+
 
 class UnquotedNode(yaml.ScalarNode):
     pass
 
 
-class AwesomeyamlLoader(yaml.Loader):
+class _AwesomeyamlLoaderMixin():
+    marks_mode = 'full' # note: "marks" is already used by pyyaml's parser
+
+    def _get_position(self, node):
+        if self.marks_mode == 'full':
+            return node
+        if self.marks_mode == 'compact':
+            mark = node.start_mark
+            name = mark.name
+            if isinstance(name, str):
+                name = sys.intern(name)
+            return (name, mark.line, mark.column)
+        return None
+
     def _convert(self, value, node):
         if value is None and node.value == '':
             return value
-        ret = ConfigNode(value, pyyaml_node=node)
+        ret = ConfigNode(value, pyyaml_node=self._get_position(node))
         if ret._idx is None:
             ret._idx = self.context.get_next_stage_idx()
         if ret._source_file is None:
@@ -69,6 +101,10 @@ class AwesomeyamlLoader(yaml.Loader):
         return aynode
 
 
+class AwesomeyamlLoader(_AwesomeyamlLoaderMixin, yaml.Loader):
+    pass
+
+
 class AwesomeyamlDumper(yaml.Dumper):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -116,25 +152,182 @@ class AwesomeyamlDumper(yaml.Dumper):
         if self.event._unquoted and not text:
             self.stream.write(' ')
 
+    def represent_tagged_scalar(self, tag, value):
+        with self.force_unquoted():
+            if value is None:
+                return self.represent_scalar(tag, '', style='')
+            from .nodes.scalar import ConfigScalar
+            if isinstance(value, ConfigScalar):
+                return self.represent_scalar(tag, repr(value._dyn_base(value)))
+            return self.represent_scalar(tag, str(value))
+
+
+if has_libyaml:
+    class AwesomeyamlCLoader(_AwesomeyamlLoaderMixin, _CLoader):
+        pass
+
+
+    class AwesomeyamlCDumper(_CDumper):
+        ''' A variant of :py:class:`AwesomeyamlDumper` using libyaml's emitter.
+
+            The C emitter does not allow us to output scalars verbatim, so instead
+            of forcing unquoted ``repr`` of tagged scalars we let libyaml choose
+            the style and only make sure that the chosen style will be resolved
+            to the original type when parsed back.
+        '''
+        @contextlib.contextmanager
+        def force_unquoted(self, value=True):
+            yield
+
+        def represent_tagged_scalar(self, tag, value):
+            if value is None:
+                return self.represent_scalar(tag, '')
+            from .nodes.scalar import ConfigScalar
+            if isinstance(value, ConfigScalar):
+                native = value._dyn_base(value)
+                if isinstance(native, str):
+                    # plain str is fine as long as it would not be resolved to something else
+                    style = None
+                    if self.resolve(yaml.ScalarNode, native, (True, False)) != self.DEFAULT_SCALAR_TAG:
+                        style = "'"
+                    return self.represent_scalar(tag, native, style=style)
+                return self.represent_scalar(tag, repr(native))
+            return self.represent_scalar(tag, str(value))
+else:
+    AwesomeyamlCLoader = None
+    AwesomeyamlCDumper = None
+
+
+def get_backend(backend=None):
+    ''' Resolves the name of a yaml backend which should be used to parse/dump yaml documents.
+
+        Arguments:
+            backend : either ``'c'`` (use libyaml), ``'python'`` (use pure-Python implementation from PyYAML),
+                ``'auto'`` (use libyaml if available, fallback to pure-Python otherwise) or ``None``
+                (use :py:data:`default_backend`).
+
+        Returns:
+            Either ``'c'`` or ``'python'``.
+
+        Raises:
+            ValueError: if ``backend`` is unknown or ``'c'`` was requested explicitly but libyaml is not available.
+    '''
+    if backend is None:
+        backend = default_backend
+    if backend == 'auto':
+        return 'c' if has_libyaml else 'python'
+    if backend == 'c':
+        if not has_libyaml:
+            raise ValueError('libyaml backend requested but PyYAML has been compiled without libyaml support')
+        return backend
+    if backend == 'python':
+        return backend
+    raise ValueError(f'Unknown yaml backend: {backend!r}, expected one of: \'auto\', \'c\', \'python\'')
+
+
+def get_marks_mode(marks=None):
+    ''' Resolves how much information about the origin of parsed nodes should be kept
+        (this information is only used to produce error messages).
+
+        Arguments:
+            marks : one of:
+
+                - ``'full'`` - keep the original pyyaml nodes, error messages can then include a snippet of
+                  the relevant yaml content (with the pure-Python backend) but all the parsed content is kept alive
+                  for as long as the parsed config nodes exist
+                - ``'compact'`` - only keep a ``(filename, line, column)`` tuple, the filename is shared by all
+                  nodes parsed from the same file
+                - ``'none'`` - do not keep any position information, error messages will only include the filename
+                - ``None`` - use :py:data:`default_marks`
+
+        Returns:
+            Either ``'full'``, ``'compact'`` or ``'none'``.
+
+        Raises:
+            ValueError: if ``marks`` is unknown.
+    '''
+    if marks is None:
+        marks = default_marks
+    if marks not in ('full', 'compact', 'none'):
+        raise ValueError(f'Unknown marks mode: {marks!r}, expected one of: \'full\', \'compact\', \'none\'')
+    return marks
+
+
+def make_position(name, column, marks=None):
+    ''' Returns the position of a node starting at ``column`` in the first line of the yaml named ``name``,
+        in the same form as kept for parsed nodes with the given ``marks`` mode (see :py:func:`get_marks_mode`).
+        Used for nodes which are constructed without running the parser.
+    '''
+    marks = get_marks_mode(marks)
+    if marks == 'full':
+        mark = yaml.Mark(name, column, 0, column, None, None)
+        return yaml.Node(None, None, mark, mark)
+    if marks == 'compact':
+        if isinstance(name, str):
+            name = sys.intern(name)
+        return (name, 0, column)
+    return None
+
+
+def _get_loader_type(backend):
+    return AwesomeyamlCLoader if get_backend(backend) == 'c' else AwesomeyamlLoader
+
+
+def _get_dumper_type(backend):
+    if backend is None:
+        backend = default_dump_backend
+    return AwesomeyamlCDumper if get_backend(backend) == 'c' else AwesomeyamlDumper
+
+
+def _all_loaders():
+    return [l for l in [AwesomeyamlLoader, AwesomeyamlCLoader] if l is not None]
+
+
+def _all_dumpers():
+    return [d for d in [AwesomeyamlDumper, AwesomeyamlCDumper] if d is not None]
+
 
 def add_constructor(tag, constructor):
-    yaml.add_constructor(tag, constructor, Loader=AwesomeyamlLoader)
+    for loader in _all_loaders():
+        yaml.add_constructor(tag, constructor, Loader=loader)
 
 
 def add_multi_constructor(tag, constructor):
-    yaml.add_multi_constructor(tag, constructor, Loader=AwesomeyamlLoader)
+    for loader in _all_loaders():
+        yaml.add_multi_constructor(tag, constructor, Loader=loader)
 
 
 def add_implicit_resolver(tag, regex):
-    yaml.add_implicit_resolver(tag, regex, Loader=AwesomeyamlLoader, Dumper=AwesomeyamlDumper)
+    for loader, dumper in zip(_all_loaders(), _all_dumpers()):
+        yaml.add_implicit_resolver(tag, regex, Loader=loader, Dumper=dumper)
+
+
+def get_implicit_tag(value):
+    ''' Returns the tag which would be implicitly assigned to ``value`` if it was parsed
+        as a plain (unquoted) scalar, e.g., ``'tag:yaml.org,2002:int'`` for ``'12'``.
+    '''
+    # implicit resolvers are shared by all loaders (see add_implicit_resolver)
+    # and resolving does not depend on the loader's state
+    return AwesomeyamlLoader.resolve(AwesomeyamlLoader, yaml.ScalarNode, value, (True, False))
+
+
+def is_simple_scalar(data):
+    ''' Returns ``True`` if ``data`` is a single plain scalar consisting only of alphanumeric characters,
+        underscores, dots and signs (e.g., ``12``, ``-1e-3`` or ``foo_bar``), which is parsed in the same way
+        regardless of its context. Documents consisting of such scalars are constructed by :py:func:`parse`
+        without running the yaml parser.
+    '''
+    return _simple_scalar_regex.match(data) is not None
 
 
 def add_representer(data_type, representer):
-    yaml.add_representer(data_type, representer, Dumper=AwesomeyamlDumper)
+    for dumper in _all_dumpers():
+        yaml.add_representer(data_type, representer, Dumper=dumper)
 
 
 def add_multi_representer(data_type, representer):
-    yaml.add_multi_representer(data_type, representer, Dumper=AwesomeyamlDumper)
+    for dumper in _all_dumpers():
+        yaml.add_multi_representer(data_type, representer, Dumper=dumper)
 
 
 def rethrow_as_parsing_error(func):
@@ -160,14 +353,65 @@ def global_ctx(filename):
     _global_ctx._current_file = None
 
 
+_metadata_json_prefix = 'j'
+_metadata_literal_prefix = 'l'
+
+
+class _LegacyMetadataUnpickler(pickle.Unpickler):
+    ''' Used to read metadata encoded with hex-pickle by older versions of awesomeyaml,
+        only python literals are allowed - no arbitrary objects are created and no code is executed.
+    '''
+    _allowed = { ('builtins', 'set'), ('builtins', 'frozenset'), ('builtins', 'complex'), ('__builtin__', 'set'), ('__builtin__', 'frozenset'), ('__builtin__', 'complex') }
+
+    def find_class(self, module, name):
+        if (module, name) not in self._allowed:
+            raise pickle.UnpicklingError(f'Legacy metadata can only contain python literals, got: {module}.{name}')
+        return super().find_class(module, name)
+
+
+def _b64encode(text):
+    return base64.urlsafe_b64encode(text.encode('utf-8')).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(encoded):
+    return base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)).decode('utf-8')
+
+
 def _encode_metadata(metadata):
-    return pickle.dumps(metadata).hex()
+    ''' Encodes metadata so that they can be used as a tag suffix.
+
+        The result is a single-character format marker followed by base64url-encoded (without padding) text:
+            - ``j`` - compact JSON, used whenever metadata can be represented by JSON without loss
+            - ``l`` - python literal (``repr``), used for e.g. tuples, sets or non-string keys
+    '''
+    try:
+        text = json.dumps(metadata, separators=(',', ':'), ensure_ascii=False, allow_nan=False)
+        if json.loads(text) == metadata:
+            return _metadata_json_prefix + _b64encode(text)
+    except (TypeError, ValueError):
+        pass
+
+    text = repr(metadata)
+    try:
+        if ast.literal_eval(text) == metadata:
+            return _metadata_literal_prefix + _b64encode(text)
+    except (ValueError, SyntaxError):
+        pass
+
+    raise ValueError(f'Metadata can only contain python literals: {metadata!r}')
 
 
 def _decode_metadata(encoded):
     if not encoded:
         return {}
-    metadata = pickle.loads(bytes.fromhex(encoded))
+    fmt = encoded[0]
+    if fmt == _metadata_json_prefix:
+        metadata = json.loads(_b64decode(encoded[1:]))
+    elif fmt == _metadata_literal_prefix:
+        metadata = ast.literal_eval(_b64decode(encoded[1:]))
+    else:
+        metadata = _LegacyMetadataUnpickler(io.BytesIO(bytes.fromhex(encoded))).load()
+
     kwargs = {}
     for special in ConfigNode.special_metadata_names:
         if special in metadata:
@@ -178,11 +422,21 @@ def _decode_metadata(encoded):
 
 
 def parse_scalar(loader, node):
-    plain = (node.style is None)
+    plain = not node.style # pure-Python parser uses None for plain scalars, libyaml uses an empty string
     implicit = (True, False) if plain else (False, True)
-    notag = copy.deepcopy(node)
-    notag.tag = loader.resolve(yaml.ScalarNode, notag.value, implicit)
-    ret = loader.construct_object(notag, deep=True, convert=False)
+    tag = loader.resolve(yaml.ScalarNode, node.value, implicit)
+    constructor = loader.yaml_constructors.get(tag)
+    if constructor is not None:
+        # constructors of implicitly resolved scalars only look at the node's value,
+        # so we can pass the original node instead of creating a retagged copy
+        ret = constructor(loader, node)
+        if isinstance(ret, types.GeneratorType):
+            gen, ret = ret, next(ret)
+            for _ in gen:
+                pass
+    else:
+        notag = yaml.ScalarNode(tag, node.value, node.start_mark, node.end_mark, node.style)
+        ret = loader.construct_object(notag, deep=True, convert=False)
     if ret is None and node.value != '':
         # we differentiate between explicit and implicit None
         # for explicit None, return ConfigNode(None) so that "value is None"
@@ -620,12 +874,8 @@ def _node_representer(dumper, node):
             if tag:
                 if data is None:
                     assert tag.startswith('!null')
-                    with dumper.force_unquoted():
-                        return dumper.represent_scalar('!null', '', style='')
-                with dumper.force_unquoted():
-                    if isinstance(data, ConfigScalar):
-                        return dumper.represent_scalar(tag, repr(data._dyn_base(data)))
-                    return dumper.represent_scalar(tag, str(data))
+                    return dumper.represent_tagged_scalar('!null', None)
+                return dumper.represent_tagged_scalar(tag, data)
             else:
                 if isinstance(data, ConfigScalar):
                     return dumper.represent_data(data._dyn_base(data))
@@ -638,45 +888,36 @@ def _node_representer(dumper, node):
 
 
 def _none_representer(dumper, none):
-    with dumper.force_unquoted():
-        return dumper.represent_scalar('!null', '', style='')
+    return dumper.represent_tagged_scalar('!null', None)
 
 
 add_multi_representer(ConfigNode, _node_representer)
 add_representer(type(None), _none_representer)
 
 
+_metadata_tag = re.compile(r'(![a-zA-Z0-9_:.()]+){{')
+_metadata_token = re.compile(r'''[{}]|'(?:\\.|[^'\\\n])*'|"(?:\\.|[^"\\\n])*"''')
+
+
 def _get_metadata_end(data, beg):
-    _beg = beg+2
-    def _readline():
-        nonlocal _beg
-        end = data.find('}}', _beg)
-        if end == -1:
-            end = len(data)
-        else:
-            end += 2
-
-        ret = data[_beg:end]
-        _beg = end
-        return ret.encode('utf8')
-         
-    last_close = False
-    end = None
-    for tok in tokenize.tokenize(_readline):
-        if tok.type == token.OP and tok.string == '}':
-            if last_close:
-                end = _beg
-                break
-            else:
-                last_close = True
-        else:
-            last_close = False
+    ''' Returns the position right after the closing ``}}`` of the metadata
+        which begins at ``beg`` (pointing at the opening ``{{``), or ``None`` if
+        the metadata is not terminated. Braces within string literals are ignored.
+    '''
+    depth = 0
+    for tok in _metadata_token.finditer(data, beg):
+        c = tok.group()
+        if c == '{':
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                return tok.end()
 
-    return end
+    return None
 
 
 def _get_metadata_content(data):
-    _metadata_tag = re.compile(r'(![a-zA-Z0-9_:.()]+){{')
     curr_match = _metadata_tag.search(data)
     while curr_match is not None:
         beg = curr_match.end(1)
@@ -686,32 +927,54 @@ def _get_metadata_content(data):
             raise ValueError(f'Cannot find the end of a !metadata node which begins at: {curr_match.start()}')
 
         yield beg, end
-        curr_match = _metadata_tag.search(data, end+1)
+        curr_match = _metadata_tag.search(data, end)
 
 
 def _encode_all_metadata(data):
-    ranges = list(_get_metadata_content(data))
-    offset = 0
-    for beg, end in ranges:
-        beg += offset
-        end += offset
+    if '{{' not in data:
+        return data
 
-        metadata = eval(data[beg+1:end-1])
-        encoded = _encode_metadata(metadata)
-        repl = ':' + encoded
-        orig_len = end-beg
-        repl_len = len(repl)
-        data = data[:beg] + repl + data[end:]
-        offset += repl_len - orig_len
+    parts = []
+    pos = 0
+    for beg, end in _get_metadata_content(data):
+        try:
+            metadata = ast.literal_eval(data[beg+1:end-1])
+        except (ValueError, SyntaxError) as e:
+            line = data.count('\n', 0, beg) + 1
+            raise ValueError(f'Invalid metadata at line {line}, expected a literal dict: {data[beg+1:end-1]!r}') from e
+        if not isinstance(metadata, dict):
+            raise ValueError(f'Metadata should be a dict, got: {type(metadata).__name__}')
 
-    return data
+        parts.append(data[pos:beg])
+        parts.append(':')
+        parts.append(_encode_metadata(metadata))
+        pos = end
+
+    if not parts:
+        return data
+
+    parts.append(data[pos:])
+    return ''.join(parts)
 
 
 @errors.api_entry
-def parse(data, filename_or_builder=None, config_nodes=True):
+def parse(data, filename_or_builder=None, config_nodes=True, backend=None, marks=None):
+    ''' Parses a stream of yaml documents, yielding a config node for each of them.
+
+        Arguments:
+            data : a string or a file-like object with yaml content
+            filename_or_builder : either a :py:class:`awesomeyaml.Builder` object which will be used as a parsing context,
+                or a filename which should be associated with the parsed content (can be ``None``)
+            config_nodes : if ``False``, native values of the parsed nodes are returned instead
+            backend : yaml backend to use, see :py:func:`get_backend`
+            marks : how much information about the position of the parsed nodes should be kept, see :py:func:`get_marks_mode`
+    '''
     if not isinstance(data, str):
         data = data.read()
 
+    loader_type = _get_loader_type(backend)
+    marks = get_marks_mode(marks)
+
     @contextlib.contextmanager
     def _dummy(context):
         yield context
@@ -730,14 +993,32 @@ def parse(data, filename_or_builder=None, config_nodes=True):
     #print(data)
     with context_fn(filename_or_builder) as context:
         data = _encode_all_metadata(data)
+
         def get_loader(*args, **kwargs):
-            loader = AwesomeyamlLoader(*args, **kwargs)
+            loader = loader_type(*args, **kwargs)
             loader.context = context
-            loader.name = context.get_current_file()
+            loader.marks_mode = marks
+            if loader_type is AwesomeyamlLoader:
+                loader.name = context.get_current_file()
             return loader
 
+        def load_all(data):
+            if isinstance(data, str) and is_simple_scalar(data):
+                loader = get_loader('')
+                start = yaml.Mark(context.get_current_file(), 0, 0, 0, None, None)
+                end = yaml.Mark(context.get_current_file(), len(data), 0, len(data), None, None)
+                return [loader.construct_document(yaml.ScalarNode(loader.resolve(yaml.ScalarNode, data, (True, False)), data, start, end))]
+
+            if loader_type is AwesomeyamlCLoader:
+                # libyaml takes the name used in marks from the stream object
+                # and does not allow to change it later
+                data = io.StringIO(data)
+                data.name = context.get_current_file()
+
+            return yaml.load_all(data, Loader=get_loader)
+
         try:
-            for node in yaml.load_all(data, Loader=get_loader):
+            for node in load_all(data):
                 if config_nodes:
                     yield node
                 else:
@@ -755,14 +1036,15 @@ def parse(data, filename_or_builder=None, config_nodes=True):
 
 
 @errors.api_entry
-def dump(nodes, output=None, open_mode='w', exclude_metadata=None, sort_keys=False, **kwargs):
+def dump(nodes, output=None, open_mode='w', exclude_metadata=None, sort_keys=False, backend=None, **kwargs):
+    dumper_type = _get_dumper_type(backend)
     close = False
     if isinstance(output, str):
         output = open(output, open_mode)
         close = True
 
     def get_dumper(*args, **kwargs):
-        dumper = AwesomeyamlDumper(*args, **kwargs)
+        dumper = dumper_type(*args, **kwargs)
         assert not hasattr(dumper, 'metadata')
         dumper.metadata = []
         dumper.exclude_metadata = exclude_metadata or set()
@@ -0,0 +1,105 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+''' Evaluation of a config dense in ``!call`` nodes with positional arguments,
+    compares the current implementation of argument resolution with the
+    previous one which inspected the signature of the target function for each node.
+
+    Usage::
+
+        python benchmarks/call.py [--nodes N] [--repeat R]
+'''
+import os
+import sys
+import timeit
+import inspect
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from awesomeyaml.builder import Builder
+from awesomeyaml.eval_context import EvalContext
+from awesomeyaml.nodes.function import FunctionNode
+
+
+class Layer():
+    def __init__(self, in_features, out_features, bias=True, activation=None):
+        self.in_features = in_features
+        self.out_features = out_features
+        self.bias = bias
+        self.activation = activation
+
+
+def inspect_resolve_args(func, args):
+    positional_args = { key: value for key, value in args.items() if isinstance(key, int) }
+    if not positional_args:
+        return [], {}, args
+
+    keyword_args = { key: value for key, value in args.items() if isinstance(key, str) }
+    sig = inspect.signature(func)
+    idx_to_name = []
+    for p in sig.parameters.values():
+        if p.kind == inspect.Parameter.VAR_POSITIONAL:
+            break
+        idx_to_name.append(p.name)
+
+    idx = 0
+    unpack = []
+    while idx in positional_args:
+        unpack.append(positional_args.pop(idx))
+        idx += 1
+
+    kw_positional_args = {}
+    for idx, value in positional_args.items():
+        kw_positional_args[idx_to_name[idx]] = value
+
+    return unpack, kw_positional_args, keyword_args
+
+
+def make_document(nodes):
+    variants = [
+        '!call:__main__.Layer [{i}, 16]',
+        '!call:__main__.Layer {{ 0: {i}, 2: false, out_features: 32 }}',
+        '!call:__main__.Layer {{ 0: {i}, 1: 8, 3: relu }}',
+    ]
+    return ''.join(f'layer{i}: ' + variants[i % len(variants)].format(i=i) + '\n' for i in range(nodes))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    builder = Builder()
+    builder.add_source(make_document(args.nodes))
+    tree = builder.build()
+    run = lambda: EvalContext().evaluate(tree)
+
+    current = FunctionNode._resolve_args
+    results = {}
+    for name, impl in [('inspect', inspect_resolve_args), ('current', current)]:
+        FunctionNode._resolve_args = staticmethod(impl)
+        try:
+            results[name] = min(timeit.repeat(run, number=1, repeat=args.repeat))
+        finally:
+            FunctionNode._resolve_args = staticmethod(current)
+
+    print(f'{args.nodes} !call nodes')
+    for name, t in results.items():
+        print(f'    {name:>10}: {t*1000:8.1f} ms')
+    print(f'    speedup: {results["inspect"] / results["current"]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+''' Building a config from a base yaml and many inline command line overrides (``key=value``),
+    compares ``Config.build_from_cmdline``, which merges consecutive overrides as a single stage,
+    with building the yaml strings returned by ``Config.process_cmdline``, which are parsed
+    and merged one by one.
+
+    Usage::
+
+        python benchmarks/cmdline.py [--overrides N] [--groups G] [--repeat R]
+'''
+import os
+import sys
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from awesomeyaml.builder import Builder
+from awesomeyaml.config import Config
+
+
+def make_base(groups, per_group):
+    return '{ ' + ', '.join(f'group{g}: {{ ' + ', '.join(f'key{i}: {i}' for i in range(per_group)) + ' }' for g in range(groups)) + ' }'
+
+
+def make_overrides(overrides, groups, per_group):
+    return [f'group{i % groups}.key{(i // groups) % per_group}={i}' for i in range(overrides)]
+
+
+def separately(base, args):
+    yamls, filenames, raw_yamls = Config.process_cmdline(args)
+    b = Builder()
+    b.stages.append(base.ayns.clone())
+    b.add_multiple_sources(*yamls, raw_yaml=raw_yamls, filename=filenames)
+    return b.build()
+
+
+def batched(base, args):
+    b = Builder()
+    b.stages.append(base.ayns.clone())
+    Config._add_cmdline_sources(b, args)
+    return b.build()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--overrides', type=int, default=500)
+    parser.add_argument('--groups', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    per_group = max(1, args.overrides // args.groups)
+    b = Builder()
+    b.add_source(make_base(args.groups, per_group), raw_yaml=True)
+    base = b.stages[0]
+
+    overrides = make_overrides(args.overrides, args.groups, per_group)
+    # overrides of the same group next to each other can all be merged together
+    grouped = sorted(overrides, key=lambda o: int(o.split('.', 1)[0][len('group'):]))
+    assert separately(base, overrides) == batched(base, overrides)
+
+    for title, opts in [('interleaved groups', overrides), ('grouped', grouped)]:
+        print(f'{args.overrides} overrides, {title}')
+        for name, fn in [('separately', separately), ('batched', batched)]:
+            t = min(timeit.repeat(lambda: fn(base, opts), number=1, repeat=args.repeat))
+            print(f'    {name:>10}: {t*1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
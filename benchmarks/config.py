@@ -0,0 +1,79 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+''' Construction of a :py:class:`awesomeyaml.Config` object from a big tree, compares
+    the current implementation with the previous one which evaluated a deep copy
+    of the tree. Both time and peak memory (as reported by ``tracemalloc``) are reported,
+    together with the cost of the structural copy used by :py:class:`awesomeyaml.config.LazyConfig`.
+
+    Usage::
+
+        python benchmarks/config.py [--nodes N] [--repeat R]
+'''
+import os
+import sys
+import copy
+import timeit
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from awesomeyaml.nodes import ConfigNode
+from awesomeyaml.config import Config
+from awesomeyaml.eval_context import EvalContext
+
+
+def make_tree(nodes):
+    groups = max(1, nodes // 1000)
+    per_group = nodes // groups
+    return ConfigNode({ f'group{g}': { f'leaf{i}': (i if i % 2 else f'value{i}') for i in range(per_group) } for g in range(groups) })
+
+
+def deepcopy_config(tree):
+    return EvalContext().evaluate(copy.deepcopy(tree))
+
+
+def measure_peak(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--nodes', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    tree = make_tree(args.nodes)
+    cases = [
+        ('deepcopy', lambda: deepcopy_config(tree)),
+        ('current', lambda: Config(tree)),
+        ('deepcopy only', lambda: copy.deepcopy(tree)),
+        ('clone only', lambda: tree.ayns.clone()),
+    ]
+
+    print(f'{args.nodes} nodes')
+    for name, fn in cases:
+        t = min(timeit.repeat(fn, number=1, repeat=args.repeat))
+        peak = measure_peak(fn)
+        print(f'    {name:>14}: {t*1000:8.1f} ms, peak {peak / 2**20:7.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+''' Evaluation of a deep tree, leaves are placed under a chain of nested
+    dicts so that all of them are ``depth`` levels below the root.
+
+    Usage::
+
+        python benchmarks/evaluate.py [--depth D] [--leaves N] [--groups G] [--repeat R]
+'''
+import os
+import sys
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from awesomeyaml.nodes import ConfigNode
+from awesomeyaml.eval_context import EvalContext
+
+
+def make_tree(depth, leaves, groups):
+    per_group = leaves // groups
+    bottom = { f'group{g}': { f'leaf{i}': i for i in range(per_group) } for g in range(groups) }
+    for level in range(depth - 2):
+        bottom = { f'level{depth - 3 - level}': bottom }
+    return ConfigNode(bottom)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--depth', type=int, default=20)
+    parser.add_argument('--leaves', type=int, default=50000)
+    parser.add_argument('--groups', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    tree = make_tree(args.depth, args.leaves, args.groups)
+    run = lambda: EvalContext().evaluate(tree)
+
+    t = min(timeit.repeat(run, number=1, repeat=args.repeat))
+    print(f'depth {args.depth}, {args.leaves} leaves in {args.groups} groups')
+    print(f'    evaluate: {t*1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+''' Cost of accessing members of the ``ayns`` namespace of config nodes,
+    compared with accessing a plain property.
+
+    Usage::
+
+        python benchmarks/namespace.py [--number N] [--repeat R]
+'''
+import os
+import sys
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from awesomeyaml.nodes import ConfigNode
+
+
+class Plain():
+    def __init__(self):
+        self._value = None
+
+    @property
+    def value(self):
+        if self._value is None:
+            return 0
+        return self._value
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    plain = Plain()
+    node = ConfigNode({ 'a': 1 })
+    child = node['a']
+    bound = child.ayns
+
+    cases = [
+        ('plain property', lambda: plain.value),
+        ('node.ayns', lambda: child.ayns),
+        ('bound.priority', lambda: bound.priority),
+        ('node.ayns.priority', lambda: child.ayns.priority),
+        ('node.ayns.get_child', lambda: node.ayns.get_child),
+        ('type(node).ayns.set_child', lambda: type(node).ayns.set_child),
+    ]
+
+    for name, fn in cases:
+        t = min(timeit.repeat(fn, number=args.number, repeat=args.repeat))
+        print(f'{name:>26}: {t / args.number * 1e9:8.1f} ns')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+''' Parsing of many independent files with ``Builder.add_multiple_sources``, compares
+    sequential parsing with parsing using a pool of threads and a pool of processes.
+    ``--latency`` adds a delay to opening each file, to simulate a slow (e.g., network) filesystem.
+
+    Usage::
+
+        python benchmarks/parallel_parse.py [--files F] [--keys N] [--workers W] [--latency S] [--repeat R]
+'''
+import os
+import sys
+import time
+import timeit
+import argparse
+import builtins
+import tempfile
+import concurrent.futures
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from awesomeyaml.builder import Builder
+
+
+def make_files(directory, files, keys):
+    ret = []
+    for f in range(files):
+        path = os.path.join(directory, f'config{f}.yaml')
+        with open(path, 'w') as fd:
+            fd.write(f'group{f}:\n')
+            for i in range(keys):
+                fd.write(f'    key{i}: !weak {{ value: {i}, name: name{i}, items: [1, 2, 3] }}\n')
+        ret.append(path)
+    return ret
+
+
+def slow_open(latency):
+    # worker processes are forked, so they inherit the patched function
+    orig = builtins.open
+    def impl(*args, **kwargs):
+        time.sleep(latency)
+        return orig(*args, **kwargs)
+    builtins.open = impl
+
+
+def build(files, executor):
+    b = Builder(use_cache=False, executor=executor)
+    b.add_multiple_sources(*files)
+    return b.build()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=16)
+    parser.add_argument('--keys', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        files = make_files(directory, args.files, args.keys)
+        if args.latency:
+            slow_open(args.latency)
+
+        print(f'{args.files} files with {args.keys} keys each, {args.latency*1000:.0f} ms latency')
+        cases = [
+            ('sequential', lambda: None),
+            ('threads', lambda: concurrent.futures.ThreadPoolExecutor(args.workers)),
+            ('processes', lambda: concurrent.futures.ProcessPoolExecutor(args.workers)),
+        ]
+        for name, make_executor in cases:
+            executor = make_executor()
+            try:
+                # warm up the pool
+                build(files, executor)
+                t = min(timeit.repeat(lambda: build(files, executor), number=1, repeat=args.repeat))
+            finally:
+                if executor is not None:
+                    executor.shutdown()
+            print(f'    {name:>10}: {t*1000:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
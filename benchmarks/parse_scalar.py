@@ -0,0 +1,76 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+''' Parsing of a document dense in tagged scalars, compares the current
+    implementation of :py:func:`awesomeyaml.yaml.parse_scalar` with the
+    previous one which deep-copied each yaml node before constructing it.
+
+    Usage::
+
+        python benchmarks/parse_scalar.py [--keys N] [--repeat R] [--backend auto|c|python]
+'''
+import os
+import sys
+import copy
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import yaml
+import awesomeyaml.yaml as ayaml
+
+
+def deepcopy_parse_scalar(loader, node):
+    plain = not node.style
+    implicit = (True, False) if plain else (False, True)
+    notag = copy.deepcopy(node)
+    notag.tag = loader.resolve(yaml.ScalarNode, notag.value, implicit)
+    ret = loader.construct_object(notag, deep=True, convert=False)
+    if ret is None and node.value != '':
+        return ayaml.ConfigNode(None)
+    return ret
+
+
+def make_document(keys):
+    tags = ['!weak 3', '!force foo', '!null', '!weak 1.5', '!force true', "!weak 'bar'", '!required']
+    return '\n'.join(f'key{i}: {tags[i % len(tags)]}' for i in range(keys)) + '\n'
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--keys', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--backend', default='auto')
+    args = parser.parse_args()
+
+    doc = make_document(args.keys)
+    run = lambda: list(ayaml.parse(doc, backend=args.backend))
+
+    current = ayaml.parse_scalar
+    results = {}
+    for name, impl in [('deepcopy', deepcopy_parse_scalar), ('current', current)]:
+        ayaml.parse_scalar = impl
+        try:
+            results[name] = min(timeit.repeat(run, number=1, repeat=args.repeat))
+        finally:
+            ayaml.parse_scalar = current
+
+    print(f'{args.keys} tagged scalars, backend: {ayaml.get_backend(args.backend)}')
+    for name, t in results.items():
+        print(f'    {name:>10}: {t*1000:8.1f} ms')
+    print(f'    speedup: {results["deepcopy"] / results["current"]:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
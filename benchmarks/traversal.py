@@ -0,0 +1,95 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+''' Traversal of a deep chain of dicts and of a wide tree, compares ``ayns.walk``
+    (and the helpers implemented with it) with the previous recursive implementation
+    of ``ayns.nodes_with_paths``, which re-yielded each node through all of its ancestors.
+
+    Usage::
+
+        python benchmarks/traversal.py [--depth D] [--nodes N] [--repeat R]
+'''
+import os
+import sys
+import timeit
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from awesomeyaml.nodes import ConfigNode
+from awesomeyaml.nodes.dict import ConfigDict
+from awesomeyaml.nodes.composed import ComposedNode
+from awesomeyaml.nodes.node_path import NodePath
+from awesomeyaml.config import Config
+
+
+def make_chain(depth):
+    # constructed bottom-up, as constructing nodes from a deep dict is recursive
+    ret = ConfigDict({ 'leaf': 0 })
+    for _ in range(depth - 1):
+        ret = ConfigDict({ 'k': ret })
+    return ret
+
+
+def make_wide(nodes):
+    groups = max(1, nodes // 1000)
+    per_group = nodes // groups
+    return ConfigNode({ f'group{g}': { f'leaf{i}': i for i in range(per_group) } for g in range(groups) })
+
+
+def recursive_nodes_with_paths(node, prefix=None):
+    prefix = NodePath.get_list_path(prefix, check_types=False) or NodePath()
+    for name, child in node._children.items():
+        child_path = prefix + [name]
+        yield child_path, child
+        if isinstance(child, ComposedNode):
+            yield from recursive_nodes_with_paths(child, prefix=child_path)
+
+
+def consume(itr):
+    for _ in itr:
+        pass
+
+
+def run(title, tree, repeat):
+    cases = [
+        ('recursive', lambda: consume(recursive_nodes_with_paths(tree))),
+        ('nodes_with_paths', lambda: consume(tree.ayns.nodes_with_paths())),
+        ('walk (no copies)', lambda: consume(tree.ayns.walk(copy_paths=False))),
+        ('map_nodes', lambda: tree.ayns.map_nodes(lambda path, node: node)),
+        ('filter_nodes', lambda: tree.ayns.filter_nodes(lambda path, node: True)),
+        ('check_missing', lambda: Config.check_missing(tree)),
+    ]
+
+    print(title)
+    for name, fn in cases:
+        t = min(timeit.repeat(fn, number=1, repeat=repeat))
+        print(f'    {name:>16}: {t*1000:8.1f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--depth', type=int, default=1000)
+    parser.add_argument('--nodes', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    # the recursive implementation needs a few frames per level
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 4 * args.depth))
+
+    run(f'chain of {args.depth} dicts', make_chain(args.depth), args.repeat)
+    run(f'{args.nodes} leaves in groups of 1000', make_wide(args.nodes), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
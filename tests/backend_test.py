@@ -0,0 +1,157 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from .utils import setUpModule
+
+
+class BackendTest(unittest.TestCase):
+    def setUp(self):
+        self.data = '''
+            foo: !weak 3
+            bar: !force 'bar'
+            baz: !null
+            qux: !metadata{{ 'priority': 1, 'custom': 2 }} [1, 2]
+            str_int: !weak '3'
+            call: !call:dict { x: 1 }
+            fstr: f'{foo}'
+        '''
+
+    def _backends(self):
+        from awesomeyaml.yaml import has_libyaml
+        ret = ['python']
+        if has_libyaml:
+            ret.append('c')
+        return ret
+
+    def test_get_backend(self):
+        from awesomeyaml.yaml import get_backend, has_libyaml
+        self.assertEqual(get_backend('python'), 'python')
+        self.assertEqual(get_backend('auto'), 'c' if has_libyaml else 'python')
+        with self.assertRaises(ValueError):
+            get_backend('foo')
+
+    def test_parse(self):
+        from awesomeyaml.yaml import parse
+        results = []
+        for backend in self._backends():
+            node = list(parse(self.data, 'test.yaml', backend=backend))[0]
+            self.assertEqual(node.foo.ayns.priority, -1)
+            self.assertEqual(node.qux.ayns.metadata, { 'custom': 2 })
+            mark = node.foo._pyyaml_node.start_mark
+            self.assertEqual(mark.name, 'test.yaml')
+            self.assertEqual(mark.line, 1)
+            results.append(node.ayns.native_value)
+
+        for result in results[1:]:
+            self.assertEqual(result, results[0])
+
+    def test_dump_roundtrip(self):
+        from awesomeyaml.yaml import parse, dump
+        for parse_backend in self._backends():
+            node = list(parse(self.data, backend=parse_backend))[0]
+            for dump_backend in self._backends():
+                with self.subTest(parse=parse_backend, dump=dump_backend):
+                    dumped = dump(node, backend=dump_backend)
+                    node2 = list(parse(dumped, backend=parse_backend))[0]
+                    self.assertEqual(node2.ayns.native_value, node.ayns.native_value)
+                    self.assertEqual(node2.str_int, '3')
+                    self.assertIsNone(node2.baz.ayns.native_value)
+
+    def test_dump_default(self):
+        from awesomeyaml.yaml import parse, dump
+        node = list(parse(self.data))[0]
+        self.assertEqual(dump(node), dump(node, backend='python'))
+
+    def test_simple_scalars(self):
+        from unittest import mock
+        import yaml
+        from awesomeyaml.yaml import parse, is_simple_scalar
+        from awesomeyaml.errors import ParsingError
+        for value in ['12', '-1e-3', '.inf', 'yes', 'null', 'foo_bar']:
+            self.assertTrue(is_simple_scalar(value))
+            # the same scalar parsed by the yaml parser
+            expected = list(parse(f'- {value}', 'test.yaml'))[0][0]
+            for backend in [None] + self._backends():
+                with self.subTest(value=value, backend=backend):
+                    # simple scalars are constructed without running the parser
+                    with mock.patch.object(yaml, 'load_all', wraps=yaml.load_all) as load_all:
+                        node = list(parse(value, 'test.yaml', backend=backend))[0]
+                    load_all.assert_not_called()
+                    self.assertIs(type(node), type(expected))
+                    self.assertEqual(node, expected)
+                    self.assertEqual(node._source_file, 'test.yaml')
+                    self.assertEqual(node._pyyaml_node.start_mark.name, 'test.yaml')
+
+        for value in ['', 'foo bar', '-', '!weak 1', "'1'", '[1]', 'a: 1', '...', '....', 'foo\n']:
+            self.assertFalse(is_simple_scalar(value))
+
+        for backend in [None] + self._backends():
+            with self.subTest(backend=backend):
+                self.assertEqual(list(parse('foo\n', config_nodes=False, backend=backend)), ['foo'])
+                # errors raised when constructing the node are reported as usual
+                with self.assertRaisesRegex(ParsingError, 'datetime.date'):
+                    list(parse('2001-12-14', 'test.yaml', backend=backend))
+
+    def test_builder(self):
+        from awesomeyaml.config import Config
+        from awesomeyaml.builder import Builder
+        for backend in self._backends():
+            b = Builder(backend=backend)
+            b.add_source(self.data, filename='test.yaml')
+            cfg = Config(b.build())
+            self.assertEqual(cfg.foo, 3)
+            self.assertEqual(cfg.call, { 'x': 1 })
+            self.assertEqual(cfg.fstr, '3')
+
+
+class MarksTest(unittest.TestCase):
+    def setUp(self):
+        self.data = 'foo: 1\nbar: !xref baz\n'
+
+    def test_get_marks_mode(self):
+        from awesomeyaml.yaml import get_marks_mode
+        self.assertEqual(get_marks_mode('compact'), 'compact')
+        self.assertEqual(get_marks_mode(), 'full')
+        with self.assertRaises(ValueError):
+            get_marks_mode('foo')
+
+    def test_positions(self):
+        import yaml
+        from awesomeyaml.yaml import parse
+        node = list(parse(self.data, 'test.yaml', marks='full'))[0]
+        self.assertIsInstance(node.bar._pyyaml_node, yaml.Node)
+
+        node = list(parse(self.data, 'test.yaml', marks='compact'))[0]
+        self.assertEqual(node.bar._pyyaml_node, ('test.yaml', 1, 5))
+        self.assertIs(node.foo._pyyaml_node[0], node.bar._pyyaml_node[0])
+
+        node = list(parse(self.data, 'test.yaml', marks='none'))[0]
+        self.assertIsNone(node.bar._pyyaml_node)
+
+    def test_error_messages(self):
+        from awesomeyaml.config import Config
+        from awesomeyaml.builder import Builder
+        from awesomeyaml.errors import EvalError
+        for marks, expected in [('full', 'line 2, column 6'), ('compact', 'line 2, column 6'), ('none', 'test.yaml')]:
+            with self.subTest(marks=marks):
+                b = Builder(marks=marks, use_cache=False)
+                b.add_source(self.data, filename='test.yaml')
+                with self.assertRaises(EvalError) as ctx:
+                    Config(b.build())
+                self.assertIn(expected, str(ctx.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
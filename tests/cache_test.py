@@ -0,0 +1,328 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import shutil
+import tempfile
+import unittest
+
+from .utils import setUpModule
+
+
+class ParseCacheTest(unittest.TestCase):
+    def setUp(self):
+        from awesomeyaml.cache import ParseCache, get_parse_cache, set_parse_cache
+        self._old_cache = get_parse_cache()
+        self.cache = ParseCache()
+        set_parse_cache(self.cache)
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        from awesomeyaml.cache import set_parse_cache
+        set_parse_cache(self._old_cache)
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_include(self):
+        from awesomeyaml.config import Config
+        self._write('defaults.yaml', 'lr: 0.1\nlayers: [1, 2]\n')
+        main = self._write('main.yaml', 'a: !include defaults.yaml\nb: !include defaults.yaml\nc: !include defaults.yaml\n')
+        cfg = Config.build(main)
+        self.assertEqual(cfg.a, { 'lr': 0.1, 'layers': [1, 2] })
+        self.assertEqual(cfg.c, cfg.a)
+        stats = self.cache.stats()
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['hits'], 2)
+
+    def test_copy_on_hit(self):
+        from awesomeyaml.builder import Builder
+        path = self._write('defaults.yaml', 'foo: { bar: 1 }\n')
+        b = Builder()
+        b.add_source(path)
+        b.add_source('foo: { baz: 2 }')
+        b.add_source(path)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertIsNot(b.stages[0], b.stages[2])
+        self.assertEqual(b.stages[2].ayns.idx, 2)
+        self.assertEqual(b.stages[2].foo.bar.ayns.idx, 2)
+        self.assertEqual(b.build().ayns.native_value, { 'foo': { 'bar': 1, 'baz': 2 } })
+
+        b = Builder()
+        b.add_source(path)
+        self.assertEqual(b.build().ayns.native_value, { 'foo': { 'bar': 1 } })
+
+    def test_invalidation(self):
+        from awesomeyaml.config import Config
+        path = self._write('defaults.yaml', 'foo: 1\n')
+        self.assertEqual(Config.build(path).foo, 1)
+        self._write('defaults.yaml', 'foo: 12\n')
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1000))
+        self.assertEqual(Config.build(path).foo, 12)
+        self.assertEqual(self.cache.stats()['hits'], 0)
+
+    def test_hash_content(self):
+        from awesomeyaml.config import Config
+        self.cache.hash_content = True
+        path = self._write('defaults.yaml', 'foo: 1\n')
+        st = os.stat(path)
+        self.assertEqual(Config.build(path).foo, 1)
+        self._write('defaults.yaml', 'foo: 2\n')
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(Config.build(path).foo, 2)
+
+    def test_lru(self):
+        from awesomeyaml.config import Config
+        self.cache.max_size = 2
+        paths = [self._write(f'file{i}.yaml', f'foo: {i}\n') for i in range(3)]
+        for path in paths:
+            Config.build(path)
+        self.assertEqual(len(self.cache), 2)
+        Config.build(paths[0])
+        self.assertEqual(self.cache.stats()['hits'], 0)
+        Config.build(paths[2])
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_disabled(self):
+        from awesomeyaml.builder import Builder
+        path = self._write('defaults.yaml', 'foo: 1\n')
+        b = Builder(use_cache=False)
+        b.add_source(path)
+        b.add_source(path)
+        self.assertEqual(self.cache.stats(), { 'hits': 0, 'misses': 0, 'size': 0, 'max_size': 128 })
+
+
+class DiskCacheTest(unittest.TestCase):
+    def setUp(self):
+        from awesomeyaml.cache import get_disk_cache, set_disk_cache, get_parse_cache, set_parse_cache
+        self._old_cache = get_parse_cache()
+        self._old_disk_cache = get_disk_cache()
+        self.tmpdir = tempfile.mkdtemp()
+        set_parse_cache(None)
+        set_disk_cache(os.path.join(self.tmpdir, 'cache'))
+        self.cache = get_disk_cache()
+
+    def tearDown(self):
+        from awesomeyaml.cache import set_disk_cache, set_parse_cache
+        set_parse_cache(self._old_cache)
+        set_disk_cache(self._old_disk_cache)
+        shutil.rmtree(self.tmpdir)
+
+    def _write(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def test_reuse(self):
+        from awesomeyaml.config import Config
+        path = self._write('defaults.yaml', 'foo: !weak 1\nbar: !include other.yaml\n')
+        self._write('other.yaml', 'baz: [1, 2]\n')
+        cfg = Config.build(path)
+        self.assertEqual(self.cache.stats()['misses'], 2)
+        self.assertEqual(len(os.listdir(self.cache.directory)), 2)
+
+        cfg2 = Config.build(path)
+        self.assertEqual(cfg, cfg2)
+        self.assertEqual(self.cache.stats()['hits'], 2)
+        self.assertEqual(cfg2.ayns.source.foo.ayns.priority, -1)
+        self.assertEqual(cfg2.ayns.source.foo.ayns.source_file, path)
+
+    def test_invalidation(self):
+        from awesomeyaml.config import Config
+        import awesomeyaml.version
+        path = self._write('defaults.yaml', 'foo: 1\n')
+        Config.build(path)
+        self._write('defaults.yaml', 'foo: 2\n')
+        self.assertEqual(Config.build(path).foo, 2)
+
+        old_version = awesomeyaml.version.version
+        awesomeyaml.version.version = old_version + '.test'
+        try:
+            self.assertEqual(Config.build(path).foo, 2)
+        finally:
+            awesomeyaml.version.version = old_version
+
+        self.assertEqual(self.cache.stats()['hits'], 0)
+        self.assertEqual(self.cache.stats()['misses'], 3)
+
+    def test_corrupted(self):
+        from awesomeyaml.config import Config
+        path = self._write('defaults.yaml', 'foo: 1\n')
+        Config.build(path)
+        entry, = os.listdir(self.cache.directory)
+        with open(os.path.join(self.cache.directory, entry), 'wb') as f:
+            f.write(b'not a pickle')
+        self.assertEqual(Config.build(path).foo, 1)
+        self.assertEqual(Config.build(path).foo, 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_shadowing_names(self):
+        from awesomeyaml.config import Config
+        path = self._write('defaults.yaml', 'foo: !weak { items: [1, 2], keys: 3 }\n')
+        Config.build(path)
+        cfg = Config.build(path)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(cfg['foo']['items'], [1, 2])
+        self.assertEqual(cfg['foo']['keys'], 3)
+        self.assertEqual(cfg.ayns.source['foo'].ayns.priority, -1)
+
+    def test_clear(self):
+        from awesomeyaml.config import Config
+        Config.build(self._write('defaults.yaml', 'foo: 1\n'))
+        self.cache.clear()
+        self.assertEqual(os.listdir(self.cache.directory), [])
+
+
+class CodeCacheTest(unittest.TestCase):
+    def setUp(self):
+        from awesomeyaml.cache import CodeCache, get_code_cache, set_code_cache
+        self._old_cache = get_code_cache()
+        self.cache = CodeCache()
+        set_code_cache(self.cache)
+
+    def tearDown(self):
+        from awesomeyaml.cache import set_code_cache
+        set_code_cache(self._old_cache)
+
+    def test_reuse(self):
+        from awesomeyaml.config import Config
+        cfg = Config.build('a: 2\nb: !eval a*2\nc: !eval a*2\nd: f\'{a+1}\'\n', '{ a: 3 }')
+        self.assertEqual(cfg.b, 6)
+        self.assertEqual(cfg.c, 6)
+        self.assertEqual(cfg.d, '4')
+        self.assertEqual(self.cache.stats()['misses'], 2)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+        cfg = Config.build('a: 2\nb: !eval a*2\nd: f\'{a+1}\'\n')
+        self.assertEqual(cfg.b, 4)
+        self.assertEqual(cfg.d, '3')
+        self.assertEqual(self.cache.stats()['hits'], 3)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_disabled(self):
+        from awesomeyaml.config import Config
+        from awesomeyaml.cache import set_code_cache, get_code_cache
+        set_code_cache(None)
+        self.assertEqual(Config.build('{ a: 2, b: !eval a*2 }').b, 4)
+        self.assertEqual(len(get_code_cache()), 0)
+
+    def test_error_not_cached(self):
+        from awesomeyaml.config import Config
+        from awesomeyaml.errors import EvalError
+        with self.assertRaises(EvalError):
+            Config.build('{ a: !eval "1 +" }')
+        self.assertEqual(len(self.cache), 0)
+
+
+class ImportCacheTest(unittest.TestCase):
+    def setUp(self):
+        from awesomeyaml.cache import ImportCache, get_import_cache, set_import_cache
+        self._old_cache = get_import_cache()
+        self.cache = ImportCache()
+        set_import_cache(self.cache)
+
+    def tearDown(self):
+        from awesomeyaml.cache import set_import_cache
+        set_import_cache(self._old_cache)
+
+    def test_resolve(self):
+        import sys
+        import types
+        from awesomeyaml.utils import import_name
+        self.assertIs(import_name('os.path.join'), os.path.join)
+        self.assertIs(import_name('os.path.join'), os.path.join)
+        self.assertIs(import_name('len'), len)
+        self.assertEqual(self.cache.stats(), { 'hits': 1, 'misses': 2, 'size': 2, 'max_size': 1024, 'failed': 0 })
+
+        # replaced module
+        mod = types.ModuleType('_ayns_test_module')
+        mod.foo = 1
+        sys.modules['_ayns_test_module'] = mod
+        try:
+            self.assertEqual(import_name('_ayns_test_module.foo'), 1)
+            mod.foo = 2
+            self.assertEqual(import_name('_ayns_test_module.foo'), 2)
+            mod2 = types.ModuleType('_ayns_test_module')
+            mod2.foo = 3
+            sys.modules['_ayns_test_module'] = mod2
+            self.assertEqual(import_name('_ayns_test_module.foo'), 3)
+        finally:
+            del sys.modules['_ayns_test_module']
+
+    def test_failed(self):
+        import sys
+        import types
+        from awesomeyaml.utils import import_name
+        with self.assertRaisesRegex(ImportError, 'Cannot find an entity named'):
+            import_name('_ayns_missing_module.foo')
+        with self.assertRaisesRegex(ImportError, 'Cannot find an entity named'):
+            import_name('_ayns_missing_module.foo')
+        self.assertEqual(self.cache.stats(), { 'hits': 1, 'misses': 1, 'size': 1, 'max_size': 1024, 'failed': 1 })
+
+        # another module replacing an unrelated one does not affect the entry
+        sys.modules['_ayns_other_module'] = types.ModuleType('_ayns_other_module')
+        mod = types.ModuleType('_ayns_missing_module')
+        mod.foo = 1
+        sys.modules['_ayns_missing_module'] = mod
+        del sys.modules['_ayns_other_module']
+        try:
+            self.assertEqual(import_name('_ayns_missing_module.foo'), 1)
+        finally:
+            del sys.modules['_ayns_missing_module']
+
+    def test_invalidate_caches(self):
+        import importlib
+        from awesomeyaml.utils import import_name
+        with self.assertRaises(ImportError):
+            import_name('_ayns_missing_module.foo')
+        importlib.invalidate_caches()
+        with self.assertRaises(ImportError):
+            import_name('_ayns_missing_module.foo')
+        self.assertEqual(self.cache.stats()['misses'], 2)
+        self.assertEqual(self.cache.stats()['hits'], 0)
+
+        with self.assertRaises(ImportError):
+            import_name('_ayns_missing_module.foo')
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_lru(self):
+        from awesomeyaml.utils import import_name
+        self.cache.max_size = 2
+        import_name('os.path.join')
+        with self.assertRaises(ImportError):
+            import_name('_ayns_missing_module.foo')
+        import_name('os.path.join')
+        import_name('len')
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.stats()['failed'], 0)
+        import_name('os.path.join')
+        self.assertEqual(self.cache.stats()['hits'], 2)
+
+    def test_disabled(self):
+        from awesomeyaml.utils import import_name
+        from awesomeyaml.cache import set_import_cache, get_import_cache
+        set_import_cache(None)
+        self.assertIs(import_name('os.path.join'), os.path.join)
+        with self.assertRaises(ImportError):
+            import_name('_ayns_missing_module.foo')
+        self.assertEqual(len(get_import_cache()), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
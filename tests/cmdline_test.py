@@ -55,6 +55,94 @@ class CmdlineTest(unittest.TestCase):
         """)
         self.assertEqual(cfg.foo[0], 'test=1')
 
+    def build_separately(self, *args):
+        yamls, filenames, raw_yamls = Config.process_cmdline(args)
+        return Config.build(*yamls, raw_yaml=raw_yamls, filename=filenames)
+
+    def get_stages(self, *args):
+        from awesomeyaml.builder import Builder
+        b = Builder()
+        Config._add_cmdline_sources(b, args)
+        return b.stages
+
+    def test_batched(self):
+        base = "{ foo: { bar: [1, { baz: 2 }], qux: 3 }, lr: [0.1, 0.2], name: test, opts: { a: 1, b: 2 } }"
+        cases = [
+            ("foo.bar[0]=10", "foo.bar[1].baz=20", "foo.qux=30", "lr=0.5", "name=other"),
+            ("foo.qux=1", "lr=2", "foo.qux=3"),
+            ("foo.qux=1", "lr=2", "foo.bar[0]=3"),
+            ("opts={ a: 3 }", "opts.b=4"),
+            ("opts.a=3", "opts.b=!weak 4"),
+            ("lr=!xref foo.qux", "name=!fstr '{lr}'", "foo.qux=1 }, lr: 5, opts: { b: 2"),
+            ("opts.a=3, b: 5", "lr=[1, 2]", "name=x"),
+            ("!new extra=1", "lr=2", "extra=3"),
+            ("lr=2", "{ opts: { a: 5 } }", "opts.b=6"),
+            ("name=...", "lr=.5", "foo.qux=-..."),
+        ]
+        for args in cases:
+            with self.subTest(args=args):
+                self.assertEqual(Config.build_from_cmdline(base, *args), self.build_separately(base, *args))
+
+    def test_batched_stages(self):
+        stages = self.get_stages("foo.bar[0]=1", "foo.qux=2", "lr=3", "foo.qux=4", "!new extra=5", "name=6")
+        self.assertEqual(len(stages), 4)
+        first = stages[0]
+        self.assertEqual(first.ayns.get_node('foo.bar[0]')._source_file, '<Commandline argument #1>')
+        self.assertEqual(first.ayns.get_node('foo')._source_file, '<Commandline argument #1>')
+        self.assertEqual(first.ayns.get_node('foo.qux')._source_file, '<Commandline argument #2>')
+        self.assertEqual(first.ayns.get_node('lr')._source_file, '<Commandline argument #3>')
+        self.assertFalse(first._allow_new)
+        self.assertEqual(stages[1].ayns.get_node('foo.qux')._source_file, '<Commandline argument #4>')
+        self.assertEqual(stages[2]._source_file, '<Commandline argument #5>')
+        for idx, stage in enumerate(stages):
+            self.assertTrue(all(node._idx == idx for node in stage.ayns.nodes(include_self=True)))
+
+    def test_batched_typo(self):
+        with self.assertRaisesRegex(MergeError, r".*Node 'fooo' \(source file: '<Commandline argument #3>'\).*"):
+            _ = Config.build_from_cmdline("{ foo: 12, bar: 1 }", "bar=2", "fooo=1")
+
+    def test_batched_errors(self):
+        from awesomeyaml.errors import EvalError, ParsingError
+        base = "{ foo: { bar: 1 }, lr: 0.1 }"
+        cases = [
+            (MergeError, ("foo.bar=2", "foo.baz=3")),
+            (MergeError, ("foo.bar=[1, x]", "foo.baz=3")),
+            (MergeError, ("foo.bar = 2", "foo.qux.a={ b: !xref lr }")),
+            (MergeError, ("lr=2", "foo={ baz: 3 }")),
+            (EvalError, ("foo.bar=2", "lr=!xref foo.baz")),
+            (ParsingError, ("lr=2", "foo.bar=2001-12-14")),
+            (ParsingError, ("lr=2", "foo.bar=[2001-12-14]")),
+        ]
+        for error_type, args in cases:
+            with self.subTest(args=args):
+                with self.assertRaises(error_type) as expected:
+                    self.build_separately(base, *args)
+                with self.assertRaises(error_type) as batched:
+                    Config.build_from_cmdline(base, *args)
+                self.assertEqual(str(batched.exception), str(expected.exception))
+
+    def test_batched_positions(self):
+        from awesomeyaml import yaml
+        args = ("foo.bar[1].baz=20", "foo.qux=[1, 2]", "lr=0.5")
+        stage, = self.get_stages(*args)
+        yamls, _, _ = Config.process_cmdline(args)
+        for path, idx, text in [('foo', 0, '{ bar:'), ('foo.bar', 0, '{ 1:'), ('foo.bar[1]', 0, '{ baz:'), ('foo.bar[1].baz', 0, '20'),
+                                ('foo.qux', 1, '[1, 2]'), ('foo.qux[1]', 1, '2'), ('lr', 2, '0.5')]:
+            with self.subTest(path=path):
+                node = stage.ayns.get_node(path)
+                mark = node._pyyaml_node.start_mark
+                self.assertEqual(mark.name, f'<Commandline argument #{idx+1}>')
+                self.assertEqual(mark.line, 0)
+                self.assertTrue(yamls[idx][mark.column:].startswith(text))
+
+        old_marks = yaml.default_marks
+        yaml.default_marks = 'compact'
+        try:
+            stage, = self.get_stages(*args)
+        finally:
+            yaml.default_marks = old_marks
+        self.assertEqual(stage.ayns.get_node('lr')._pyyaml_node, ('<Commandline argument #3>', 0, yamls[2].index('0.5')))
+
 
 
 if __name__ == '__main__':
@@ -270,5 +270,50 @@ class ComposedNodeNestedTest(unittest.TestCase):
         self.test = None
 
 
+class ContainsNotNewTest(unittest.TestCase):
+    def setUp(self):
+        from awesomeyaml.nodes.dict import ConfigDict
+        self.test = ConfigDict({ 'a': { 'b': { 'c': 1 } }, 'd': [1, { 'e': 2 }] })
+
+    def tearDown(self):
+        self.test = None
+
+    def test_construction(self):
+        from awesomeyaml.nodes.dict import ConfigDict
+        self.assertFalse(self.test._contains_notnew())
+        self.assertFalse(self.test.a._contains_notnew())
+        test = ConfigDict({ 'a': { 'b': ConfigDict({ 'c': 1 }, allow_new=False) } })
+        self.assertTrue(test._contains_notnew())
+        self.assertFalse(test.a.b.c.ayns.allow_new)
+
+    def test_deep_set_child(self):
+        from awesomeyaml.nodes.dict import ConfigDict
+        self.test.a.b.ayns.set_child('f', ConfigDict({ 'g': 3 }, allow_new=False))
+        self.assertTrue(self.test._contains_notnew())
+        self.assertTrue(self.test.a._contains_notnew())
+        self.assertFalse(self.test.d._contains_notnew())
+        with self.assertRaises(ValueError):
+            self.test.ayns._require_all_new([], 'test')
+
+    def test_deep_list_insert(self):
+        from awesomeyaml.nodes.dict import ConfigDict
+        self.assertFalse(self.test._contains_notnew())
+        self.test.d.insert(0, ConfigDict({ 'g': 3 }, allow_new=False))
+        self.assertTrue(self.test._contains_notnew())
+
+    def test_deep_flag_change(self):
+        self.assertFalse(self.test._contains_notnew())
+        self.test.d[1].e._implicit_allow_new = False
+        self.assertTrue(self.test._contains_notnew())
+        self.assertFalse(self.test.a._contains_notnew())
+
+    def test_clone(self):
+        from awesomeyaml.nodes.dict import ConfigDict
+        self.test.a.ayns.set_child('f', ConfigDict({ 'g': 3 }, allow_new=False))
+        self.assertTrue(self.test.ayns.clone()._contains_notnew())
+        self.test.a.ayns.remove_child('f')
+        self.assertFalse(self.test.ayns.clone()._contains_notnew())
+
+
 if __name__ == '__main__':
     unittest.main()
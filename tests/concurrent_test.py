@@ -0,0 +1,203 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+import concurrent.futures
+
+from .utils import setUpModule, recorded_calls, rendezvous_barrier
+
+
+class ConcurrentEvalTest(unittest.TestCase):
+    def setUp(self):
+        recorded_calls.clear()
+        rendezvous_barrier.reset()
+        self.executor = concurrent.futures.ThreadPoolExecutor(4)
+
+    def tearDown(self):
+        self.executor.shutdown()
+        recorded_calls.clear()
+
+    def build(self, yaml):
+        from awesomeyaml.config import Config
+        from awesomeyaml.eval_context import EvalContext
+        return Config.build(yaml, eval_ctx=EvalContext(executor=self.executor))
+
+    def test_independent_calls(self):
+        cfg = self.build('''
+            tokenizer: !call:tests.utils.rendezvous [tok]
+            index: !call:tests.utils.rendezvous [idx]
+            ''')
+        self.assertEqual(cfg, { 'tokenizer': 'tok', 'index': 'idx' })
+        self.assertEqual(sorted(recorded_calls), ['idx', 'tok'])
+
+    def test_dependencies(self):
+        yaml = '''
+            name: data
+            vocab: !call:tests.utils.record [vocab]
+            tokenizer: !call:tests.utils.dummy
+                vocab: !xref vocab
+            table: !call:tests.utils.record [!fstr '{name}_{vocab}']
+            model: !call:tests.utils.dummy
+                tok: !call:tests.utils.record [tok]
+                size: !eval len(table)
+            '''
+        cfg = self.build(yaml)
+        self.assertLess(recorded_calls.index('vocab'), recorded_calls.index('data_vocab'))
+        self.assertEqual(cfg.tokenizer, ((), { 'vocab': 'vocab' }))
+        self.assertEqual(cfg.model, ((), { 'tok': 'tok', 'size': 10 }))
+
+        from awesomeyaml.config import Config
+        self.assertEqual(cfg, Config.build(yaml))
+
+    def test_calls_dependencies(self):
+        from awesomeyaml.builder import Builder
+        from awesomeyaml.graph import DependencyGraph
+        from awesomeyaml.eval_context import _get_calls_dependencies
+        b = Builder()
+        b.add_source('''
+            a: !call:tests.utils.record [1]
+            b: !call:tests.utils.dummy [!xref a]
+            c: !call:tests.utils.dummy [!call:tests.utils.record [2]]
+            d: !call:tests.utils.record [!eval ayns.cfg.a]
+            e: !call:tests.utils.record [!unsafe 3]
+            f: !call:tests.utils.dummy [!xref d]
+            g: !call:tests.utils.dummy [!fstr '{h}']
+            h: [!xref a]
+            ''')
+        graph = DependencyGraph(b.build())
+        self.assertEqual(graph.calls, [('a',), ('b',), ('c',), ('c', 0), ('d',), ('e',), ('f',), ('g',)])
+        self.assertEqual(_get_calls_dependencies(graph), {
+            ('a',): set(),
+            ('b',): { ('a',) },
+            ('c',): { ('c', 0) },
+            ('c', 0): set(),
+            ('d',): None,
+            ('e',): None,
+            ('f',): None,
+            ('g',): { ('a',) }
+        })
+
+    def test_unsafe(self):
+        from awesomeyaml.errors import EvalError
+        with self.assertRaisesRegex(EvalError, 'unsafe'):
+            self.build('''
+                a: !call:tests.utils.record [1]
+                b: !call:tests.utils.record [!unsafe 2]
+                ''')
+        self.assertEqual(recorded_calls, [1])
+
+    def test_error(self):
+        from awesomeyaml.errors import EvalError
+        with self.assertRaisesRegex(EvalError, "under path: 'b'"):
+            self.build('''
+                a: !call:tests.utils.record [1]
+                b: !call:tests.utils.malicious
+                c: !call:tests.utils.malicious
+                ''')
+
+
+class ConcurrentParseTest(unittest.TestCase):
+    files = {
+        'a.yaml': 'foo: 1\nbar: [1, 2]\n---\nfoo: 2\n',
+        'b.yaml': 'inc: !include [c.yaml, d.yaml]\nbaz: !notnew 3\n',
+        'c.yaml': 'x: 1\ny: !weak 2\n',
+        'd.yaml': 'y: 3\nz: !xref bar\n',
+        'e.yaml': 'baz: !notnew 4\n',
+        'bad.yaml': 'foo: [1\n',
+    }
+
+    def setUp(self):
+        import tempfile
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.dir = self._tmpdir.name
+        for name, content in self.files.items():
+            with open(self.path(name), 'w') as f:
+                f.write(content)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def path(self, name):
+        import os
+        return os.path.join(self.dir, name)
+
+    def get_builders(self, *sources, **kwargs):
+        from awesomeyaml.builder import Builder
+        b = Builder(use_cache=False)
+        b.add_multiple_sources(*sources, **kwargs)
+        yield 'sequential', b
+        for executor_type in [concurrent.futures.ThreadPoolExecutor, concurrent.futures.ProcessPoolExecutor]:
+            with executor_type(2) as executor:
+                b = Builder(use_cache=False, executor=executor)
+                b.add_multiple_sources(*sources, **kwargs)
+                yield executor_type.__name__, b
+
+    def test_stages(self):
+        sources = [self.path('a.yaml'), 'qux: 5', self.path('b.yaml'), self.path('e.yaml')]
+        expected = None
+        for name, b in self.get_builders(*sources):
+            with self.subTest(executor=name):
+                self.assertEqual(len(b.stages), 5)
+                for idx, stage in enumerate(b.stages):
+                    self.assertTrue(all(node._idx == idx for node in stage.ayns.nodes(include_self=True)))
+                self.assertEqual(b.stages[1]._source_file, self.path('a.yaml'))
+                self.assertEqual(b.stages[2]._source_file, None)
+                self.assertEqual(b.stages[3].baz._source_file, self.path('b.yaml'))
+
+                from awesomeyaml.config import Config
+                cfg = Config(b.build())
+                if expected is None:
+                    expected = cfg
+                self.assertEqual(cfg, expected)
+                self.assertEqual(cfg.inc, { 'x': 1, 'y': 3, 'z': [1, 2] })
+                self.assertEqual(cfg.baz, 4)
+
+    def test_missing_include(self):
+        from awesomeyaml.errors import PreprocessError
+        with open(self.path('b.yaml'), 'w') as f:
+            f.write('inc: !include [c.yaml, missing.yaml, d.yaml]\n')
+        for name, b in self.get_builders(self.path('a.yaml'), self.path('b.yaml')):
+            with self.subTest(executor=name):
+                with self.assertRaisesRegex(PreprocessError, "'missing': \\[.*'missing.yaml'\\)\\]"):
+                    b.build()
+
+    def test_errors(self):
+        from awesomeyaml.builder import Builder
+        from awesomeyaml.errors import ParsingError
+        for executor_type in [None, concurrent.futures.ThreadPoolExecutor, concurrent.futures.ProcessPoolExecutor]:
+            with self.subTest(executor=executor_type):
+                executor = executor_type(2) if executor_type is not None else None
+                try:
+                    b = Builder(use_cache=False, executor=executor)
+                    with self.assertRaisesRegex(ParsingError, 'bad.yaml'):
+                        b.add_multiple_sources(self.path('a.yaml'), self.path('bad.yaml'), self.path('c.yaml'))
+                    self.assertEqual(len(b.stages), 2)
+                    with self.assertRaises(FileNotFoundError):
+                        b.add_multiple_sources(self.path('c.yaml'), self.path('missing.yaml'), raw_yaml=False)
+                finally:
+                    if executor is not None:
+                        executor.shutdown()
+
+    def test_shutdown_executor(self):
+        from awesomeyaml.builder import Builder
+        executor = concurrent.futures.ThreadPoolExecutor(2)
+        executor.shutdown()
+        b = Builder(use_cache=False, executor=executor)
+        b.add_multiple_sources(self.path('c.yaml'), self.path('d.yaml'))
+        self.assertEqual([stage.ayns.idx for stage in b.stages], [0, 1])
+        self.assertEqual([stage.ayns.source_file for stage in b.stages], [self.path('c.yaml'), self.path('d.yaml')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -149,6 +149,19 @@ class DictNodeTest(unittest.TestCase):
         self.assertIs(val, None)
         self.assertEqual(len(test), 1)
 
+    def test_single_storage(self):
+        from awesomeyaml.nodes.dict import ConfigDict
+        test = ConfigDict({ 'a': 1, 'b': 2 })
+        self.assertFalse(hasattr(test, '__dict__') and test.__dict__)
+        test.c = 3
+        test.ayns.rename_child('a', 'd')
+        del test['b']
+        self.assertEqual(list(test.keys()), ['c', 'd'])
+        self.assertEqual(dict(test._children), dict(test))
+        self.assertIs(test._children['c'], dict.__getitem__(test, 'c'))
+        with self.assertRaises(KeyError):
+            del test['b']
+
     def test_filter(self):
         from awesomeyaml.nodes.dict import ConfigDict
         test = ConfigDict({ 'a': 1, 'b': 2, 'c': { 'd': 3, 'e': 4 } })
@@ -161,6 +174,51 @@ class DictNodeTest(unittest.TestCase):
         mapped = test.ayns.map_nodes(lambda path, node: node**2)
         self.assertEqual(mapped, { 'a': 1, 'b': 4, 'c': { 'd': 9, 'e': 16 }})
 
+    def test_walk(self):
+        from awesomeyaml.nodes.dict import ConfigDict
+        test = ConfigDict({ 'a': 1, 'c': { 'd': 3, 'e': [4, 5] } })
+        entered = []
+        left = []
+        walked = list(test.ayns.walk(enter=lambda path, node: entered.append(str(path)), leave=lambda path, node: left.append(str(path))))
+        self.assertEqual([str(p) for p, _ in walked], ['', 'a', 'c', 'c.d', 'c.e', 'c.e[0]', 'c.e[1]'])
+        self.assertEqual(entered, [str(p) for p, _ in walked])
+        self.assertEqual(left, ['a', 'c.d', 'c.e[0]', 'c.e[1]', 'c.e', 'c', ''])
+
+        pruned = [str(p) for p, _ in test.ayns.walk(include_self=False, enter=lambda path, node: path != ['c', 'e'])]
+        self.assertEqual(pruned, ['a', 'c', 'c.d', 'c.e'])
+
+        shared = set(id(p) for p, _ in test.ayns.walk(copy_paths=False))
+        self.assertEqual(len(shared), 1)
+
+    def test_walk_leave(self):
+        from awesomeyaml.nodes.dict import ConfigDict
+        from awesomeyaml.nodes.composed import ComposedNode
+        test = ConfigDict({ 'a': 1, 'b': 2, 'c': { 'd': 3, 'e': [4, 5] } })
+        def leave(path, node):
+            if isinstance(node, int):
+                return ComposedNode.REMOVE if node % 2 else node * 10
+        for _ in test.ayns.walk(leave=leave):
+            pass
+        self.assertEqual(test, { 'b': 20, 'c': { 'e': [40] } })
+
+    def test_walk_deep(self):
+        from awesomeyaml.nodes.dict import ConfigDict
+        from awesomeyaml.nodes.required import RequiredNode
+        from awesomeyaml.config import Config
+        depth = 2000
+        test = ConfigDict({ 'leaf': RequiredNode(None) })
+        for _ in range(depth):
+            test = ConfigDict({ 'k': test })
+        paths = list(test.ayns.nodes_paths())
+        self.assertEqual(len(paths), depth + 1)
+        self.assertEqual(len(paths[-1]), depth + 1)
+        self.assertEqual(sum(1 for _ in test.ayns.walk(copy_paths=False)), depth + 2)
+        test.ayns.map_nodes(lambda path, node: 1)
+        self.assertEqual(test.ayns.get_node(['k'] * depth + ['leaf']), 1)
+        test.ayns.filter_nodes(lambda path, node: False)
+        self.assertEqual(test, {})
+        Config.check_missing(test)
+
     def test_copy(self):
         from awesomeyaml.nodes.dict import ConfigDict
         test = ConfigDict({ 'a': 1, 'b': 2, 'c': { 'd': 3, 'e': 4 } })
@@ -72,5 +72,26 @@ class FunctionNodeTest(unittest.TestCase):
         self.assertEqual(test._func(**test), 11)
         self.assertEqual(test2._func(**test2), 11)
 
+    def test_resolve_args(self):
+        from awesomeyaml.nodes.function import FunctionNode, _signatures_cache
+
+        def func(a, b, c=3, *args, d=4):
+            return a, b, c, args, d
+
+        self.assertEqual(FunctionNode._resolve_args(func, { 'd': 1 }), ([], {}, { 'd': 1 }))
+        self.assertEqual(FunctionNode._resolve_args(func, { 0: 1, 1: 2, 'd': 5 }), ([1, 2], {}, { 'd': 5 }))
+        self.assertEqual(FunctionNode._resolve_args(func, { 0: 1, 2: 3, 'b': 2 }), ([1], { 'c': 3 }, { 'b': 2 }))
+        self.assertIn(func, _signatures_cache)
+        self.assertEqual(len(_signatures_cache[func][2]), 2)
+        self.assertEqual(FunctionNode._resolve_args(func, { 2: 4, 0: 2, 'b': 1 }), ([2], { 'c': 4 }, { 'b': 1 }))
+        with self.assertRaises(ValueError):
+            FunctionNode._resolve_args(func, { 0: 1, 4: 2 })
+
+        # builtins cannot be weakly referenced
+        self.assertEqual(FunctionNode._resolve_args(divmod, { 0: 7, 1: 2 }), ([7, 2], {}, {}))
+
+        del func
+        self.assertEqual(len([f for f in _signatures_cache if f.__name__ == 'func']), 0)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,155 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import unittest
+
+from .utils import setUpModule
+
+
+class DependencyGraphTest(unittest.TestCase):
+    def get_graph(self, yaml, eval_symbols=None):
+        from awesomeyaml.builder import Builder
+        from awesomeyaml.graph import DependencyGraph
+        b = Builder()
+        b.add_source(yaml)
+        return DependencyGraph(b.build(), eval_symbols)
+
+    def test_references(self):
+        graph = self.get_graph('''
+            a: 1
+            b: !xref c.d
+            c:
+                d: !xref a
+                e: !eval a + len(b) + b.c
+                f: f'{a}{g}'
+            g: 2
+            h: !xref missing
+            ''', eval_symbols={ 'g': 3 })
+        self.assertEqual(list(graph.nodes), [(), ('a',), ('b',), ('c', 'd'), ('c', 'e'), ('c', 'f'), ('h',)])
+        self.assertEqual(graph.references, {
+            ('b',): [('c', 'd')],
+            ('c', 'd'): [('a',)],
+            ('c', 'e'): [('a',), ('b',)],
+            ('c', 'f'): [('a',)],
+            ('h',): []
+        })
+        self.assertEqual(graph.definite, { ('b',), ('c', 'd'), ('c', 'f'), ('h',) })
+        self.assertEqual(graph.children[()], [('a',), ('b',), ('c', 'd'), ('c', 'e'), ('c', 'f'), ('h',)])
+        self.assertEqual(graph.get_targets(), { ('a',), ('b',), ('c', 'd') })
+        self.assertEqual(graph.order, [('a',), ('c', 'd'), ('b',), ('c', 'e'), ('c', 'f'), ('h',), ()])
+
+    def test_reorderable(self):
+        graph = self.get_graph('''
+            a: !unsafe 1
+            b: !xref a
+            c: !eval ayns.cfg.a
+            d: !xref c
+            e: !xref f
+            f: [1, 2]
+            ''')
+        self.assertEqual(graph.reorderable, { ('e',), ('f',) })
+
+    def test_pure(self):
+        graph = self.get_graph('''
+            a: !call:tests.utils.record [a]
+            b: !xref a
+            c: { d: !xref f, e: !eval 1 }
+            f: [!xref g]
+            g: 1
+            h: !xref c
+            i: !xref f
+            ''')
+        self.assertEqual(graph.pure, { ('c', 'd'), ('f', 0), ('f',), ('g',), ('i',) })
+
+    def test_cycle(self):
+        from awesomeyaml.errors import EvalError
+        graph = self.get_graph('''
+            a: !xref b
+            b:
+                c: !xref a
+            ''')
+        with self.assertRaisesRegex(EvalError, "cycle of dependencies: 'a' -> 'b' -> 'b.c' -> 'a'"):
+            graph.check_cycles()
+
+    def test_eval_cycle(self):
+        from awesomeyaml.config import Config
+        # names used by !eval nodes are not always evaluated, so they do not make cycles
+        graph = self.get_graph('''
+            a: !eval b if False else 1
+            b: !eval a
+            ''')
+        graph.check_cycles()
+        self.assertEqual(Config.build('{ a: !eval b if False else 1, b: !eval a }'), { 'a': 1, 'b': 1 })
+
+    def test_cycle_on_evaluate(self):
+        from awesomeyaml.config import Config
+        from awesomeyaml.errors import EvalError
+        with self.assertRaisesRegex(EvalError, 'cycle of dependencies'):
+            Config.build('{ a: !xref b, b: !xref a }')
+        with self.assertRaisesRegex(EvalError, 'cycle of dependencies'):
+            Config.build('{ a: { b: !xref a } }')
+
+    def test_cycle_of_xrefs(self):
+        from awesomeyaml.config import Config
+        from awesomeyaml.errors import EvalError
+        with self.assertRaisesRegex(EvalError, "cycle of dependencies: 'a' -> 'b' -> 'c' -> 'a'"):
+            Config.build('{ a: !xref b, b: !xref c, c: !xref a }')
+
+    def test_evaluation_order(self):
+        from awesomeyaml.config import Config
+        from .utils import recorded_calls
+        # referenced nodes which run any code are not evaluated ahead of other nodes, with or without the graph
+        yaml = '''
+            seed: !call:tests.utils.record [seed]
+            a: !call:tests.utils.record [a]
+            b: !xref a
+            c: { d: !xref e }
+            e: [!call:tests.utils.record [e]]
+            f: [!xref g]
+            g: 1
+            '''
+        recorded_calls.clear()
+        try:
+            for incremental in [False, True]:
+                with self.subTest(incremental=incremental):
+                    cfg = Config.build(yaml, incremental=incremental)
+                    self.assertEqual(recorded_calls, ['seed', 'a', 'e'])
+                    self.assertEqual(cfg.f, [1])
+                    recorded_calls.clear()
+
+            cfg.ayns.override('{ seed: !call:tests.utils.record [seed2], e: [!call:tests.utils.record [e2]] }')
+            self.assertEqual(recorded_calls, ['seed2', 'e2'])
+        finally:
+            recorded_calls.clear()
+
+    def test_long_chain(self):
+        import concurrent.futures
+        from awesomeyaml.config import Config
+        from awesomeyaml.eval_context import EvalContext
+        # when the graph is used, each reference is evaluated before its referrer,
+        # otherwise this would exceed the recursion limit
+        n = sys.getrecursionlimit()
+        yaml = '\n'.join([f'x{i}: [!xref x{i+1}]' for i in range(n)] + [f'x{n}: 1'])
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            cfg = Config.build(yaml, eval_ctx=EvalContext(executor=executor))
+        value = cfg.x0
+        for _ in range(n):
+            self.assertIsInstance(value, list)
+            value = value[0]
+        self.assertEqual(value, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
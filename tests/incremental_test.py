@@ -0,0 +1,140 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from .utils import setUpModule, recorded_calls
+
+
+class IncrementalEvalTest(unittest.TestCase):
+    base = '''
+        name: data
+        size: 4
+        vocab: !call:tests.utils.record [vocab]
+        table: !call:tests.utils.record [!fstr '{name}_{vocab}']
+        model: !call:tests.utils.dummy
+            tok: !call:tests.utils.record [tok]
+            size: !eval size * 2
+            vocab: !xref vocab
+        opts:
+            lr: 0.1
+            layers: [1, 2]
+        '''
+
+    def setUp(self):
+        recorded_calls.clear()
+
+    def tearDown(self):
+        recorded_calls.clear()
+
+    def build(self, *yamls):
+        from awesomeyaml.config import Config
+        return Config.build(*yamls, incremental=True)
+
+    def test_unchanged(self):
+        cfg = self.build(self.base)
+        self.assertEqual(sorted(recorded_calls), ['data_vocab', 'tok', 'vocab'])
+        recorded_calls.clear()
+
+        cfg2 = cfg.ayns.override('opts: { lr: 0.2 }')
+        self.assertEqual(recorded_calls, [])
+        self.assertEqual(cfg2.opts, { 'lr': 0.2, 'layers': [1, 2] })
+        self.assertEqual(cfg.opts.lr, 0.1)
+        self.assertIs(cfg2.model, cfg.model)
+        self.assertIsNot(cfg2.opts, cfg.opts)
+        self.assertIsNot(cfg2.opts.layers, cfg.opts.layers)
+
+    def test_dependants(self):
+        cfg = self.build(self.base)
+        recorded_calls.clear()
+
+        cfg2 = cfg.ayns.override('name: other')
+        self.assertEqual(recorded_calls, ['other_vocab'])
+        self.assertIs(cfg2.model, cfg.model)
+        recorded_calls.clear()
+
+        cfg3 = cfg2.ayns.override('size: 8')
+        self.assertEqual(recorded_calls, [])
+        self.assertEqual(cfg3.model, ((), { 'tok': 'tok', 'size': 16, 'vocab': 'vocab' }))
+        self.assertEqual(cfg3.table, 'other_vocab')
+        recorded_calls.clear()
+
+        cfg4 = cfg3.ayns.override('vocab: !call:tests.utils.record [v2]')
+        self.assertEqual(sorted(recorded_calls), ['other_v2', 'v2'])
+        self.assertEqual(cfg4.model[1]['vocab'], 'v2')
+
+    def test_same_as_fresh(self):
+        from awesomeyaml.config import Config
+        override = '''
+            vocab: !call:tests.utils.record [v2]
+            opts:
+                layers: !del [3]
+                extra: !xref size
+            '''
+        cfg = self.build(self.base).ayns.override(override)
+        recorded_calls.clear()
+        fresh = Config.build(self.base, override)
+        self.assertEqual(cfg, fresh)
+        self.assertEqual(cfg.opts, { 'lr': 0.1, 'layers': [3], 'extra': 4 })
+
+    def test_cmdline(self):
+        cfg = self.build(self.base)
+        recorded_calls.clear()
+        cfg2 = cfg.ayns.override_from_cmdline('opts.lr=0.5', 'name=x')
+        self.assertEqual(recorded_calls, ['x_vocab'])
+        self.assertEqual(cfg2.opts.lr, 0.5)
+        self.assertEqual(cfg2.table, 'x_vocab')
+
+    def test_build_from_cmdline(self):
+        from awesomeyaml.config import Config
+        cfg = Config.build_from_cmdline(self.base, 'opts.lr=0.5', incremental=True)
+        recorded_calls.clear()
+        cfg2 = cfg.ayns.override_from_cmdline('size=8')
+        self.assertEqual(recorded_calls, [])
+        self.assertEqual(cfg2.model[1]['size'], 16)
+        self.assertEqual(cfg2.opts.lr, 0.5)
+
+    def test_eval_ctx_not_modified(self):
+        from awesomeyaml.config import Config
+        from awesomeyaml.eval_context import EvalContext
+        ctx = EvalContext()
+        cfg = Config.build(self.base, eval_ctx=ctx, incremental=True)
+        self.assertFalse(ctx.keep_results)
+        recorded_calls.clear()
+        cfg2 = cfg.ayns.override('size: 8', eval_ctx=ctx)
+        self.assertFalse(ctx.keep_results)
+        self.assertEqual(recorded_calls, [])
+        self.assertEqual(cfg2.model[1]['size'], 16)
+
+        recorded_calls.clear()
+        Config.build(self.base, eval_ctx=ctx)
+        self.assertIsNone(ctx.results)
+
+    def test_not_incremental(self):
+        from awesomeyaml.config import Config
+        cfg = Config.build(self.base)
+        recorded_calls.clear()
+        cfg2 = cfg.ayns.override('size: 1')
+        self.assertEqual(sorted(recorded_calls), ['data_vocab', 'tok', 'vocab'])
+        self.assertEqual(cfg2.model[1]['size'], 2)
+
+    def test_removed_target(self):
+        from awesomeyaml.config import Config
+        from awesomeyaml.errors import EvalError
+        cfg = self.build('''
+            a: 1
+            b: !xref a
+            ''')
+        with self.assertRaises(EvalError):
+            cfg.ayns.override('!del { b: !xref a }')
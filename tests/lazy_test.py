@@ -0,0 +1,87 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from .utils import setUpModule, recorded_calls
+
+
+class LazyConfigTest(unittest.TestCase):
+    def setUp(self):
+        recorded_calls.clear()
+        self.yaml = '''
+            model:
+                name: resnet
+                layers: !call:tests.utils.record [[1, 2, 3]]
+            data:
+                train: !call:tests.utils.record [train]
+                test: !call:tests.utils.record [test]
+                batch: !xref model.layers
+            name: f'{model.name}_run'
+            '''
+
+    def tearDown(self):
+        recorded_calls.clear()
+
+    def test_on_demand(self):
+        from awesomeyaml.config import Config, LazyConfig
+        cfg = Config.build(self.yaml, lazy=True)
+        self.assertIsInstance(cfg, LazyConfig)
+        self.assertEqual(recorded_calls, [])
+        self.assertEqual(cfg.data.train, 'train')
+        self.assertEqual(recorded_calls, ['train'])
+        self.assertEqual(cfg['data']['train'], 'train')
+        self.assertEqual(recorded_calls, ['train'])
+        self.assertIs(cfg.data.batch, cfg.model.layers)
+        self.assertEqual(recorded_calls, ['train', [1, 2, 3]])
+        self.assertEqual(cfg.name, 'resnet_run')
+        self.assertEqual(sorted(cfg.keys()), ['data', 'model', 'name'])
+        self.assertIn('model', cfg)
+        self.assertNotIn('foo', cfg)
+        with self.assertRaises(AttributeError):
+            cfg.foo
+        self.assertEqual(recorded_calls, ['train', [1, 2, 3]])
+
+    def test_equal_to_eager(self):
+        from awesomeyaml.config import Config
+        cfg = Config.build(self.yaml, lazy=True)
+        self.assertEqual(cfg.data, { 'train': 'train', 'test': 'test', 'batch': [1, 2, 3] })
+        self.assertEqual(cfg, Config.build(self.yaml))
+        self.assertEqual(cfg.ayns.get_node('data.test'), 'test')
+        self.assertEqual(cfg.ayns.source, Config.build(self.yaml).ayns.source)
+
+    def test_hidden_nodes(self):
+        from awesomeyaml.config import Config
+        cfg = Config.build('{ _d: { x: 1 }, a: { _h: 2, b: 3 } }', lazy=True)
+        self.assertEqual(sorted(cfg.keys()), ['a'])
+        self.assertEqual(cfg.a, { 'b': 3 })
+        self.assertEqual(cfg.ayns.source.ayns.get_node('_d.x'), 1)
+
+    def test_iterate(self):
+        from awesomeyaml.config import Config
+        from awesomeyaml.nodes.dict import ConfigDict
+        cfg = Config.build(self.yaml, lazy=True)
+        self.assertEqual(list(cfg), ['model', 'data', 'name'])
+        self.assertEqual(list(cfg.data), ['train', 'test', 'batch'])
+        self.assertEqual([type(key) for key in cfg], [str, str, str])
+        self.assertEqual(recorded_calls, [])
+        self.assertIsInstance(cfg._eval_ctx.get_node(), ConfigDict)
+        self.assertEqual(cfg._eval_ctx.get_node('model.name'), 'resnet')
+        self.assertEqual(cfg.data.batch, [1, 2, 3])
+        self.assertEqual(cfg.name, 'resnet_run')
+        self.assertEqual(cfg, Config.build(self.yaml))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -204,6 +204,23 @@ class ListNodeTest(unittest.TestCase):
         self.assertEqual(test[0], 5)
         self.assertEqual(test.ayns.get_child(0), 5)
 
+    def test_single_storage(self):
+        from awesomeyaml.nodes.list import ConfigList
+        test = ConfigList([1, 2, 3, 4], delete=True)
+        self.assertFalse(hasattr(test, '__dict__') and test.__dict__)
+        third = test[2]
+        test.insert(0, 0)
+        del test[1]
+        self.assertListEqual(test, [0, 2, 3, 4])
+        self.assertIs(test._children[2], third)
+        self.assertListEqual(list(test._children.items()), list(enumerate(test)))
+        self.assertIs(test[0]._implicit_delete, True)
+
+        test.ayns.remove_child(0)
+        self.assertListEqual(test, [2, 3, 4])
+        self.assertEqual(test.ayns.children_count(), 3)
+        self.assertIsNone(test._children.get(3))
+
 
 if __name__ == '__main__':
     unittest.main()
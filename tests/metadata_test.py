@@ -0,0 +1,105 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from .utils import setUpModule
+
+
+class ExtendedMetadataTest(unittest.TestCase):
+    def _parse(self, data):
+        import awesomeyaml.yaml as yaml
+        return list(yaml.parse(data))[0]
+
+    def test_no_metadata(self):
+        from awesomeyaml.yaml import _encode_all_metadata
+        data = 'foo: 1\nbar: !weak 2\n'
+        self.assertIs(_encode_all_metadata(data), data)
+
+    def test_multiple(self):
+        node = self._parse('a: !metadata{{ "x": 1 }} 1\nb: !metadata{{ "y": 2, "priority": -1 }} 2\nc: f"{{a}}"\n')
+        self.assertEqual(node['a']._metadata, { 'x': 1 })
+        self.assertEqual(node['b']._metadata, { 'y': 2 })
+        self.assertTrue(node['b'].ayns.weak)
+        self.assertEqual(node['c'], 'f"{{a}}"')
+
+    def test_nested_braces(self):
+        node = self._parse("a: !metadata{{ 'x': {'y': {'z': 1}}, 'w': '}}{' }} [1, 2]\n")
+        self.assertEqual(node['a']._metadata, { 'x': { 'y': { 'z': 1 } }, 'w': '}}{' })
+        self.assertEqual(node['a'], [1, 2])
+
+    def test_escaped_quotes(self):
+        node = self._parse("a: !metadata{{ 'x': 'it\\'s }}' }} 1\n")
+        self.assertEqual(node['a']._metadata, { 'x': "it's }}" })
+
+    def test_not_literal(self):
+        with self.assertRaisesRegex(ValueError, 'line 2'):
+            self._parse("a: 1\nb: !metadata{{ 'x': __import__('os') }} 1\n")
+
+    def test_unterminated(self):
+        with self.assertRaisesRegex(ValueError, 'Cannot find the end'):
+            self._parse("a: !metadata{{ 'x': 1 }\n")
+
+
+class MetadataEncodingTest(unittest.TestCase):
+    def test_json(self):
+        from awesomeyaml.yaml import _encode_metadata, _decode_metadata
+        md = { 'priority': 1, 'options': ['lru', 'fifo'], 'nested': { 'x': None, 'y': 1.5, 'z': True } }
+        encoded = _encode_metadata(md)
+        self.assertTrue(encoded.startswith('j'))
+        self.assertRegex(encoded, r'^[a-zA-Z0-9_-]+$')
+        self.assertEqual(_decode_metadata(encoded), { 'priority': 1, 'metadata': { 'options': ['lru', 'fifo'], 'nested': { 'x': None, 'y': 1.5, 'z': True } } })
+
+    def test_literal(self):
+        from awesomeyaml.yaml import _encode_metadata, _decode_metadata
+        md = { 'shape': (1, 2), 1: { 'a', 'b' } }
+        encoded = _encode_metadata(md)
+        self.assertTrue(encoded.startswith('l'))
+        self.assertRegex(encoded, r'^[a-zA-Z0-9_-]+$')
+        self.assertEqual(_decode_metadata(encoded), { 'metadata': md })
+
+    def test_not_literal(self):
+        from awesomeyaml.yaml import _encode_metadata
+        with self.assertRaises(ValueError):
+            _encode_metadata({ 'x': object() })
+
+    def test_legacy(self):
+        import pickle
+        from awesomeyaml.yaml import _decode_metadata
+        md = { 'delete': True, 'options': ('a', 'b'), 'set': { 1, 2 } }
+        for protocol in range(pickle.HIGHEST_PROTOCOL+1):
+            with self.subTest(protocol=protocol):
+                self.assertEqual(_decode_metadata(pickle.dumps(md, protocol=protocol).hex()), { 'delete': True, 'metadata': { 'options': ('a', 'b'), 'set': { 1, 2 } } })
+
+        node = list(__import__('awesomeyaml.yaml').yaml.parse('a: !metadata:' + pickle.dumps({ 'x': 1 }).hex() + ' 1'))[0]
+        self.assertEqual(node['a']._metadata, { 'x': 1 })
+
+    def test_legacy_no_objects(self):
+        import pickle
+        import collections
+        from awesomeyaml.yaml import _decode_metadata
+        with self.assertRaises(pickle.UnpicklingError):
+            _decode_metadata(pickle.dumps({ 'x': collections.OrderedDict() }).hex())
+
+    def test_dump_roundtrip(self):
+        import awesomeyaml.yaml as yaml
+        node = list(yaml.parse("a: !metadata{{ 'x': [1, 2], 'y': (3, 4) }} 1\nb: !metadata{{ 'z': 'foo' }} [1]\n"))[0]
+        dumped = yaml.dump(node)
+        self.assertNotIn('{{', dumped)
+        reparsed = list(yaml.parse(dumped))[0]
+        self.assertEqual(reparsed['a']._metadata, { 'x': [1, 2], 'y': (3, 4) })
+        self.assertEqual(reparsed['b']._metadata, { 'z': 'foo' })
+
+
+if __name__ == '__main__':
+    unittest.main()
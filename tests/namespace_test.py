@@ -0,0 +1,88 @@
+# Copyright 2022 Samsung Electronics Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from .utils import setUpModule
+
+
+class NamespaceTest(unittest.TestCase):
+    def setUp(self):
+        from awesomeyaml.namespace import Namespaceable, Namespace, namespace
+
+        class Base(Namespaceable):
+            def __init__(self):
+                self._value = 1
+
+            class ayns(Namespace):
+                @property
+                def value(self):
+                    return self._value
+
+                @value.setter
+                def value(self, value):
+                    self._value = value
+
+                def name(self):
+                    return 'base'
+
+        class Derived(Base):
+            @namespace('ayns')
+            def name(self):
+                return 'derived'
+
+        self.Base = Base
+        self.Derived = Derived
+
+    def test_resolution(self):
+        b = self.Base()
+        d = self.Derived()
+        self.assertEqual(b.ayns.value, 1)
+        self.assertEqual(d.ayns.value, 1)
+        self.assertEqual(b.ayns.name(), 'base')
+        self.assertEqual(d.ayns.name(), 'derived')
+        self.assertEqual(self.Base.ayns.name(d), 'base')
+        with self.assertRaises(AttributeError):
+            d.ayns.missing
+        with self.assertRaises(AttributeError):
+            self.Derived.ayns.missing
+
+    def test_set(self):
+        d = self.Derived()
+        d.ayns.value = 3
+        self.assertEqual(d._value, 3)
+        self.assertEqual(d.ayns.value, 3)
+        with self.assertRaises(AttributeError):
+            d.ayns.name = 'foo'
+
+    def test_invalidation(self):
+        from awesomeyaml.namespace import Namespace
+
+        d = self.Derived()
+        self.assertEqual(d.ayns.name(), 'derived')
+
+        class ayns(Namespace):
+            def name(self):
+                return 'replaced'
+
+            def extra(self):
+                return 'extra'
+
+        self.Base.ayns = Namespace(self.Base, 'ayns', { 'value': self.Base.ayns.value, 'name': ayns.name, 'extra': ayns.extra })
+        self.assertEqual(d.ayns.name(), 'derived')
+        self.assertEqual(d.ayns.extra(), 'extra')
+        self.assertEqual(self.Base().ayns.name(), 'replaced')
+
+        del self.Derived.ayns
+        self.assertEqual(d.ayns.name(), 'replaced')
@@ -145,6 +145,27 @@ class PickleTest(unittest.TestCase):
         test = list(parse('!null'))[0]
         self.check_pickle(test)
 
+    def test_flags_and_metadata(self):
+        from awesomeyaml.nodes import ConfigNode
+        from awesomeyaml.nodes.node import _empty_metadata
+        test = ConfigNode({ 'a': 1, 'b': 'foo', 'c': [1.5, None] }, delete=True, allow_new=False, safe=False, priority=ConfigNode.FORCE, metadata={ 'x': 1 })
+        test.a._priority = ConfigNode.WEAK
+        self.check_pickle(test, composed=True)
+
+        test_ = pickle.loads(pickle.dumps(test))
+        self.assertEqual(test_.ayns.metadata, { 'x': 1 })
+        self.assertIs(test_.b._metadata, _empty_metadata)
+        self.assertTrue(test_.a.ayns.weak)
+        self.assertTrue(test_.ayns.force)
+        self.assertIs(test_.c._implicit_delete, True)
+        self.assertIs(test_.c[0]._implicit_allow_new, False)
+
+        test_.b.ayns.metadata['y'] = 2
+        self.assertEqual(test_.b.ayns.metadata, { 'y': 2 })
+        self.assertEqual(_empty_metadata, {})
+        with self.assertRaises(TypeError):
+            _empty_metadata['y'] = 2
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -53,6 +53,42 @@ class SimpleTest(unittest.TestCase):
         cfg.test2 = 13
         self.assertTrue(cfg['test2'] == cfg.test2 == 13)
 
+    def test_hidden_nodes(self):
+        from awesomeyaml.config import Config
+        from awesomeyaml.errors import EvalError
+        cfg = Config.build('''
+            _defaults: &d { lr: 0.1 }
+            model: { <<: *d, depth: 3 }
+            m: { _h: 1, x: [{ _y: 2, z: 3 }] }
+        ''')
+        self.assertEqual(cfg, { 'model': { 'lr': 0.1, 'depth': 3 }, 'm': { 'x': [{ 'z': 3 }] } })
+        self.assertEqual(cfg.ayns.source.ayns.get_node('_defaults.lr'), 0.1)
+        self.assertEqual(cfg.ayns.source.ayns.get_node('m._h'), 1)
+
+        with self.assertRaises(EvalError):
+            Config.build('{ _d: 1, a: !xref _d }')
+
+    def test_source_not_modified(self):
+        import pickle
+        from awesomeyaml.config import Config
+        from awesomeyaml.builder import Builder
+        builder = Builder()
+        builder.add_source('''
+            a: 1
+            b: !xref a
+            c: !eval a + 1
+            d: !fstr "{a}-{c}"
+            e: !bind:collections.OrderedDict { x: !xref c }
+            f: !call:dict { y: [!xref b, !xref a] }
+            g: { h: !xref a }
+        ''')
+        source = builder.build()
+        before = pickle.dumps(source)
+        cfg = Config(source)
+        self.assertIs(cfg.ayns.source, source)
+        self.assertEqual(cfg.f, { 'y': [1, 1] })
+        self.assertEqual(pickle.dumps(source), before)
+
 
 if __name__ == '__main__':
     unittest.main()
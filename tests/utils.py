@@ -14,6 +14,7 @@
 
 
 import re
+import threading
 import traceback
 
 
@@ -44,6 +45,24 @@ def dummy(*args, **kwargs):
     return (args, kwargs)
 
 
+recorded_calls = []
+
+
+def record(value):
+    recorded_calls.append(value)
+    return value
+
+
+rendezvous_barrier = threading.Barrier(2, timeout=5)
+
+
+def rendezvous(value):
+    ''' Blocks until another thread calls the function, fails if that does not happen in 5 seconds.
+    '''
+    rendezvous_barrier.wait()
+    return record(value)
+
+
 def malicious(*args, **kwargs):
     raise RuntimeError(f'Malicious function called! Args: {args}, {kwargs}')
 